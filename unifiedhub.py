@@ -7,8 +7,21 @@ import requests
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 import json
+import csv
+import io
 import os
 import socket
+import hashlib
+import time
+import bisect
+import heapq
+import itertools
+import re
+import random
+import struct
+from datetime import datetime, timedelta
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from mistralai import Mistral
 import psutil
@@ -22,6 +35,28 @@ try:
 except Exception:
     pass
 
+# Export targets for Google-native Drive files: label -> (export MIME type, file extension)
+DRIVE_EXPORT_FORMATS = {
+    'application/vnd.google-apps.document': {
+        'PDF': ('application/pdf', 'pdf'),
+        'DOCX': ('application/vnd.openxmlformats-officedocument.wordprocessingml.document', 'docx'),
+        'Markdown': ('text/markdown', 'md'),
+    },
+    'application/vnd.google-apps.spreadsheet': {
+        'PDF': ('application/pdf', 'pdf'),
+        'XLSX': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+        'CSV': ('text/csv', 'csv'),
+    },
+    'application/vnd.google-apps.presentation': {
+        'PDF': ('application/pdf', 'pdf'),
+    },
+}
+DRIVE_DEFAULT_EXPORT = {
+    'application/vnd.google-apps.document': 'DOCX',
+    'application/vnd.google-apps.spreadsheet': 'XLSX',
+    'application/vnd.google-apps.presentation': 'PDF',
+}
+
 
 class ReuseAddrHTTPServer(HTTPServer):
     """HTTP Server that allows port reuse"""
@@ -58,6 +93,1435 @@ class OAuthCallbackHandler(BaseHTTPRequestHandler):
         pass
 
 
+class VirtualGrid(tk.Frame):
+    """Canvas-backed table that only draws the rows currently in view.
+
+    A fixed pool of canvas text items is reused on every scroll, so the cost of a
+    redraw depends on the window height rather than on the number of rows.
+    """
+    def __init__(self, master, row_height=20, col_width=140, **kwargs):
+        super().__init__(master, **kwargs)
+        self.row_height = row_height
+        self.col_width = col_width
+        self.columns = []
+        self.col_widths = []
+        self.col_x = []
+        self.rows = []
+        self.first_row = 0
+        self.pool = []  # one list of canvas text item ids per visible row slot
+        self.header_items = []
+        self.canvas = tk.Canvas(self, bg='white', highlightthickness=0)
+        self.vbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.hbar = tk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        self.canvas.config(xscrollcommand=self.hbar.set)
+        self.vbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.hbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.canvas.bind('<Configure>', lambda e: self.redraw())
+        self.canvas.bind('<MouseWheel>', lambda e: self.yview('scroll', -1 if e.delta > 0 else 1, 'units'))
+        self.canvas.bind('<Button-4>', lambda e: self.yview('scroll', -1, 'units'))
+        self.canvas.bind('<Button-5>', lambda e: self.yview('scroll', 1, 'units'))
+
+    def set_columns(self, columns, widths=None):
+        self.columns = list(columns)
+        self.col_widths = list(widths) if widths else [self.col_width] * len(self.columns)
+        self.col_x = [sum(self.col_widths[:j]) for j in range(len(self.columns))]
+        for item in self.header_items:
+            self.canvas.delete(item)
+        self.header_items = []
+        for slot in self.pool:
+            for item in slot:
+                self.canvas.delete(item)
+        self.pool = []
+        for j, name in enumerate(self.columns):
+            x = self.col_x[j]
+            self.header_items.append(self.canvas.create_rectangle(x, 0, x + self.col_widths[j], self.row_height,
+                                                                  fill='#ecf0f1', outline='#bdc3c7'))
+            self.header_items.append(self.canvas.create_text(x + 4, self.row_height // 2, anchor='w',
+                                                             text=str(name), font=('Arial', 9, 'bold')))
+        self.canvas.config(scrollregion=(0, 0, max(1, sum(self.col_widths)), 0))
+        self.redraw()
+
+    def append_rows(self, rows):
+        self.rows.extend(rows)
+        self.redraw()
+
+    def prepend_rows(self, rows):
+        """Insert rows at the top without moving the rows currently in view."""
+        self.rows[:0] = rows
+        self.first_row += len(rows)
+        self.redraw()
+
+    def clear(self):
+        self.rows = []
+        self.first_row = 0
+        self.redraw()
+
+    def visible_count(self):
+        height = max(self.canvas.winfo_height(), self.row_height * 2)
+        return max(1, height // self.row_height - 1)
+
+    def yview(self, *args):
+        visible = self.visible_count()
+        max_first = max(0, len(self.rows) - visible)
+        if args and args[0] == 'moveto':
+            self.first_row = int(float(args[1]) * len(self.rows))
+        elif args and args[0] == 'scroll':
+            step = int(args[1]) * (visible if args[2] == 'pages' else 3)
+            self.first_row += step
+        self.first_row = max(0, min(self.first_row, max_first))
+        self.redraw()
+
+    def redraw(self):
+        visible = self.visible_count()
+        # Grow the item pool on demand; surplus slots are blanked rather than deleted
+        while len(self.pool) < visible:
+            y = (len(self.pool) + 1) * self.row_height + self.row_height // 2
+            self.pool.append([self.canvas.create_text(self.col_x[j] + 4, y, anchor='w', font=('Courier', 9))
+                              for j in range(len(self.columns))])
+        widths = [max(1, w // 7 - 1) for w in self.col_widths]
+        for i, slot in enumerate(self.pool):
+            idx = self.first_row + i
+            row = self.rows[idx] if i < visible and idx < len(self.rows) else None
+            for j, item in enumerate(slot):
+                value = row[j] if row is not None and j < len(row) else ''
+                value = str(value)
+                width = widths[j]
+                self.canvas.itemconfigure(item, text=value if len(value) <= width else value[:width - 1] + '…')
+        total = len(self.rows)
+        if total:
+            self.vbar.set(self.first_row / total, min(1.0, (self.first_row + visible) / total))
+        else:
+            self.vbar.set(0, 1)
+
+
+class IntervalTree:
+    """Static centered interval tree over half-open (start, end) intervals.
+
+    Built once from a list of busy intervals; overlapping(lo, hi) then touches only
+    the nodes whose span can intersect the query window.
+    """
+    def __init__(self, intervals):
+        self.size = 0
+        self.root = self._build(sorted(iv for iv in intervals if iv[1] > iv[0]))
+
+    def _build(self, intervals):
+        if not intervals:
+            return None
+        center = intervals[len(intervals) // 2][0]
+        left, right, here = [], [], []
+        for iv in intervals:
+            if iv[1] <= center:
+                left.append(iv)
+            elif iv[0] > center:
+                right.append(iv)
+            else:
+                here.append(iv)
+        self.size += len(here)
+        return {
+            'center': center,
+            'by_start': here,
+            'by_end': sorted(here, key=lambda iv: iv[1], reverse=True),
+            'left': self._build(left),
+            'right': self._build(right),
+        }
+
+    def overlapping(self, lo, hi):
+        """All intervals with start < hi and end > lo, sorted by start."""
+        found, stack = [], [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            center = node['center']
+            if hi <= center:
+                for iv in node['by_start']:
+                    if iv[0] >= hi:
+                        break
+                    found.append(iv)
+            elif lo > center:
+                for iv in node['by_end']:
+                    if iv[1] <= lo:
+                        break
+                    found.append(iv)
+            else:
+                found.extend(node['by_start'])
+            if lo < center:
+                stack.append(node['left'])
+            if hi > center:
+                stack.append(node['right'])
+        found.sort()
+        return found
+
+
+class QuotaLimiter:
+    """Thread-safe token bucket plus a daily unit budget, for quota-metered APIs.
+
+    acquire(cost) waits for a request slot and returns False once spending cost more
+    units would exceed the daily budget, so callers can fall back to cached data.
+    """
+    def __init__(self, rate, daily_budget, spent=0):
+        self.rate = rate
+        self.tokens = rate
+        self.daily_budget = daily_budget
+        self.spent = spent
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, cost=1):
+        while True:
+            with self.lock:
+                if self.spent + cost > self.daily_budget:
+                    return False
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.spent += cost
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def exhaust(self):
+        with self.lock:
+            self.spent = self.daily_budget
+
+
+class ImagePipeline:
+    """Remote images for Tk widgets, fetched and decoded off the Tk thread.
+
+    Workers download, decode and downscale with PIL and keep the result on disk; only
+    the final PhotoImage construction runs on the Tk thread. Finished images live in a
+    bounded LRU, and concurrent requests for the same image share one download.
+    """
+    def __init__(self, root, cache_dir, max_items=256, max_disk_files=2000, workers=4):
+        self.root = root
+        self.cache_dir = cache_dir
+        self.max_items = max_items
+        self.memory = OrderedDict()  # key -> PhotoImage, touched only on the Tk thread
+        self.pending = {}            # key -> (future, [callbacks])
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        os.makedirs(cache_dir, exist_ok=True)
+        threading.Thread(target=self._prune_disk, args=(max_disk_files,), daemon=True).start()
+
+    @staticmethod
+    def key(url, size, cache_key=None):
+        return f"{cache_key or url}|{size[0]}x{size[1]}"
+
+    def get(self, url, size, callback, cache_key=None, headers=None):
+        """Call callback(photo) on the Tk thread once the image is ready; returns a key for cancel().
+
+        headers may be a callable, evaluated when the download starts, for tokens that expire.
+        """
+        key = self.key(url, size, cache_key)
+        photo = self.memory.get(key)
+        if photo is not None:
+            self.memory.move_to_end(key)
+            callback(photo)
+            return key
+        with self.lock:
+            if key in self.pending:
+                self.pending[key][1].append(callback)
+                return key
+            future = self.pool.submit(self._load, key, url, size, headers)
+            self.pending[key] = (future, [callback])
+        future.add_done_callback(lambda f: self.root.after(0, lambda: self._deliver(key, f)))
+        return key
+
+    def cancel(self, key, callback=None):
+        """Drop a callback (or all of them); the download itself is cancelled if nobody is left waiting."""
+        with self.lock:
+            entry = self.pending.get(key)
+            if entry is None:
+                return
+            future, callbacks = entry
+            if callback is not None and callback in callbacks:
+                callbacks.remove(callback)
+            elif callback is None:
+                callbacks.clear()
+            if not callbacks and future.cancel():
+                self.pending.pop(key, None)
+
+    def _load(self, key, url, size, headers):
+        from PIL import Image
+        path = os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + '.png')
+        if os.path.exists(path):
+            img = Image.open(path)
+            img.load()
+            os.utime(path)
+            return img
+        if callable(headers):
+            headers = headers()
+        resp = requests.get(url, headers=headers or {}, timeout=20)
+        resp.raise_for_status()
+        img = Image.open(io.BytesIO(resp.content))
+        img = img.convert('RGBA' if img.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        img.thumbnail(size, Image.LANCZOS)
+        tmp = path + '.tmp'
+        img.save(tmp, 'PNG')
+        os.replace(tmp, path)
+        return img
+
+    def _deliver(self, key, future):
+        with self.lock:
+            # A cancelled load can finish after the same key was requested again; leave that entry alone
+            entry = self.pending.pop(key) if self.pending.get(key, (None,))[0] is future else None
+        if entry is None or future.cancelled() or future.exception() is not None:
+            return
+        photo = ImageTk.PhotoImage(future.result())
+        self.memory[key] = photo
+        while len(self.memory) > self.max_items:
+            # Widgets still showing an evicted image hold their own reference to it
+            self.memory.popitem(last=False)
+        for callback in entry[1]:
+            callback(photo)
+
+    def _prune_disk(self, max_files):
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith('.png')]
+            if len(entries) > max_files:
+                entries.sort(key=lambda e: e.stat().st_mtime)
+                for entry in entries[:len(entries) - max_files]:
+                    os.remove(entry.path)
+        except OSError:
+            pass
+
+
+class ThumbnailGrid(tk.Frame):
+    """Scrollable canvas grid of image tiles backed by an ImagePipeline.
+
+    Only tiles in (or one row around) the viewport own canvas items and image requests.
+    Items are pooled, and a tile that scrolls away cancels its pending fetch, so a long
+    folder costs about one screenful of downloads at a time.
+    """
+    def __init__(self, master, images, tile=150, on_select=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.images = images
+        self.tile = tile
+        self.cell_w, self.cell_h = tile + 16, tile + 34
+        self.on_select = on_select
+        self.items = []       # {'url', 'cache_key', 'label', 'headers'}
+        self.slots = {}       # index -> (rect, image, text)
+        self.pool = []
+        self.requests = {}    # index -> (pipeline key, callback)
+        self.photos = {}      # index -> PhotoImage shown in that tile
+        self.item_index = {}
+        self.selected = None
+        self.columns = 1
+        self.redraw_job = None
+        self.canvas = tk.Canvas(self, bg='white', highlightthickness=0)
+        self.vbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.config(yscrollcommand=self._on_scroll)
+        self.vbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.canvas.bind('<Configure>', lambda e: self._schedule())
+        self.canvas.bind('<MouseWheel>', lambda e: self.canvas.yview('scroll', -1 if e.delta > 0 else 1, 'units'))
+        self.canvas.bind('<Button-4>', lambda e: self.canvas.yview('scroll', -1, 'units'))
+        self.canvas.bind('<Button-5>', lambda e: self.canvas.yview('scroll', 1, 'units'))
+        self.canvas.bind('<Button-1>', self._on_click)
+
+    def set_items(self, items):
+        for index in list(self.slots):
+            self._release(index)
+        self.items = list(items)
+        self.selected = None
+        self.canvas.yview_moveto(0)
+        self.columns = 0  # force a relayout
+        self._schedule()
+
+    def _on_scroll(self, first, last):
+        self.vbar.set(first, last)
+        self._schedule()
+
+    def _schedule(self):
+        if self.redraw_job is None:
+            self.redraw_job = self.after_idle(self.redraw)
+
+    def _acquire(self):
+        if self.pool:
+            slot = self.pool.pop()
+            for item in slot:
+                self.canvas.itemconfigure(item, state='normal')
+            return slot
+        return (self.canvas.create_rectangle(0, 0, 0, 0, outline='#ecf0f1', fill='#f8f9f9'),
+                self.canvas.create_image(0, 0, anchor='center'),
+                self.canvas.create_text(0, 0, anchor='n', font=('Arial', 8), width=self.tile))
+
+    def _release(self, index):
+        slot = self.slots.pop(index)
+        for item in slot:
+            self.canvas.itemconfigure(item, state='hidden')
+            self.item_index.pop(item, None)
+        self.canvas.itemconfigure(slot[1], image='')
+        self.pool.append(slot)
+        self.photos.pop(index, None)
+        request = self.requests.pop(index, None)
+        if request:
+            # Scrolled out before it arrived: let the pipeline drop the queued fetch
+            self.images.cancel(*request)
+
+    def _place(self, index, slot):
+        row, col = divmod(index, self.columns)
+        x0, y0 = col * self.cell_w + 4, row * self.cell_h + 4
+        rect, image, text = slot
+        self.canvas.coords(rect, x0, y0, x0 + self.cell_w - 8, y0 + self.cell_h - 8)
+        self.canvas.coords(image, x0 + (self.cell_w - 8) / 2, y0 + 4 + self.tile / 2)
+        self.canvas.coords(text, x0 + (self.cell_w - 8) / 2, y0 + self.tile + 8)
+        self.canvas.itemconfigure(rect, outline='#3498db' if index == self.selected else '#ecf0f1')
+
+    def redraw(self):
+        self.redraw_job = None
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        columns = max(1, width // self.cell_w)
+        relayout = columns != self.columns
+        self.columns = columns
+        rows = (len(self.items) + columns - 1) // columns
+        if relayout:
+            self.canvas.config(scrollregion=(0, 0, columns * self.cell_w, max(rows * self.cell_h, height)))
+        top = max(0, int(self.canvas.canvasy(0) // self.cell_h) - 1)
+        bottom = int(self.canvas.canvasy(height) // self.cell_h) + 2
+        wanted = range(top * columns, min(len(self.items), bottom * columns))
+        for index in [i for i in self.slots if i not in wanted]:
+            self._release(index)
+        for index in wanted:
+            if index in self.slots:
+                if relayout:
+                    self._place(index, self.slots[index])
+                continue
+            slot = self._acquire()
+            self.slots[index] = slot
+            for item in slot:
+                self.item_index[item] = index
+            self._place(index, slot)
+            entry = self.items[index]
+            label = entry.get('label', '')
+            self.canvas.itemconfigure(slot[2], text=label if len(label) <= 40 else label[:39] + '…')
+            if entry.get('url'):
+                self._request(index, entry)
+
+    def _request(self, index, entry):
+        def _show(photo, index=index):
+            if self.requests.get(index, (None, None))[1] is not _show or index not in self.slots:
+                return
+            self.requests.pop(index, None)
+            self.photos[index] = photo
+            self.canvas.itemconfigure(self.slots[index][1], image=photo)
+        self.requests[index] = (None, _show)
+        key = self.images.get(entry['url'], (self.tile, self.tile), _show, entry.get('cache_key'), entry.get('headers'))
+        if index in self.requests:
+            self.requests[index] = (key, _show)
+
+    def _on_click(self, event):
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        for item in reversed(self.canvas.find_overlapping(x, y, x, y)):
+            index = self.item_index.get(item)
+            if index is None:
+                continue
+            previous, self.selected = self.selected, index
+            for i in (previous, index):
+                if i in self.slots:
+                    self.canvas.itemconfigure(self.slots[i][0], outline='#3498db' if i == index else '#ecf0f1')
+            if self.on_select:
+                self.on_select(index)
+            return
+
+
+class DiscordClient:
+    """Discord REST client that follows the documented rate-limit model.
+
+    Routes are mapped to the bucket named by X-RateLimit-Bucket (scoped by the major
+    parameter: channel, guild or webhook). A bucket whose Remaining hits zero queues
+    its callers until Reset-After; 429s wait retry_after and are retried, and a global
+    limit pauses every request.
+    """
+    BASE = 'https://discord.com/api/v10'
+    MAJOR = re.compile(r'^/(channels|guilds|webhooks)/(\d+)')
+    SNOWFLAKE = re.compile(r'/\d{15,}')
+
+    def __init__(self, max_retries=5):
+        self.max_retries = max_retries
+        self.route_buckets = {}   # route -> bucket hash reported by Discord
+        self.buckets = {}         # bucket key -> state
+        self.global_reset_at = 0.0
+        self.lock = threading.Lock()
+
+    def _route(self, method, path):
+        major = self.MAJOR.match(path)
+        route = method + ' ' + self.SNOWFLAKE.sub('/{id}', path.split('?', 1)[0])
+        return route, (major.group(2) if major else '')
+
+    def _bucket(self, key):
+        with self.lock:
+            if key not in self.buckets:
+                self.buckets[key] = {'cond': threading.Condition(), 'remaining': None, 'reset_at': 0.0,
+                                     'probing': False, 'limited': True}
+            return self.buckets[key]
+
+    def _acquire(self, bucket):
+        # Callers of an exhausted bucket queue here until it resets. While a bucket's state is
+        # unknown only one request goes out, and its headers tell the rest how fast to go.
+        with bucket['cond']:
+            while bucket['limited']:
+                now = time.time()
+                if bucket['remaining'] is None:
+                    if not bucket['probing']:
+                        bucket['probing'] = True
+                        return
+                    bucket['cond'].wait(timeout=1.0)
+                elif bucket['remaining'] > 0:
+                    bucket['remaining'] -= 1
+                    return
+                elif bucket['reset_at'] <= now:
+                    bucket['remaining'] = None
+                else:
+                    bucket['cond'].wait(timeout=bucket['reset_at'] - now)
+
+    def request(self, method, path, headers, **kwargs):
+        route, major = self._route(method, path)
+        kwargs.setdefault('timeout', 15)
+        for attempt in range(self.max_retries + 1):
+            bucket = self._bucket(self.route_buckets.get(route, route) + ':' + major)
+            self._acquire(bucket)
+            wait = self.global_reset_at - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            resp = None
+            try:
+                resp = requests.request(method, self.BASE + path, headers=headers, **kwargs)
+            finally:
+                self._update(bucket, route, major, resp)
+            if resp.status_code != 429 or attempt == self.max_retries:
+                return resp
+            try:
+                body = resp.json()
+            except ValueError:
+                body = {}
+            retry_after = float(body.get('retry_after') or resp.headers.get('Retry-After') or 1)
+            if body.get('global') or resp.headers.get('X-RateLimit-Global'):
+                self.global_reset_at = time.time() + retry_after
+            else:
+                with bucket['cond']:
+                    bucket['remaining'], bucket['reset_at'] = 0, time.time() + retry_after
+        return resp
+
+    def _update(self, bucket, route, major, resp):
+        headers = resp.headers if resp is not None else {}
+        if headers.get('X-RateLimit-Bucket'):
+            self.route_buckets[route] = headers['X-RateLimit-Bucket']
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset_after = headers.get('X-RateLimit-Reset-After')
+        targets = [bucket]
+        named = self._bucket(self.route_buckets.get(route, route) + ':' + major)
+        if named is not bucket:
+            targets.append(named)
+        for target in targets:
+            with target['cond']:
+                target['probing'] = False
+                if remaining is not None and reset_after is not None:
+                    target['limited'] = True
+                    target['remaining'] = int(remaining)
+                    target['reset_at'] = time.time() + float(reset_after)
+                elif resp is not None and 200 <= resp.status_code < 300:
+                    # Only a successful response without rate-limit headers shows a route is ungated;
+                    # error responses often omit them even on limited routes
+                    target['limited'] = False
+                target['cond'].notify_all()
+
+    def get(self, path, headers, **kwargs):
+        return self.request('GET', path, headers, **kwargs)
+
+    def post(self, path, headers, **kwargs):
+        return self.request('POST', path, headers, **kwargs)
+
+
+class DiscordGateway:
+    """Bot gateway connection that keeps a live per-guild presence and member-count model.
+
+    Runs on its own thread: identifies with the GUILDS, GUILD_MEMBERS and GUILD_PRESENCES
+    intents, heartbeats, and on any disconnect reconnects and resumes the session so missed
+    events are replayed. Set DISCORD_GATEWAY_URL to point it at a local stand-in server.
+    """
+    INTENTS = (1 << 0) | (1 << 1) | (1 << 8)
+    FATAL_CLOSE_CODES = (4004, 4010, 4011, 4012, 4013, 4014)
+
+    def __init__(self, token, url=None, on_change=None):
+        self.token = token
+        self.url = url
+        self.on_change = on_change
+        self.guilds = {}  # guild id -> {'name', 'member_count', 'online': set of user ids}
+        self.lock = threading.Lock()
+        self.session_id = None
+        self.resume_url = None
+        self.seq = None
+        self.acked = True
+        self.ws = None
+        self.running = False
+        self.status = 'disconnected'
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self.running = False
+        if self.ws is not None:
+            try:
+                self.ws.close()
+            except Exception:
+                pass
+
+    def counts(self, guild_id):
+        """(online, members) for a guild, or None if the gateway has not seen it."""
+        with self.lock:
+            guild = self.guilds.get(str(guild_id))
+            return (len(guild['online']), guild['member_count']) if guild else None
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change()
+
+    def _run(self):
+        import websocket
+        backoff = 1
+        while self.running:
+            try:
+                if self.url:
+                    base = self.url
+                elif self.session_id and self.resume_url:
+                    base = self.resume_url
+                else:
+                    resp = requests.get('https://discord.com/api/v10/gateway/bot',
+                                        headers={'Authorization': f'Bot {self.token}'}, timeout=15)
+                    resp.raise_for_status()
+                    base = resp.json()['url']
+                self.ws = websocket.create_connection(base.rstrip('/') + '/?v=10&encoding=json', timeout=30)
+                self.ws.settimeout(None)
+                code = self._session(self.ws)
+                if code in self.FATAL_CLOSE_CODES:
+                    self.status = f'closed by Discord ({code})'
+                    self.running = False
+                elif code in (4007, 4009):
+                    # Sequence or session no longer valid: the next connection identifies afresh
+                    self.session_id, self.seq = None, None
+                backoff = 1
+            except Exception:
+                self.status = 'reconnecting'
+                self._changed()
+            finally:
+                self.ws = None
+            if self.running:
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+        if not self.status.startswith('closed'):
+            self.status = 'disconnected'
+        self._changed()
+
+    def _send(self, ws, payload):
+        ws.send(json.dumps(payload))
+
+    def _session(self, ws):
+        """Drive one connection; returns the close code (or None) once it ends."""
+        import websocket
+        hello = json.loads(ws.recv())
+        interval = hello['d']['heartbeat_interval'] / 1000
+        if self.session_id:
+            self._send(ws, {'op': 6, 'd': {'token': self.token, 'session_id': self.session_id, 'seq': self.seq}})
+        else:
+            self._send(ws, {'op': 2, 'd': {'token': self.token, 'intents': self.INTENTS,
+                                           'properties': {'os': os.name, 'browser': 'unifiedhub', 'device': 'unifiedhub'}}})
+        self.acked = True
+        stop = threading.Event()
+        threading.Thread(target=self._heartbeat, args=(ws, interval, stop), daemon=True).start()
+        try:
+            while self.running:
+                opcode, data = ws.recv_data(control_frame=True)
+                if opcode == websocket.ABNF.OPCODE_CLOSE:
+                    return struct.unpack('!H', data[:2])[0] if len(data) >= 2 else None
+                if opcode not in (websocket.ABNF.OPCODE_TEXT, websocket.ABNF.OPCODE_BINARY):
+                    continue
+                payload = json.loads(data)
+                if payload.get('s') is not None:
+                    self.seq = payload['s']
+                op = payload.get('op')
+                if op == 0:
+                    self._dispatch(payload.get('t'), payload.get('d') or {})
+                elif op == 1:
+                    self._send(ws, {'op': 1, 'd': self.seq})
+                elif op == 7:
+                    return None
+                elif op == 9:
+                    if not payload.get('d'):
+                        self.session_id, self.seq = None, None
+                    time.sleep(random.uniform(1, 5))
+                    return None
+                elif op == 11:
+                    self.acked = True
+        finally:
+            stop.set()
+            try:
+                ws.close()
+            except Exception:
+                pass
+        return None
+
+    def _heartbeat(self, ws, interval, stop):
+        delay = interval * random.random()
+        while not stop.wait(delay):
+            if not self.acked:
+                # No ACK since the last beat: the connection is a zombie, so drop it and resume
+                try:
+                    ws.close(status=4000)
+                except Exception:
+                    pass
+                return
+            self.acked = False
+            try:
+                self._send(ws, {'op': 1, 'd': self.seq})
+            except Exception:
+                return
+            delay = interval
+
+    def _dispatch(self, event, data):
+        with self.lock:
+            if event == 'READY':
+                self.session_id = data.get('session_id')
+                self.resume_url = data.get('resume_gateway_url')
+                self.status = 'connected'
+            elif event == 'RESUMED':
+                self.status = 'connected'
+            elif event == 'GUILD_CREATE':
+                self.guilds[data['id']] = {
+                    'name': data.get('name', ''),
+                    'member_count': data.get('member_count', 0),
+                    'online': {p['user']['id'] for p in data.get('presences', []) if p.get('status', 'offline') != 'offline'},
+                }
+            elif event == 'GUILD_UPDATE' and data.get('id') in self.guilds:
+                self.guilds[data['id']]['name'] = data.get('name', '')
+            elif event == 'GUILD_DELETE':
+                self.guilds.pop(data.get('id'), None)
+            elif event == 'PRESENCE_UPDATE' and data.get('guild_id') in self.guilds:
+                online = self.guilds[data['guild_id']]['online']
+                if data.get('status', 'offline') == 'offline':
+                    online.discard(data['user']['id'])
+                else:
+                    online.add(data['user']['id'])
+            elif event == 'GUILD_MEMBER_ADD' and data.get('guild_id') in self.guilds:
+                self.guilds[data['guild_id']]['member_count'] += 1
+            elif event == 'GUILD_MEMBER_REMOVE' and data.get('guild_id') in self.guilds:
+                guild = self.guilds[data['guild_id']]
+                guild['member_count'] = max(0, guild['member_count'] - 1)
+                guild['online'].discard(data['user']['id'])
+            else:
+                return
+        self._changed()
+
+
+class ContextWindow:
+    """Chat history that is sent to the model under a token budget.
+
+    Token counts are estimated once per message (about four characters per token).
+    window() returns the newest turns that fit the budget, prefixed by a summary of
+    older turns when one has been folded in, so request size stays roughly constant.
+    With summarize on, turns are only dropped once a summary covers them; until the
+    fold lands the window may run over budget rather than lose context.
+    """
+    def __init__(self, budget=8000, summarize=False):
+        self.budget = budget
+        self.summarize = summarize
+        self.messages = []  # (role, content, tokens)
+        self.summary = None  # (messages folded, text, tokens)
+        self.generation = 0  # bumped by clear() so late summaries are discarded
+        self.folding = False  # a summary request is in flight
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def estimate(text):
+        return len(text) // 4 + 4
+
+    def __len__(self):
+        return len(self.messages)
+
+    def append(self, role, content):
+        with self.lock:
+            self.messages.append((role, content, self.estimate(content)))
+
+    def pop(self):
+        with self.lock:
+            self.messages.pop()
+
+    def clear(self):
+        with self.lock:
+            self.messages = []
+            self.summary = None
+            self.generation += 1
+            self.folding = False
+
+    def _budget_start(self):
+        """Index of the oldest message that fits the budget next to the summary (0 if all fit)."""
+        _, _, summary_tokens = self.summary or (0, '', 0)
+        total, start = 0, len(self.messages)
+        while start > 0 and total + self.messages[start - 1][2] <= self.budget:
+            total += self.messages[start - 1][2]
+            start -= 1
+        if start == 0:
+            return 0
+        start = min(start, len(self.messages) - 1)
+        # Make room for the summary, never dropping the newest message
+        budget = self.budget - summary_tokens
+        while total > budget and start < len(self.messages) - 1:
+            total -= self.messages[start][2]
+            start += 1
+        # Begin on a user turn so the model never sees an orphaned reply
+        while start < len(self.messages) - 1 and self.messages[start][0] != 'user':
+            start += 1
+        return start
+
+    def _start(self):
+        """Index of the oldest message to send, and whether the summary goes with it."""
+        start = self._budget_start()
+        if start == 0:
+            return 0, False
+        folded = self.summary[0] if self.summary else 0
+        if self.summarize:
+            # Everything the summary does not cover yet is still sent
+            return folded, self.summary is not None
+        return max(start, folded), self.summary is not None
+
+    def window(self):
+        with self.lock:
+            start, with_summary = self._start()
+            messages = [{'role': role, 'content': content} for role, content, _ in self.messages[start:]]
+            if with_summary:
+                messages.insert(0, {'role': 'system', 'content': f"Summary of the earlier conversation: {self.summary[1]}"})
+            return messages
+
+    def overflow(self):
+        """(generation, folded, end, messages) that dropped out of the window but are not summarized yet."""
+        with self.lock:
+            start = self._budget_start()
+            folded = self.summary[0] if self.summary else 0
+            if start <= folded or self.folding:
+                return None
+            self.folding = True
+            return self.generation, folded, start, [(role, content) for role, content, _ in self.messages[folded:start]]
+
+    def previous_summary(self):
+        return self.summary[1] if self.summary else ''
+
+    def fold(self, generation, folded, end, text):
+        """Install a summary of messages[:end]; text None reports a failed summary request."""
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.folding = False
+            if text is None or (self.summary[0] if self.summary else 0) != folded:
+                return
+            self.summary = (end, text, self.estimate(text))
+
+
+class ConversationStore:
+    """Chat transcripts as append-only JSONL files plus a small index.
+
+    index.json holds each conversation's title, metadata, committed byte size and the
+    offsets of its most recent messages, so listing conversations never opens a
+    transcript and resuming one reads only its tail.
+    """
+    RECENT = 40
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.index = {}
+        try:
+            with open(os.path.join(directory, 'index.json'), 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def _path(self, conv_id):
+        return os.path.join(self.directory, f'{conv_id}.jsonl')
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, 'index.json')
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def list(self):
+        with self.lock:
+            return sorted(({'id': k, **v} for k, v in self.index.items()), key=lambda e: e['updated'], reverse=True)
+
+    def create(self, title, **meta):
+        with self.lock:
+            conv_id = f'{time.time_ns():x}'
+            self.index[conv_id] = {'title': title, 'updated': time.time(), 'count': 0, 'size': 0, 'recent': [], **meta}
+            self._save_index()
+            return conv_id
+
+    def update(self, conv_id, **meta):
+        with self.lock:
+            self.index[conv_id].update(meta)
+            self._save_index()
+
+    def append(self, conv_id, role, content):
+        line = (json.dumps({'role': role, 'content': content, 'ts': time.time()}, ensure_ascii=False) + '\n').encode('utf-8')
+        with self.lock:
+            entry = self.index[conv_id]
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._path(conv_id), 'ab') as f:
+                # Drop anything past the last indexed record, e.g. a line torn by a crash
+                f.truncate(entry['size'])
+                f.write(line)
+            entry['recent'] = (entry['recent'] + [entry['size']])[-self.RECENT:]
+            entry['size'] += len(line)
+            entry['count'] += 1
+            entry['updated'] = time.time()
+            self._save_index()
+
+    def load(self, conv_id):
+        """Return (earlier message count, recent messages) by seeking straight to the tail."""
+        with self.lock:
+            entry = dict(self.index[conv_id])
+        if not entry['recent']:
+            return 0, []
+        with open(self._path(conv_id), 'rb') as f:
+            f.seek(entry['recent'][0])
+            data = f.read(entry['size'] - entry['recent'][0])
+        messages = [json.loads(line) for line in data.splitlines() if line]
+        return entry['count'] - len(messages), messages
+
+    def delete(self, conv_id):
+        with self.lock:
+            self.index.pop(conv_id, None)
+            self._save_index()
+        try:
+            os.remove(self._path(conv_id))
+        except OSError:
+            pass
+
+
+class ResponseCache:
+    """Disk-backed LRU of model replies, keyed by a hash of everything that shapes them.
+
+    put() only marks the cache dirty; the caller writes it out with flush(), so a burst
+    of replies costs one rewrite of the file instead of one per reply.
+    """
+    def __init__(self, path, max_items=500):
+        self.path = path
+        self.max_items = max_items
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.dirty = False
+        self.items = OrderedDict()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.items = OrderedDict(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def key(model, messages, temperature, max_tokens):
+        blob = json.dumps([model, messages, temperature, max_tokens], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            value = self.items.get(key)
+            if value is not None:
+                self.items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """Store a reply; returns True if this made a clean cache dirty, i.e. a flush is now due."""
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_items:
+                self.items.popitem(last=False)
+            was_dirty, self.dirty = self.dirty, True
+            return not was_dirty
+
+    def flush(self):
+        with self.write_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                snapshot = list(self.items.items())
+                self.dirty = False
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                tmp = self.path + '.tmp'
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f, ensure_ascii=False)
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+
+
+class TrigramIndex:
+    """In-memory trigram index for fuzzy, prefix-friendly lookups over short strings.
+
+    Each document is split into tokens (names, email parts, phone digits); every token
+    is padded on the left so that typing the start of a word already matches.
+    search() ranks documents by the fraction of query trigrams they contain.
+    """
+    SPLIT = re.compile(r"[\s@._\-+,;:()<>]+")
+
+    def __init__(self):
+        self.postings = {}
+        self.doc_grams = {}
+
+    @classmethod
+    def grams(cls, text, query=False):
+        grams = set()
+        for token in cls.SPLIT.split(text.lower()):
+            if not token:
+                continue
+            # Queries are not right-padded: a partial word must still match the full one
+            padded = f"  {token}" if query else f"  {token} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return grams
+
+    def add(self, doc_id, fields):
+        self.remove(doc_id)
+        grams = set()
+        for field in fields:
+            if field:
+                grams |= self.grams(field)
+                digits = ''.join(ch for ch in field if ch.isdigit())
+                if len(digits) >= 3:
+                    grams |= self.grams(digits)
+        self.doc_grams[doc_id] = grams
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(doc_id)
+
+    def remove(self, doc_id):
+        for gram in self.doc_grams.pop(doc_id, ()):
+            docs = self.postings.get(gram)
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del self.postings[gram]
+
+    def search(self, query, limit=10):
+        grams = self.grams(query, query=True)
+        digits = ''.join(ch for ch in query if ch.isdigit())
+        if len(digits) >= 3 and digits != query.strip():
+            grams |= self.grams(digits, query=True)
+        if not grams:
+            return []
+        # Candidates come from the selective trigrams only (things like "com" or a shared
+        # area code match nearly everyone); every candidate is then scored on all of them
+        ranked = sorted(grams, key=lambda g: len(self.postings.get(g, ())))
+        cap = max(50, len(self.doc_grams) // 10)
+        selective = [g for g in ranked if len(self.postings.get(g, ())) <= cap] or ranked[:1]
+        candidates = set().union(*(self.postings.get(g, ()) for g in selective))
+        scored = ((len(grams & self.doc_grams[doc_id]), doc_id) for doc_id in candidates)
+        # Rank by trigram hits, then prefer shorter (more specific) documents
+        best = heapq.nsmallest(limit, scored, key=lambda item: (-item[0], len(self.doc_grams[item[1]])))
+        threshold = max(1, len(grams) // 2)
+        return [doc_id for hits, doc_id in best if hits >= threshold]
+
+
+class CalendarCanvas(tk.Frame):
+    """Week/month calendar drawn on a Canvas.
+
+    Overlapping timed events are packed into side-by-side columns with a sweep line.
+    Only events intersecting the visible part of the canvas own canvas items; those
+    items come from a pool and are handed back when an event scrolls out of view, so
+    scrolling touches just the rows entering or leaving the viewport.
+    """
+    HOUR_HEIGHT = 40
+    GUTTER = 48
+    HEADER = 22
+    ALLDAY_ROW = 16
+    CHIP = 15
+
+    def __init__(self, master, fetch_events, event_color=None, on_select=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.fetch_events = fetch_events
+        self.event_color = event_color or (lambda ev: '#3498db')
+        self.on_select = on_select
+        self.mode = 'week'
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.anchor = today - timedelta(days=today.weekday())
+        self.layout = []        # (key, day, y0, y1, col, ncols, event) for timed events
+        self.allday = []        # (key, first_day, last_day, row, event)
+        self.allday_rows = 0
+        self.month_cells = []   # per cell: list of events starting that day
+        self.drawn = {}         # layout key -> (canvas, rect, text)
+        self.item_events = {}
+        self.grid_items = {'week': [], 'month': []}
+        self.redraw_job = None
+        self.size = (0, 0)
+
+        bar = tk.Frame(self)
+        bar.pack(fill=tk.X)
+        tk.Button(bar, text="◀", command=lambda: self.shift(-1)).pack(side=tk.LEFT, padx=2)
+        tk.Button(bar, text="Today", command=self.go_today).pack(side=tk.LEFT, padx=2)
+        tk.Button(bar, text="▶", command=lambda: self.shift(1)).pack(side=tk.LEFT, padx=2)
+        self.mode_btn = tk.Button(bar, text="Month", command=self.toggle_mode)
+        self.mode_btn.pack(side=tk.LEFT, padx=8)
+        self.title = tk.Label(bar, text="", font=('Arial', 10, 'bold'))
+        self.title.pack(side=tk.LEFT, padx=8)
+
+        self.header = tk.Canvas(self, bg='#ecf0f1', height=self.HEADER, highlightthickness=0)
+        self.pools = {self.header: []}
+        self.header.pack(fill=tk.X)
+        body = tk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.canvas = tk.Canvas(body, bg='white', highlightthickness=0)
+        self.pools[self.canvas] = []
+        self.vbar = tk.Scrollbar(body, orient=tk.VERTICAL, command=self.yview)
+        self.canvas.config(yscrollcommand=self._on_scroll)
+        self.vbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.canvas.bind('<Configure>', self._on_resize)
+        self.canvas.bind('<MouseWheel>', lambda e: self.yview('scroll', -1 if e.delta > 0 else 1, 'units'))
+        self.canvas.bind('<Button-4>', lambda e: self.yview('scroll', -1, 'units'))
+        self.canvas.bind('<Button-5>', lambda e: self.yview('scroll', 1, 'units'))
+        self.canvas.bind('<Button-1>', lambda e: self._on_click(self.canvas, e))
+        self.header.bind('<Button-1>', lambda e: self._on_click(self.header, e))
+
+    # --- navigation -------------------------------------------------------
+    def range(self):
+        if self.mode == 'week':
+            return self.anchor, self.anchor + timedelta(days=7)
+        first = self.anchor.replace(day=1)
+        start = first - timedelta(days=first.weekday())
+        return start, start + timedelta(days=42)
+
+    def shift(self, step):
+        if self.mode == 'week':
+            self.anchor += timedelta(days=7 * step)
+        else:
+            month = self.anchor.month - 1 + step
+            self.anchor = self.anchor.replace(year=self.anchor.year + month // 12, month=month % 12 + 1, day=1)
+        self.refresh()
+
+    def go_today(self):
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.anchor = today - timedelta(days=today.weekday()) if self.mode == 'week' else today.replace(day=1)
+        self.refresh()
+
+    def toggle_mode(self):
+        self.mode = 'month' if self.mode == 'week' else 'week'
+        self.mode_btn.config(text="Week" if self.mode == 'month' else "Month")
+        if self.mode == 'month':
+            self.anchor = (self.anchor + timedelta(days=3)).replace(day=1)
+        else:
+            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            first = self.anchor.replace(day=1)
+            pick = today if (today.year, today.month) == (first.year, first.month) else first
+            self.anchor = pick - timedelta(days=pick.weekday())
+        self.size = (0, 0)
+        self.refresh()
+
+    # --- data and layout --------------------------------------------------
+    @staticmethod
+    def _bounds(event):
+        """(start, end, all_day) as naive local datetimes."""
+        def parse(value):
+            if value.get('dateTime'):
+                dt = datetime.fromisoformat(value['dateTime'].replace('Z', '+00:00'))
+                return (dt.astimezone().replace(tzinfo=None) if dt.tzinfo else dt), False
+            return datetime.strptime(value['date'], '%Y-%m-%d'), True
+        start, all_day = parse(event.get('start', {}))
+        end = parse(event.get('end', {}))[0] if event.get('end') else start
+        if end <= start:
+            end = start + (timedelta(days=1) if all_day else timedelta(minutes=30))
+        return start, end, all_day
+
+    @staticmethod
+    def pack_columns(intervals):
+        """Sweep-line column assignment for (start, end, key) intervals.
+
+        Returns {key: (column, columns_in_cluster)}. A cluster is a maximal run of
+        transitively overlapping intervals; freed columns are reused lowest-first.
+        """
+        placed, cluster = {}, []
+        active, free, ncols = [], [], 0
+        for start, end, key in sorted(intervals, key=lambda iv: (iv[0], -iv[1])):
+            while active and active[0][0] <= start:
+                heapq.heappush(free, heapq.heappop(active)[1])
+            if not active and cluster:
+                for k, col in cluster:
+                    placed[k] = (col, ncols)
+                cluster, free, ncols = [], [], 0
+            if free:
+                col = heapq.heappop(free)
+            else:
+                col, ncols = ncols, ncols + 1
+            heapq.heappush(active, (end, col))
+            cluster.append((key, col))
+        for k, col in cluster:
+            placed[k] = (col, ncols)
+        return placed
+
+    def set_events(self, events):
+        """Lay out events for the current range and redraw."""
+        start, end = self.range()
+        days = (end - start).days
+        self.layout, self.allday = [], []
+        self.month_cells = [[] for _ in range(days)]
+        per_day = [[] for _ in range(days)]
+        allday_rows = []  # last occupied day per header row
+        for ev in events:
+            try:
+                ev_start, ev_end, all_day = self._bounds(ev)
+            except (KeyError, ValueError):
+                continue
+            first = max(0, (ev_start - start).days)
+            if first >= days or ev_end <= start:
+                continue
+            self.month_cells[first].append(ev)
+            if all_day or ev_end - ev_start >= timedelta(days=1):
+                last = min(days - 1, (ev_end - timedelta(seconds=1) - start).days)
+                row = next((r for r, busy in enumerate(allday_rows) if busy < first), len(allday_rows))
+                if row == len(allday_rows):
+                    allday_rows.append(last)
+                allday_rows[row] = last
+                self.allday.append((('a', ev.get('id'), first), first, last, row, ev))
+                continue
+            # Timed events crossing midnight are clipped into each day they touch
+            day = first
+            while day < days:
+                day_start = start + timedelta(days=day)
+                lo = max(ev_start, day_start)
+                hi = min(ev_end, day_start + timedelta(days=1))
+                if hi <= lo:
+                    break
+                per_day[day].append(((lo - day_start).total_seconds(), (hi - day_start).total_seconds(), (ev.get('id'), day, ev)))
+                day += 1
+        for day, intervals in enumerate(per_day):
+            packed = self.pack_columns([(s, e, k[:2]) for s, e, k in intervals])
+            for s, e, (eid, _, ev) in intervals:
+                col, ncols = packed[(eid, day)]
+                y0 = s / 3600 * self.HOUR_HEIGHT
+                y1 = max(y0 + 12, e / 3600 * self.HOUR_HEIGHT)
+                self.layout.append((('t', eid, day), day, y0, y1, col, ncols, ev))
+        self.layout.sort(key=lambda item: item[2])
+        self.allday_rows = len(allday_rows)
+        self._release_all()
+        self.size = (0, 0)
+        self.redraw()
+
+    def refresh(self):
+        start, end = self.range()
+        if self.mode == 'week':
+            label = f"{start.strftime('%b %d')} – {(end - timedelta(days=1)).strftime('%b %d, %Y')}"
+        else:
+            label = self.anchor.strftime('%B %Y')
+        self.title.config(text=label)
+        self.set_events(self.fetch_events(start.timestamp(), end.timestamp()))
+
+    # --- drawing ----------------------------------------------------------
+    def _acquire(self, canvas):
+        if self.pools[canvas]:
+            rect, text = self.pools[canvas].pop()
+            canvas.itemconfigure(rect, state='normal')
+            canvas.itemconfigure(text, state='normal')
+            return rect, text
+        rect = canvas.create_rectangle(0, 0, 0, 0, outline='white')
+        text = canvas.create_text(0, 0, anchor='nw', font=('Arial', 8), fill='white')
+        return rect, text
+
+    def _release(self, key):
+        canvas, rect, text = self.drawn.pop(key)
+        canvas.itemconfigure(rect, state='hidden')
+        canvas.itemconfigure(text, state='hidden')
+        self.item_events.pop(rect, None)
+        self.item_events.pop(text, None)
+        self.pools[canvas].append((rect, text))
+
+    def _release_all(self):
+        for key in list(self.drawn):
+            self._release(key)
+
+    def _place(self, key, canvas, coords, label, event, full):
+        """Ensure key has items at coords; untouched items are left alone unless full."""
+        if key in self.drawn and not full:
+            return
+        if key in self.drawn:
+            _, rect, text = self.drawn[key]
+        else:
+            rect, text = self._acquire(canvas)
+            self.drawn[key] = (canvas, rect, text)
+        x0, y0, x1, y1 = coords
+        canvas.coords(rect, x0, y0, x1, y1)
+        canvas.coords(text, x0 + 2, y0 + 1)
+        chars = max(0, int((x1 - x0 - 4) // 6))
+        canvas.itemconfigure(rect, fill=self.event_color(event) if event else '#ecf0f1')
+        canvas.itemconfigure(text, text=label[:chars], width=max(1, x1 - x0 - 4),
+                             fill='white' if event else '#2c3e50')
+        canvas.tag_raise(rect)
+        canvas.tag_raise(text)
+        self.item_events[rect] = self.item_events[text] = event
+
+    def _grid(self, count, create):
+        """Reusable background items for the current mode, grown on demand."""
+        items = self.grid_items[self.mode]
+        while len(items) < count:
+            items.append(create())
+        return items
+
+    def _on_resize(self, event):
+        self._schedule(full=True)
+
+    def _on_scroll(self, first, last):
+        self.vbar.set(first, last)
+        self._schedule(full=False)
+
+    def _schedule(self, full):
+        # Coalesce bursts of scroll/resize events into one pass per idle cycle
+        if full:
+            self.size = (0, 0)
+        if self.redraw_job is None:
+            self.redraw_job = self.after_idle(self.redraw)
+
+    def yview(self, *args):
+        if self.mode == 'week':
+            self.canvas.yview(*args)
+
+    def redraw(self):
+        self.redraw_job = None
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        full = (width, height) != self.size
+        self.size = (width, height)
+        if full:
+            for mode, items in self.grid_items.items():
+                state = 'normal' if mode == self.mode else 'hidden'
+                for item in items:
+                    (self.header if item[0] == 'h' else self.canvas).itemconfigure(item[1], state=state)
+        if self.mode == 'week':
+            self._draw_week(width, height, full)
+        else:
+            self._draw_month(width, height, full)
+
+    def _draw_week(self, width, height, full):
+        start, _ = self.range()
+        day_w = max(20, (width - self.GUTTER) / 7)
+        total = 24 * self.HOUR_HEIGHT
+        header_h = self.HEADER + min(self.allday_rows, 3) * self.ALLDAY_ROW
+        if full:
+            self.header.config(height=header_h)
+            self.canvas.config(scrollregion=(0, 0, width, total))
+            items = self._grid(24 + 8 + 24 + 7, lambda: None)
+            for i in range(len(items)):
+                if items[i] is None:
+                    if i < 32:
+                        items[i] = ('c', self.canvas.create_line(0, 0, 0, 0, fill='#ecf0f1'))
+                    elif i < 56:
+                        items[i] = ('c', self.canvas.create_text(0, 0, anchor='ne', font=('Arial', 8), fill='#7f8c8d'))
+                    else:
+                        items[i] = ('h', self.header.create_text(0, 0, anchor='n', font=('Arial', 9, 'bold')))
+            for hour in range(24):
+                y = hour * self.HOUR_HEIGHT
+                self.canvas.coords(items[hour][1], self.GUTTER, y, width, y)
+                self.canvas.coords(items[32 + hour][1], self.GUTTER - 4, y + 2)
+                self.canvas.itemconfigure(items[32 + hour][1], text=f"{hour:02d}:00")
+            for day in range(8):
+                x = self.GUTTER + day * day_w
+                self.canvas.coords(items[24 + day][1], x, 0, x, total)
+            today = datetime.now().date()
+            for day in range(7):
+                date = start + timedelta(days=day)
+                item = items[56 + day][1]
+                self.header.coords(item, self.GUTTER + (day + 0.5) * day_w, 3)
+                self.header.itemconfigure(item, text=date.strftime('%a %d'),
+                                          fill='#e74c3c' if date.date() == today else '#2c3e50')
+            if not self.drawn and self.layout:
+                # First paint of a week: start at the earliest event of the morning
+                self.canvas.yview_moveto(max(0, min(8 * self.HOUR_HEIGHT, self.layout[0][2] - 10)) / total)
+            wanted = {}
+            for key, first, last, row, ev in self.allday:
+                if row >= 3:
+                    continue
+                y0 = self.HEADER + row * self.ALLDAY_ROW
+                coords = (self.GUTTER + first * day_w + 1, y0, self.GUTTER + (last + 1) * day_w - 2, y0 + self.ALLDAY_ROW - 2)
+                wanted[key] = (self.header, coords, ev.get('summary', 'Untitled'), ev)
+            overflow = sum(1 for item in self.allday if item[3] >= 3)
+            if overflow:
+                wanted[('more',)] = (self.header, (2, self.HEADER, self.GUTTER - 2, self.HEADER + self.ALLDAY_ROW - 2), f"+{overflow}", None)
+        else:
+            wanted = {key: None for key, item in self.drawn.items() if item[0] is self.header}
+
+        # Cull timed events to the viewport (plus a margin) and only touch what changed
+        top = self.canvas.canvasy(0) - self.HOUR_HEIGHT
+        bottom = self.canvas.canvasy(height) + self.HOUR_HEIGHT
+        stop = bisect.bisect_right(self.layout, bottom, key=lambda item: item[2]) if self.layout else 0
+        for key, day, y0, y1, col, ncols, ev in self.layout[:stop]:
+            if y1 < top:
+                continue
+            x0 = self.GUTTER + day * day_w + col * day_w / ncols
+            coords = (x0 + 1, y0 + 1, x0 + day_w / ncols - 1, y1 - 1)
+            wanted[key] = (self.canvas, coords, ev.get('summary', 'Untitled'), ev)
+        for key in [k for k in self.drawn if k not in wanted]:
+            self._release(key)
+        for key, spec in wanted.items():
+            if spec is not None:
+                self._place(key, spec[0], spec[1], spec[2], spec[3], full)
+
+    def _draw_month(self, width, height, full):
+        if not full:
+            return
+        start, _ = self.range()
+        cell_w, cell_h = width / 7, max(40, height / 6)
+        self.header.config(height=self.HEADER)
+        self.canvas.config(scrollregion=(0, 0, width, height))
+        self.canvas.yview_moveto(0)
+        items = self._grid(42 * 2 + 7, lambda: None)
+        for i in range(len(items)):
+            if items[i] is None:
+                if i < 42:
+                    items[i] = ('c', self.canvas.create_rectangle(0, 0, 0, 0, outline='#ecf0f1'))
+                elif i < 84:
+                    items[i] = ('c', self.canvas.create_text(0, 0, anchor='nw', font=('Arial', 8)))
+                else:
+                    items[i] = ('h', self.header.create_text(0, 0, anchor='n', font=('Arial', 9, 'bold')))
+        today = datetime.now().date()
+        for day in range(7):
+            self.header.coords(items[84 + day][1], (day + 0.5) * cell_w, 3)
+            self.header.itemconfigure(items[84 + day][1], text=(start + timedelta(days=day)).strftime('%a'), fill='#2c3e50')
+        per_cell = max(0, int((cell_h - 16) // self.CHIP))
+        wanted = {}
+        for cell in range(42):
+            date = start + timedelta(days=cell)
+            x0, y0 = (cell % 7) * cell_w, (cell // 7) * cell_h
+            self.canvas.coords(items[cell][1], x0, y0, x0 + cell_w, y0 + cell_h)
+            self.canvas.itemconfigure(items[cell][1], fill='#fdfefe' if date.month == self.anchor.month else '#f4f6f6')
+            self.canvas.coords(items[42 + cell][1], x0 + 3, y0 + 2)
+            self.canvas.itemconfigure(items[42 + cell][1], text=str(date.day),
+                                      fill='#e74c3c' if date.date() == today else '#2c3e50')
+            events = self.month_cells[cell] if cell < len(self.month_cells) else []
+            shown = events if len(events) <= per_cell else events[:max(0, per_cell - 1)]
+            for slot, ev in enumerate(shown):
+                y = y0 + 16 + slot * self.CHIP
+                wanted[('m', cell, slot)] = ((x0 + 2, y, x0 + cell_w - 2, y + self.CHIP - 1), ev.get('summary', 'Untitled'), ev)
+            if len(shown) < len(events):
+                y = y0 + 16 + len(shown) * self.CHIP
+                wanted[('m', cell, 'more')] = ((x0 + 2, y, x0 + cell_w - 2, y + self.CHIP - 1), f"+{len(events) - len(shown)} more", None)
+        for key in [k for k in self.drawn if k not in wanted]:
+            self._release(key)
+        for key, (coords, label, ev) in wanted.items():
+            self._place(key, self.canvas, coords, label, ev, True)
+
+    def _on_click(self, canvas, event):
+        if not self.on_select:
+            return
+        x, y = canvas.canvasx(event.x), canvas.canvasy(event.y)
+        for item in reversed(canvas.find_overlapping(x, y, x, y)):
+            ev = self.item_events.get(item)
+            if ev:
+                self.on_select(ev)
+                return
+
+
 class DashboardApp:
     def __init__(self, root):
         self.root = root
@@ -73,12 +1537,49 @@ class DashboardApp:
         
         self.discord_servers = []
         self.discord_btn = None
+        self.discord = DiscordClient()
+        self.discord_count_cache = {}  # guild id -> (fetched at, online count)
+        self.discord_gateway = None
+        self.discord_gateway_job = None
+        self.dm_channels = self._load_cache('discord_dm_channels.json', {})  # user id -> DM channel id
+        self.dm_channels_lock = threading.Lock()
         self.templates_file = os.path.join(os.path.dirname(__file__), 'templates.json')
         self.sysmon_job = None
 
         self.settings_file = os.path.join(os.path.dirname(__file__), 'settings.json')
         self.settings = self.load_settings()
         self.dark_mode = self.settings.get('dark_mode', False)
+
+        # Local calendar event store, kept current with events.list syncToken deltas
+        self.calendar_store = self._load_cache('calendar_store.json', {'calendars': {}})
+        if self.calendar_store.get('version') != 2:
+            # Stores written before local recurrence expansion hold server-expanded instances
+            for cal in self.calendar_store['calendars'].values():
+                cal['sync_token'], cal['events'] = None, {}
+            self.calendar_store['version'] = 2
+        self.calendar_index = {}
+        self.calendar_recurring = {}
+        self.calendar_overrides = {}
+        self.calendar_span = {}  # calendar id -> longest one-off event, for overlap queries
+        self.recurrence_cache = OrderedDict()
+        self.freebusy_cache = {}  # (calendars, start, end) -> (fetched at, busy tree)
+        self.calendar_lock = threading.Lock()
+        self.calendar_sync_lock = threading.Lock()
+        self.calendar_last_sync = 0
+        self._rebuild_calendar_index()
+
+        # Local Google Tasks store, refreshed with per-list updatedMin deltas
+        self.tasks_store = self._load_cache('tasks_store.json', {'lists': {}})
+        self.tasks_lock = threading.Lock()
+
+        # Local contacts store (People API syncToken deltas) with a fuzzy search index
+        self.contacts_store = self._load_cache('contacts_store.json', {'sync_token': None, 'people': {}})
+        self.contacts_lock = threading.Lock()
+        self.contacts_index = TrigramIndex()
+        self.images = ImagePipeline(self.root, os.path.join('cache', 'images'))
+        self.text_images = {}
+        for resource, person in self.contacts_store['people'].items():
+            self.contacts_index.add(resource, self._contact_fields(person))
         
         self.setup_ui()
         self.apply_settings_to_widgets()
@@ -136,6 +1637,7 @@ class DashboardApp:
         self.setup_quotes_tab()
         self.setup_website_viewer_tab()
         self.setup_settings_tab()
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_main_tab_changed)
     
     def setup_google_tab(self):
         google_frame = ttk.Frame(self.notebook)
@@ -192,10 +1694,22 @@ class DashboardApp:
         tk.Button(cal_controls, text="Load", command=self.load_calendar_data).pack(side=tk.LEFT, padx=5)
         tk.Button(cal_controls, text="New Event", command=self.create_calendar_event).pack(side=tk.LEFT, padx=5)
         tk.Button(cal_controls, text="Delete Selected", command=self.delete_selected_calendar_event).pack(side=tk.LEFT, padx=5)
+        tk.Button(cal_controls, text="Calendars", command=self.choose_visible_calendars).pack(side=tk.LEFT, padx=5)
+        tk.Button(cal_controls, text="Find Slot", command=self.open_slot_finder).pack(side=tk.LEFT, padx=5)
+        tk.Button(cal_controls, text="Import ICS", command=self.import_calendar_ics).pack(side=tk.LEFT, padx=5)
+        tk.Button(cal_controls, text="Export ICS", command=self.export_calendar_ics).pack(side=tk.LEFT, padx=5)
         self.calendar_text = scrolledtext.ScrolledText(cal_tab, height=25, wrap=tk.WORD, bg='white', fg='#2c3e50', font=('Courier', 9))
         self.calendar_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         self.calendar_text.config(state=tk.DISABLED)
 
+        # Calendar week/month view, drawn from the same local store
+        cal_view_tab = ttk.Frame(inner)
+        inner.add(cal_view_tab, text="Week/Month")
+        self.calendar_view = CalendarCanvas(cal_view_tab, self._calendar_events_between,
+                                            event_color=self._calendar_event_color,
+                                            on_select=self.show_calendar_event)
+        self.calendar_view.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
         # Tasks tab
         tasks_tab = ttk.Frame(inner)
         inner.add(tasks_tab, text="Tasks")
@@ -203,7 +1717,8 @@ class DashboardApp:
         tasks_controls.pack(fill=tk.X, padx=8, pady=6)
         tk.Button(tasks_controls, text="Load", command=self.load_tasks_data).pack(side=tk.LEFT, padx=5)
         tk.Button(tasks_controls, text="New Task", command=self.create_task).pack(side=tk.LEFT, padx=5)
-        tk.Button(tasks_controls, text="Mark Selected Complete", command=self.complete_selected_task).pack(side=tk.LEFT, padx=5)
+        tk.Button(tasks_controls, text="Bulk Actions", command=self.open_task_bulk_actions).pack(side=tk.LEFT, padx=5)
+        tk.Button(tasks_controls, text="Paste Tasks", command=self.bulk_create_tasks).pack(side=tk.LEFT, padx=5)
         self.tasks_text = scrolledtext.ScrolledText(tasks_tab, height=25, wrap=tk.WORD, bg='white', fg='#2c3e50', font=('Courier', 9))
         self.tasks_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         self.tasks_text.config(state=tk.DISABLED)
@@ -230,6 +1745,9 @@ class DashboardApp:
         tk.Button(drive_controls, text="Find", command=self.search_drive_files).pack(side=tk.LEFT, padx=5)
         tk.Button(drive_controls, text="Open in Browser", command=self.open_selected_drive_in_browser).pack(side=tk.LEFT, padx=5)
         tk.Button(drive_controls, text="Download", command=self.download_selected_drive_file).pack(side=tk.LEFT, padx=5)
+        tk.Button(drive_controls, text="Export Selected", command=self.export_selected_drive_files).pack(side=tk.LEFT, padx=5)
+        self.drive_grid_btn = tk.Button(drive_controls, text="Grid View", command=self.toggle_drive_grid)
+        self.drive_grid_btn.pack(side=tk.LEFT, padx=5)
         drive_content = tk.Frame(drive_tab)
         drive_content.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         left = tk.Frame(drive_content)
@@ -237,10 +1755,12 @@ class DashboardApp:
         tk.Label(left, text="Files:").pack(anchor=tk.W)
         dscroll = tk.Scrollbar(left)
         dscroll.pack(side=tk.RIGHT, fill=tk.Y)
-        self.drive_listbox = tk.Listbox(left, yscrollcommand=dscroll.set)
+        self.drive_listbox = tk.Listbox(left, yscrollcommand=dscroll.set, selectmode=tk.EXTENDED)
         self.drive_listbox.pack(fill=tk.BOTH, expand=True)
         dscroll.config(command=self.drive_listbox.yview)
         self.drive_listbox.bind('<<ListboxSelect>>', self.on_drive_file_select)
+        self.drive_list_frame = left
+        self.drive_grid = ThumbnailGrid(drive_content, self.images, on_select=self.on_drive_grid_select)
 
         right = tk.Frame(drive_content, width=420)
         right.pack(side=tk.RIGHT, fill=tk.BOTH, padx=10)
@@ -266,6 +1786,8 @@ class DashboardApp:
         yt_controls = tk.Frame(youtube_tab)
         yt_controls.pack(fill=tk.X, padx=8, pady=6)
         tk.Button(yt_controls, text="Load Subscriptions", command=self.load_youtube_subscriptions).pack(side=tk.LEFT, padx=5)
+        self.youtube_feed_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(yt_controls, text="Latest uploads feed", variable=self.youtube_feed_var).pack(side=tk.LEFT, padx=5)
         self.youtube_text = scrolledtext.ScrolledText(youtube_tab, height=20, wrap=tk.WORD, bg='white', fg='#2c3e50', font=('Courier', 9))
         self.youtube_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         self.youtube_text.config(state=tk.DISABLED)
@@ -276,6 +1798,10 @@ class DashboardApp:
         contacts_controls = tk.Frame(contacts_tab)
         contacts_controls.pack(fill=tk.X, padx=8, pady=6)
         tk.Button(contacts_controls, text="Load Contacts", command=self.load_google_contacts).pack(side=tk.LEFT, padx=5)
+        tk.Label(contacts_controls, text="Search:").pack(side=tk.LEFT, padx=(15, 5))
+        self.contacts_search = tk.Entry(contacts_controls, width=40)
+        self.contacts_search.pack(side=tk.LEFT, padx=5)
+        self.contacts_search.bind('<KeyRelease>', lambda e: self.render_contacts())
         self.contacts_text = scrolledtext.ScrolledText(contacts_tab, height=20, wrap=tk.WORD, bg='white', fg='#2c3e50', font=('Courier', 9))
         self.contacts_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         self.contacts_text.config(state=tk.DISABLED)
@@ -325,6 +1851,31 @@ class DashboardApp:
         self.drive_upload_status = tk.Label(drive_tab, text="Select a file to upload", bg='#ecf0f1', fg='#2c3e50')
         self.drive_upload_status.pack(fill=tk.X, padx=10, pady=4)
 
+        # Two-way folder sync
+        sync_frame = tk.LabelFrame(drive_tab, text="Folder Sync", padx=8, pady=6)
+        sync_frame.pack(fill=tk.X, padx=10, pady=10)
+        tk.Label(sync_frame, text="Local folder:").grid(row=0, column=0, sticky='w', padx=4, pady=4)
+        self.drive_sync_local = tk.StringVar(value=self.settings.get('drive_sync_local', ''))
+        tk.Entry(sync_frame, textvariable=self.drive_sync_local, width=50).grid(row=0, column=1, sticky='we', padx=4, pady=4)
+        tk.Button(sync_frame, text="Choose", command=self.select_drive_sync_folder).grid(row=0, column=2, padx=4, pady=4)
+        tk.Label(sync_frame, text="Drive folder ID:").grid(row=1, column=0, sticky='w', padx=4, pady=4)
+        self.drive_sync_remote = tk.StringVar(value=self.settings.get('drive_sync_remote', 'root'))
+        tk.Entry(sync_frame, textvariable=self.drive_sync_remote, width=50).grid(row=1, column=1, sticky='we', padx=4, pady=4)
+        sync_btns = tk.Frame(sync_frame)
+        sync_btns.grid(row=2, column=1, sticky='w', padx=4, pady=4)
+        tk.Button(sync_btns, text="Sync Now", command=self.sync_drive_folder, bg='#34a853', fg='white').pack(side=tk.LEFT, padx=5)
+        tk.Button(sync_btns, text="Start Watching", command=self.start_drive_sync_watch).pack(side=tk.LEFT, padx=5)
+        tk.Button(sync_btns, text="Stop Watching", command=self.stop_drive_sync_watch).pack(side=tk.LEFT, padx=5)
+        tk.Label(sync_frame, text="Deletions are not synced: a file deleted on one side is copied back from the other.",
+                 fg='#7f8c8d').grid(row=3, column=1, sticky='w', padx=4)
+        sync_frame.columnconfigure(1, weight=1)
+        self.drive_sync_status = tk.Label(drive_tab, text="Folder not synced yet", bg='#ecf0f1', fg='#2c3e50')
+        self.drive_sync_status.pack(fill=tk.X, padx=10, pady=4)
+        self.drive_sync_job = None
+        self.drive_sync_running = False
+        self.drive_sync_signature = None
+        self.drive_sync_scanning = False
+
         # Calendar Agenda tab
         agenda_tab = ttk.Frame(inner)
         inner.add(agenda_tab, text="Agenda")
@@ -561,6 +2112,7 @@ class DashboardApp:
     def setup_discord_tab(self):
         discord_frame = ttk.Frame(self.notebook)
         self.notebook.add(discord_frame, text="🟣 Discord")
+        self.discord_frame = discord_frame
 
         # Inner notebook for Discord sub-tabs
         inner = ttk.Notebook(discord_frame)
@@ -573,6 +2125,10 @@ class DashboardApp:
         hdr = tk.Frame(servers_tab, bg='#ecf0f1')
         hdr.pack(fill=tk.X, padx=10, pady=10)
         tk.Button(hdr, text="Load Servers", command=self.load_discord_servers).pack(side=tk.LEFT, padx=5)
+        tk.Button(hdr, text="Refresh", command=lambda: self.load_discord_servers(force=True)).pack(side=tk.LEFT, padx=5)
+        tk.Button(hdr, text="My Apps", command=self.load_discord_apps).pack(side=tk.LEFT, padx=5)
+        self.discord_live_btn = tk.Button(hdr, text="Go Live", command=self.toggle_discord_gateway)
+        self.discord_live_btn.pack(side=tk.LEFT, padx=5)
 
         content = tk.Frame(servers_tab)
         content.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -585,7 +2141,10 @@ class DashboardApp:
         self.discord_listbox = tk.Listbox(list_frame, yscrollcommand=scrollbar.set)
         self.discord_listbox.pack(fill=tk.BOTH, expand=True)
         scrollbar.config(command=self.discord_listbox.yview)
-        self.discord_listbox.bind('<<ListboxSelect>>', self.on_discord_server_select)
+        # The list shows either servers or apps; background refreshes only redraw the view on screen
+        self.discord_list_view = 'servers'
+        self.discord_apps_cache = []
+        self.discord_listbox.bind('<<ListboxSelect>>', self.on_discord_list_select)
 
         detail_frame = tk.Frame(content, width=380)
         detail_frame.pack(side=tk.RIGHT, fill=tk.BOTH, padx=10)
@@ -596,6 +2155,31 @@ class DashboardApp:
         self.discord_details.pack(fill=tk.BOTH, expand=True)
         self.discord_details.config(state=tk.DISABLED)
 
+        # Channel messages tab
+        messages_tab = ttk.Frame(inner)
+        inner.add(messages_tab, text="Messages")
+        msg_controls = tk.Frame(messages_tab, bg='#ecf0f1')
+        msg_controls.pack(fill=tk.X, padx=10, pady=10)
+        tk.Label(msg_controls, text="Server:", bg='#ecf0f1').pack(side=tk.LEFT, padx=4)
+        self.discord_msg_guild = ttk.Combobox(msg_controls, state='readonly', width=30)
+        self.discord_msg_guild.pack(side=tk.LEFT, padx=4)
+        tk.Button(msg_controls, text="Load Channels", command=self.load_discord_channels).pack(side=tk.LEFT, padx=4)
+        tk.Button(msg_controls, text="Load Older", command=self.load_older_discord_messages).pack(side=tk.LEFT, padx=4)
+        tk.Button(msg_controls, text="Refresh", command=self.refresh_discord_messages).pack(side=tk.LEFT, padx=4)
+        self.discord_msg_status = tk.Label(msg_controls, text="Requires DISCORD_BOT_TOKEN with Message Content intent", bg='#ecf0f1')
+        self.discord_msg_status.pack(side=tk.LEFT, padx=10)
+        msg_body = tk.Frame(messages_tab)
+        msg_body.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.discord_channel_list = tk.Listbox(msg_body, width=28, exportselection=False)
+        self.discord_channel_list.pack(side=tk.LEFT, fill=tk.Y)
+        self.discord_channel_list.bind('<<ListboxSelect>>', self.on_discord_channel_select)
+        self.discord_msg_grid = VirtualGrid(msg_body)
+        self.discord_msg_grid.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(8, 0))
+        self.discord_msg_grid.set_columns(["Time", "Author", "Message"], widths=[130, 140, 900])
+        self.discord_channels = []
+        self.discord_msg_channel = None
+        self.discord_msg_busy = False
+
         # DM tab
         dm_tab = ttk.Frame(inner)
         inner.add(dm_tab, text="Send DMs")
@@ -623,6 +2207,25 @@ class DashboardApp:
         self.dm_status = tk.Label(dm_tab, text="Enter user ID and message", bg='#ecf0f1', fg='#2c3e50')
         self.dm_status.pack(fill=tk.X, padx=10, pady=4)
 
+        bulk = tk.LabelFrame(dm_tab, text="Bulk Send (same message to many users)")
+        bulk.pack(fill=tk.X, padx=10, pady=8)
+        bulk_btns = tk.Frame(bulk)
+        bulk_btns.pack(fill=tk.X, padx=5, pady=4)
+        tk.Button(bulk_btns, text="Recipients from File...", command=self.load_dm_recipients_file).pack(side=tk.LEFT, padx=4)
+        tk.Button(bulk_btns, text="Members of Selected Server", command=self.load_dm_recipients_guild).pack(side=tk.LEFT, padx=4)
+        tk.Button(bulk_btns, text="Send to All", command=self.start_dm_outbox, bg='#5865F2', fg='white').pack(side=tk.LEFT, padx=4)
+        tk.Button(bulk_btns, text="Cancel", command=self.cancel_dm_outbox).pack(side=tk.LEFT, padx=4)
+        self.dm_outbox_progress = ttk.Progressbar(bulk, mode='determinate')
+        self.dm_outbox_progress.pack(fill=tk.X, padx=5, pady=4)
+        self.dm_outbox_label = tk.Label(bulk, text="No recipients loaded", anchor=tk.W)
+        self.dm_outbox_label.pack(fill=tk.X, padx=5, pady=(0, 4))
+        self.dm_recipients = []
+        self.dm_outbox_cancel = threading.Event()
+        self.dm_outbox_running = False
+
+        # Last known servers are shown straight away; the network is only used once they are stale
+        self.show_cached_discord_servers()
+
     def setup_mistral_tab(self):
         mistral_frame = ttk.Frame(self.notebook)
         self.notebook.add(mistral_frame, text="🤖 UnifiedHub AI")
@@ -655,6 +2258,11 @@ class DashboardApp:
         agent_id = os.getenv('MISTRAL_AI_AGENT_ID', '')
         if agent_id:
             self.mistral_agent_id.insert(0, agent_id)
+        tk.Label(mode_frame, text="Thread:", bg='#ecf0f1').pack(side=tk.LEFT, padx=5)
+        self.mistral_thread_box = ttk.Combobox(mode_frame, width=30, state='readonly')
+        self.mistral_thread_box.pack(side=tk.LEFT, padx=5)
+        self.mistral_thread_box.bind('<<ComboboxSelected>>', lambda e: self.on_mistral_thread_select())
+        tk.Button(mode_frame, text="New Thread", command=self.new_mistral_thread).pack(side=tk.LEFT, padx=5)
 
         # Model selection (for chat mode)
         model_frame = tk.Frame(mistral_frame, bg='#ecf0f1')
@@ -670,8 +2278,16 @@ class DashboardApp:
         ])
         self.mistral_model.set('mistral-small-latest')
         self.mistral_model.pack(side=tk.LEFT, padx=5)
+        cached_models = self._load_cache('mistral_models.json', {})
+        if cached_models.get('models'):
+            self.mistral_model.config(values=cached_models['models'])
         tk.Button(model_frame, text="List Models", command=self.list_mistral_models).pack(side=tk.LEFT, padx=5)
         tk.Button(model_frame, text="Clear Chat", command=self.clear_mistral_chat).pack(side=tk.LEFT, padx=5)
+        tk.Label(model_frame, text="Saved:", bg='#ecf0f1').pack(side=tk.LEFT, padx=5)
+        self.mistral_saved_box = ttk.Combobox(model_frame, width=40, state='readonly')
+        self.mistral_saved_box.pack(side=tk.LEFT, padx=5)
+        self.mistral_saved_box.bind('<<ComboboxSelected>>', lambda e: self.on_mistral_saved_select())
+        tk.Button(model_frame, text="Delete", command=self.delete_mistral_saved).pack(side=tk.LEFT, padx=5)
 
         # Chat display
         self.mistral_chat = scrolledtext.ScrolledText(mistral_frame, height=25, wrap=tk.WORD,
@@ -688,21 +2304,41 @@ class DashboardApp:
         self.mistral_input.bind('<Return>', lambda e: self.send_mistral_message())
         tk.Button(input_frame, text="Send", command=self.send_mistral_message, bg='#5865F2', fg='white',
                  padx=15, pady=5, font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
-
-        # Chat history for context (chat mode) and agent conversation ID (agent mode)
-        self.mistral_history = []
-        self.mistral_agent_conversation_id = None
+        tk.Button(input_frame, text="Stop", command=self.stop_mistral_stream).pack(side=tk.LEFT, padx=5)
+
+        # Chat history for context (chat mode); agent mode keeps one entry per conversation thread
+        self.mistral_history = ContextWindow(int(self.settings.get('mistral_context_tokens', 8000)),
+                                             bool(self.settings.get('mistral_summarize', False)))
+        self.mistral_agent_threads = []  # {'conversation_id', 'agent_id', 'title', 'messages', 'store_id'}
+        self.mistral_agent_thread = None
+        # Every chat and agent thread is persisted; only the index is read to list them
+        self.conversations = ConversationStore(os.path.join('cache', 'conversations'))
+        self.mistral_conversation_id = None
+        self.mistral_saved = []
+        self._refresh_mistral_saved()
+        self.mistral_responses = ResponseCache(os.path.join('cache', 'mistral_responses.json'),
+                                               int(self.settings.get('mistral_cache_size', 500)))
+        # One SDK client per API key so its HTTP connection pool survives between messages
+        self.mistral_clients = {}
+        self.mistral_clients_lock = threading.Lock()
+        # Streamed text is buffered here and flushed to the chat widget at most once per UI tick
+        self.mistral_stream_buf = []
+        self.mistral_stream_lock = threading.Lock()
+        self.mistral_flush_pending = False
+        self.mistral_stop = threading.Event()
+        self.mistral_streaming = False
+        self.mistral_response = None
         
     def on_mistral_mode_change(self):
         """Handle mode change between Chat and Agent"""
         mode = self.mistral_mode.get()
-        if mode == 'Chat':
-            self.mistral_history = []
-            self.mistral_agent_conversation_id = None
-        elif mode == 'Agent':
-            self.mistral_history = []
-            self.mistral_agent_conversation_id = None
-        self.clear_mistral_chat()
+        self._clear_mistral_view()
+        # Both modes keep their state, so switching back picks up where it left off
+        if mode == 'Agent' and self.mistral_agent_thread:
+            self._render_mistral_thread(self.mistral_agent_thread)
+        elif mode == 'Chat':
+            self._render_mistral_messages([{'role': role, 'content': content}
+                                           for role, content, _ in self.mistral_history.messages], "Mistral")
 
     def setup_drive_upload_tab(self):
         frame = ttk.Frame(self.notebook)
@@ -846,13 +2482,7 @@ class DashboardApp:
             self.refresh_google_token()
         headers = {'Authorization': f'Bearer {self.tokens["google"]}'}
         try:
-            url = 'https://www.googleapis.com/upload/drive/v3/files?uploadType=multipart'
-            with open(path, 'rb') as f:
-                files = {
-                    'metadata': ('metadata', json.dumps({'name': name}), 'application/json; charset=UTF-8'),
-                    'file': (name, f)
-                }
-                resp = requests.post(url, headers=headers, files=files)
+            resp = self._drive_upload(headers, path, name)
             if resp.status_code in (200, 201):
                 self.root.after(0, lambda: self.drive_upload_status.config(text="Upload complete"))
                 self.root.after(0, lambda: messagebox.showinfo("Drive", "File uploaded to My Drive"))
@@ -864,11 +2494,420 @@ class DashboardApp:
         finally:
             self.root.after(0, lambda: self.update_status("Ready"))
 
+    def _drive_upload(self, headers, path, name, parent_id=None, file_id=None):
+        """Multipart upload of a local file; updates the content of file_id when given."""
+        metadata = {'name': name}
+        if file_id:
+            url = f'https://www.googleapis.com/upload/drive/v3/files/{file_id}?uploadType=multipart'
+        else:
+            url = 'https://www.googleapis.com/upload/drive/v3/files?uploadType=multipart'
+            if parent_id:
+                metadata['parents'] = [parent_id]
+        url += '&fields=id,name,md5Checksum,size,modifiedTime'
+        with open(path, 'rb') as f:
+            files = {
+                'metadata': ('metadata', json.dumps(metadata), 'application/json; charset=UTF-8'),
+                'file': (name, f)
+            }
+            if file_id:
+                return requests.patch(url, headers=headers, files=files, timeout=300)
+            return requests.post(url, headers=headers, files=files, timeout=300)
+
+    def _drive_download(self, headers, file_id, path, url=None):
+        """Stream a Drive file to path via a temporary .part file. Returns the response."""
+        url = url or f'https://www.googleapis.com/drive/v3/files/{file_id}?alt=media'
+        resp = requests.get(url, headers=headers, stream=True, timeout=60)
+        if resp.status_code == 200:
+            tmp = path + '.part'
+            with open(tmp, 'wb') as f:
+                for chunk in resp.iter_content(chunk_size=65536):
+                    if chunk:
+                        f.write(chunk)
+            os.replace(tmp, path)
+        return resp
+
+    # Drive two-way folder sync
+    def select_drive_sync_folder(self):
+        path = filedialog.askdirectory()
+        if path:
+            self.drive_sync_local.set(path)
+
+    def sync_drive_folder(self):
+        if not self.tokens.get('google'):
+            messagebox.showwarning("Warning", "Please connect Google first")
+            return
+        local_dir = self.drive_sync_local.get().strip()
+        folder_id = self.drive_sync_remote.get().strip() or 'root'
+        if not local_dir or not os.path.isdir(local_dir):
+            messagebox.showwarning("Drive Sync", "Please choose a valid local folder")
+            return
+        if self.drive_sync_running:
+            return
+        self.settings['drive_sync_local'] = local_dir
+        self.settings['drive_sync_remote'] = folder_id
+        self.save_settings()
+        self.drive_sync_running = True
+        threading.Thread(target=self._sync_drive_folder, args=(local_dir, folder_id), daemon=True).start()
+
+    def start_drive_sync_watch(self):
+        self._cancel_drive_sync_watch()
+        self.drive_sync_job = True  # mark active
+        self.drive_sync_status.config(text="Watching for changes...")
+        self.sync_drive_folder()
+        self._poll_drive_sync_folder()
+
+    def stop_drive_sync_watch(self):
+        self._cancel_drive_sync_watch()
+        self.drive_sync_status.config(text="Watching stopped")
+
+    def _cancel_drive_sync_watch(self):
+        if self.drive_sync_job and not isinstance(self.drive_sync_job, bool):
+            self.root.after_cancel(self.drive_sync_job)
+        self.drive_sync_job = None
+
+    def _poll_drive_sync_folder(self):
+        """Start a stat-only scan of the watched folder on a worker; a tick is skipped while one is running."""
+        if not self.drive_sync_job:
+            return
+        local_dir = self.drive_sync_local.get().strip()
+        if local_dir and os.path.isdir(local_dir) and not self.drive_sync_running and not self.drive_sync_scanning:
+            self.drive_sync_scanning = True
+            threading.Thread(target=self._scan_drive_sync_signature,
+                             args=(local_dir, self.drive_sync_signature), daemon=True).start()
+        self.drive_sync_job = self.root.after(5000, self._poll_drive_sync_folder)
+
+    def _scan_drive_sync_signature(self, local_dir, baseline):
+        signature = self._drive_sync_tree_signature(local_dir)
+        self.root.after(0, lambda: self._on_drive_sync_signature(local_dir, baseline, signature))
+
+    def _on_drive_sync_signature(self, local_dir, baseline, signature):
+        """Compare a finished scan with the last known tree; triggers a sync when anything changed."""
+        self.drive_sync_scanning = False
+        # Stale if watching stopped, the folder changed, or a sync ran and recorded a newer tree meanwhile
+        if (not self.drive_sync_job or self.drive_sync_running or self.drive_sync_signature != baseline
+                or local_dir != self.drive_sync_local.get().strip()):
+            return
+        if baseline is not None and signature != baseline:
+            self.sync_drive_folder()
+        self.drive_sync_signature = signature
+
+    def _drive_sync_tree_signature(self, local_dir):
+        digest = hashlib.md5()
+        for rel, st in self._walk_sync_folder(local_dir):
+            digest.update(f"{rel}\0{st.st_size}\0{st.st_mtime_ns}\n".encode('utf-8', errors='replace'))
+        return digest.hexdigest()
+
+    def _walk_sync_folder(self, local_dir):
+        """Yield (relative posix path, stat) for every regular file below local_dir."""
+        for dirpath, dirnames, filenames in os.walk(local_dir):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            for fname in filenames:
+                if fname.startswith('.') or fname.endswith('.part'):
+                    continue
+                full = os.path.join(dirpath, fname)
+                try:
+                    st = os.stat(full)
+                except OSError:
+                    continue
+                rel = os.path.relpath(full, local_dir).replace(os.sep, '/')
+                yield rel, st
+
+    def _scan_sync_folder(self, local_dir, previous):
+        """Return {rel: {size, mtime, md5}}, hashing only files whose size/mtime changed."""
+        local = {}
+        for rel, st in self._walk_sync_folder(local_dir):
+            prev = previous.get(rel)
+            if prev and prev.get('size') == st.st_size and prev.get('mtime') == st.st_mtime and prev.get('md5'):
+                md5 = prev['md5']
+            else:
+                md5 = self._md5_file(os.path.join(local_dir, rel))
+            local[rel] = {'size': st.st_size, 'mtime': st.st_mtime, 'md5': md5}
+        return local
+
+    def _md5_file(self, path):
+        digest = hashlib.md5()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _drive_list_children(self, headers, folder_id):
+        items = []
+        params = {
+            'q': f"'{folder_id}' in parents and trashed=false",
+            'fields': 'nextPageToken,files(id,name,mimeType,md5Checksum,size,modifiedTime)',
+            'pageSize': 1000
+        }
+        while True:
+            resp = requests.get('https://www.googleapis.com/drive/v3/files', headers=headers, params=params, timeout=30)
+            if resp.status_code != 200:
+                raise RuntimeError(f"Drive list failed: {resp.status_code} {resp.text}")
+            data = resp.json()
+            items.extend(data.get('files', []))
+            token = data.get('nextPageToken')
+            if not token:
+                return items
+            params['pageToken'] = token
+
+    def _list_drive_tree(self, headers, folder_id):
+        """Walk a Drive folder level by level, listing sibling folders concurrently."""
+        files, folders = {}, {'': folder_id}
+        level = [('', folder_id)]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            while level:
+                listings = pool.map(lambda entry: (entry[0], self._drive_list_children(headers, entry[1])), level)
+                level = []
+                for prefix, children in listings:
+                    for item in children:
+                        rel = f"{prefix}/{item['name']}" if prefix else item['name']
+                        if item.get('mimeType') == 'application/vnd.google-apps.folder':
+                            folders[rel] = item['id']
+                            level.append((rel, item['id']))
+                        elif item.get('md5Checksum'):
+                            # Google-native files have no checksum and cannot be mirrored byte-for-byte
+                            files[rel] = {
+                                'id': item['id'],
+                                'md5': item['md5Checksum'],
+                                'size': int(item.get('size', 0)),
+                                'modifiedTime': item.get('modifiedTime')
+                            }
+        return files, folders
+
+    def _ensure_drive_folder(self, headers, folders, rel_dir):
+        """Return the Drive folder ID for rel_dir, creating missing folders along the way."""
+        if rel_dir in folders:
+            return folders[rel_dir]
+        parent_rel, _, name = rel_dir.rpartition('/')
+        parent_id = self._ensure_drive_folder(headers, folders, parent_rel)
+        resp = requests.post(
+            'https://www.googleapis.com/drive/v3/files?fields=id',
+            headers=headers,
+            json={'name': name, 'mimeType': 'application/vnd.google-apps.folder', 'parents': [parent_id]},
+            timeout=30
+        )
+        if resp.status_code not in (200, 201):
+            raise RuntimeError(f"Could not create folder {rel_dir}: {resp.text}")
+        folders[rel_dir] = resp.json()['id']
+        return folders[rel_dir]
+
+    def _plan_drive_sync(self, local, remote, previous):
+        """Decide what to transfer. Deletions are not propagated: a file missing on one side is restored.
+
+        A file changed on both sides is a conflict: the newer side wins and the caller keeps the other as a copy.
+        """
+        uploads, downloads, remote_renames, local_renames, conflicts = [], [], [], [], []
+        local_only = set(local) - set(remote)
+        remote_only = set(remote) - set(local)
+
+        # Renames by checksum: the old path was synced before and vanished on exactly one side
+        moved_remote = {}
+        for rel in remote_only:
+            if rel in previous:
+                moved_remote.setdefault(remote[rel]['md5'], []).append(rel)
+        moved_local = {}
+        for rel in local_only:
+            if rel in previous:
+                moved_local.setdefault(local[rel]['md5'], []).append(rel)
+        for rel in sorted(local_only):
+            if rel in previous:
+                continue
+            candidates = moved_remote.get(local[rel]['md5'])
+            if candidates:
+                old = candidates.pop()
+                remote_renames.append((old, rel))
+                remote_only.discard(old)
+                local_only.discard(rel)
+        for rel in sorted(remote_only):
+            if rel in previous:
+                continue
+            candidates = moved_local.get(remote[rel]['md5'])
+            if candidates:
+                old = candidates.pop()
+                local_renames.append((old, rel))
+                local_only.discard(old)
+                remote_only.discard(rel)
+
+        uploads.extend((rel, None) for rel in sorted(local_only))
+        downloads.extend(sorted(remote_only))
+
+        from datetime import datetime
+        for rel in sorted(set(local) & set(remote)):
+            loc, rem = local[rel], remote[rel]
+            if loc['md5'] == rem['md5']:
+                continue
+            prev = previous.get(rel) or {}
+            local_changed = prev.get('md5') != loc['md5']
+            remote_changed = prev.get('modifiedTime') != rem['modifiedTime']
+            if local_changed and not remote_changed:
+                uploads.append((rel, rem['id']))
+            elif remote_changed and not local_changed:
+                downloads.append(rel)
+            else:
+                conflicts.append(rel)
+                remote_ts = datetime.fromisoformat(rem['modifiedTime'].replace('Z', '+00:00')).timestamp()
+                if loc['mtime'] >= remote_ts:
+                    uploads.append((rel, rem['id']))
+                else:
+                    downloads.append(rel)
+        return uploads, downloads, remote_renames, local_renames, conflicts
+
+    def _sync_drive_folder(self, local_dir, folder_id):
+        self.update_status("Syncing Drive folder...")
+        self.root.after(0, lambda: self.drive_sync_status.config(text="Scanning..."))
+        if self.tokens.get('google_refresh'):
+            self.refresh_google_token()
+        headers = {'Authorization': f'Bearer {self.tokens["google"]}'}
+        state_key = f"{os.path.abspath(local_dir)}|{folder_id}"
+        all_state = self._load_cache('drive_sync.json', {})
+        previous = all_state.get(state_key, {})
+        try:
+            local = self._scan_sync_folder(local_dir, previous)
+            remote, folders = self._list_drive_tree(headers, folder_id)
+            uploads, downloads, remote_renames, local_renames, conflicts = self._plan_drive_sync(local, remote, previous)
+
+            for old, new in remote_renames:
+                new_dir, _, new_name = new.rpartition('/')
+                old_dir = old.rpartition('/')[0]
+                params = {'fields': 'id,md5Checksum,size,modifiedTime'}
+                if new_dir != old_dir:
+                    params['addParents'] = self._ensure_drive_folder(headers, folders, new_dir)
+                    params['removeParents'] = folders[old_dir]
+                resp = requests.patch(f"https://www.googleapis.com/drive/v3/files/{remote[old]['id']}",
+                                      headers=headers, params=params, json={'name': new_name}, timeout=30)
+                if resp.status_code == 200:
+                    remote[new] = remote.pop(old)
+                    remote[new]['modifiedTime'] = resp.json().get('modifiedTime')
+                else:
+                    uploads.append((new, None))
+            for old, new in local_renames:
+                os.renames(os.path.join(local_dir, old), os.path.join(local_dir, new))
+                local[new] = local.pop(old)
+                local[new]['mtime'] = os.stat(os.path.join(local_dir, new)).st_mtime
+
+            # The losing side of a conflict is kept as a copy next to the file, then synced like a new file
+            failures = []
+            for rel in conflicts:
+                copy = self._drive_sync_conflict_name(rel, local, remote)
+                try:
+                    local[copy] = self._drive_sync_keep_conflict(headers, local_dir, rel, copy,
+                                                                 None if rel in downloads else remote[rel])
+                    uploads.append((copy, None))
+                except Exception as e:
+                    # Without a copy neither side may be overwritten
+                    failures.append(f"{rel}: could not keep conflict copy ({e})")
+                    uploads = [u for u in uploads if u[0] != rel]
+                    downloads = [d for d in downloads if d != rel]
+
+            # Create parent folders up front so concurrent uploads never race on them
+            for rel, file_id in uploads:
+                if not file_id:
+                    self._ensure_drive_folder(headers, folders, rel.rpartition('/')[0])
+
+            total = len(uploads) + len(downloads)
+            done = 0
+            if total:
+                with ThreadPoolExecutor(max_workers=4) as pool:
+                    futures = {}
+                    for rel, file_id in uploads:
+                        fut = pool.submit(self._drive_sync_upload, headers, local_dir, rel, folders, file_id)
+                        futures[fut] = rel
+                    for rel in downloads:
+                        fut = pool.submit(self._drive_sync_download, headers, local_dir, rel, remote[rel])
+                        futures[fut] = rel
+                    for fut in as_completed(futures):
+                        rel = futures[fut]
+                        done += 1
+                        try:
+                            loc, rem = fut.result()
+                            local[rel], remote[rel] = loc, rem
+                        except Exception as e:
+                            failures.append(f"{rel}: {e}")
+                        msg = f"Transferring {done}/{total}..."
+                        self.root.after(0, lambda m=msg: self.drive_sync_status.config(text=m))
+
+            new_state = {}
+            for rel in set(local) & set(remote):
+                if local[rel]['md5'] == remote[rel]['md5']:
+                    new_state[rel] = dict(local[rel], id=remote[rel]['id'], modifiedTime=remote[rel]['modifiedTime'])
+            all_state[state_key] = new_state
+            self._save_cache('drive_sync.json', all_state)
+            self.drive_sync_signature = self._drive_sync_tree_signature(local_dir)
+
+            summary = (f"Synced {len(new_state)} files: {len(uploads)} up, {len(downloads)} down, "
+                       f"{len(remote_renames) + len(local_renames)} renamed, {len(conflicts)} conflicts")
+            if failures:
+                summary += f", {len(failures)} failed"
+            self.root.after(0, lambda: self.drive_sync_status.config(text=summary))
+            if failures:
+                self.root.after(0, lambda: messagebox.showerror("Drive Sync", "\n".join(failures[:20])))
+        except Exception as e:
+            self.root.after(0, lambda: self.drive_sync_status.config(text="Sync failed"))
+            self.root.after(0, lambda: messagebox.showerror("Drive Sync", f"Sync failed: {str(e)}"))
+        finally:
+            self.drive_sync_running = False
+            self.root.after(0, lambda: self.update_status("Ready"))
+
+    def _drive_sync_upload(self, headers, local_dir, rel, folders, file_id):
+        path = os.path.join(local_dir, rel)
+        parent_rel, _, name = rel.rpartition('/')
+        resp = self._drive_upload(headers, path, name, parent_id=folders.get(parent_rel), file_id=file_id)
+        if resp.status_code not in (200, 201):
+            raise RuntimeError(f"upload failed ({resp.status_code})")
+        data = resp.json()
+        st = os.stat(path)
+        loc = {'size': st.st_size, 'mtime': st.st_mtime, 'md5': data.get('md5Checksum') or self._md5_file(path)}
+        rem = {'id': data['id'], 'md5': data.get('md5Checksum', loc['md5']),
+               'size': int(data.get('size', st.st_size)), 'modifiedTime': data.get('modifiedTime')}
+        return loc, rem
+
+    def _drive_sync_download(self, headers, local_dir, rel, remote_file):
+        from datetime import datetime
+        path = os.path.join(local_dir, rel)
+        os.makedirs(os.path.dirname(path) or local_dir, exist_ok=True)
+        resp = self._drive_download(headers, remote_file['id'], path)
+        if resp.status_code != 200:
+            raise RuntimeError(f"download failed ({resp.status_code})")
+        # Mirror the remote timestamp so later conflict checks compare like with like
+        remote_ts = datetime.fromisoformat(remote_file['modifiedTime'].replace('Z', '+00:00')).timestamp()
+        os.utime(path, (remote_ts, remote_ts))
+        st = os.stat(path)
+        return {'size': st.st_size, 'mtime': st.st_mtime, 'md5': remote_file['md5']}, remote_file
+
+    def _drive_sync_conflict_name(self, rel, local, remote):
+        """'dir/name (conflict YYYY-MM-DD).ext', numbered if that path is already taken on either side."""
+        from datetime import datetime
+        stem, ext = os.path.splitext(rel)
+        base = f"{stem} (conflict {datetime.now().strftime('%Y-%m-%d')})"
+        copy, n = base + ext, 2
+        while copy in local or copy in remote:
+            copy, n = f"{base} {n}{ext}", n + 1
+        return copy
+
+    def _drive_sync_keep_conflict(self, headers, local_dir, rel, copy, remote_file=None):
+        """Save the version about to be overwritten at copy: the local file, or remote_file when the local side wins."""
+        import shutil
+        from datetime import datetime
+        path = os.path.join(local_dir, copy)
+        if remote_file is None:
+            shutil.copy2(os.path.join(local_dir, rel), path)
+            md5 = self._md5_file(path)
+        else:
+            resp = self._drive_download(headers, remote_file['id'], path)
+            if resp.status_code != 200:
+                raise RuntimeError(f"download failed ({resp.status_code})")
+            remote_ts = datetime.fromisoformat(remote_file['modifiedTime'].replace('Z', '+00:00')).timestamp()
+            os.utime(path, (remote_ts, remote_ts))
+            md5 = remote_file['md5']
+        st = os.stat(path)
+        return {'size': st.st_size, 'mtime': st.st_mtime, 'md5': md5}
+
     # Calendar agenda (next 7 days)
     def load_calendar_agenda(self):
         if not self.tokens.get('google'):
             messagebox.showwarning("Warning", "Please connect Google first")
             return
+        # Render whatever the local store already has, then fetch the delta
+        self.render_calendar_views()
         threading.Thread(target=self._fetch_calendar_agenda, daemon=True).start()
 
     def _fetch_calendar_agenda(self):
@@ -877,18 +2916,9 @@ class DashboardApp:
             self.refresh_google_token()
         headers = {'Authorization': f'Bearer {self.tokens["google"]}'}
         try:
-            from datetime import datetime, timedelta, timezone
-            now = datetime.now(timezone.utc)
-            time_min = now.isoformat().replace('+00:00', 'Z')
-            time_max = (now + timedelta(days=7)).isoformat().replace('+00:00', 'Z')
-            url = (
-                'https://www.googleapis.com/calendar/v3/calendars/primary/events'
-                f'?timeMin={time_min}&timeMax={time_max}&singleEvents=true&orderBy=startTime&maxResults=50'
-            )
-            resp = requests.get(url, headers=headers)
-            if resp.status_code == 200:
-                events = resp.json().get('items', [])
-                self.root.after(0, lambda: self.display_calendar_agenda(events))
+            resp = self._sync_calendar_store(headers)
+            if resp is None:
+                self.root.after(0, self.render_calendar_views)
             else:
                 self.root.after(0, lambda: self.show_text_error(self.agenda_text, f"Error: {resp.status_code}\n{resp.text}"))
         except Exception as e:
@@ -907,6 +2937,7 @@ class DashboardApp:
                 start_time = start.get('dateTime', start.get('date', 'No date'))
                 location = ev.get('location', 'No location')
                 self.agenda_text.insert(tk.END, f"Title: {title}\nStart: {start_time}\nLocation: {location}\n")
+                self.agenda_text.insert(tk.END, f"Calendar: {self._calendar_name(ev)}\n")
                 self.agenda_text.insert(tk.END, f"Event ID: {ev.get('id','')}\n")
                 self.agenda_text.insert(tk.END, "-" * 60 + "\n")
         self.agenda_text.config(state=tk.DISABLED)
@@ -1039,23 +3070,161 @@ class DashboardApp:
             'Authorization': f'Bot {bot_token}',
             'Content-Type': 'application/json'
         }
+        error = self._deliver_dm(headers, user_id, content)
+        with self.dm_channels_lock:
+            self._save_cache('discord_dm_channels.json', self.dm_channels)
+        if error is None:
+            self.root.after(0, lambda: self.dm_status.config(text="Sent"))
+            self.root.after(0, lambda: messagebox.showinfo("Discord DM", "Message sent"))
+        else:
+            self.root.after(0, lambda: self.dm_status.config(text=f"Failed: {error[:80]}"))
+            self.root.after(0, lambda: messagebox.showerror("Discord DM", error))
+
+    def _deliver_dm(self, headers, user_id, content, attempts=3):
+        """Send one DM, reusing the cached DM channel; returns None or an error message.
+
+        Rate limits are handled by the Discord client; network errors and 5xx responses are
+        retried with backoff, and a stale cached channel is reopened once.
+        """
+        reopened = False
+        for attempt in range(attempts):
+            try:
+                with self.dm_channels_lock:
+                    channel_id = self.dm_channels.get(user_id)
+                if not channel_id:
+                    resp = self.discord.post('/users/@me/channels', headers, json={'recipient_id': user_id})
+                    if resp.status_code >= 500:
+                        raise requests.RequestException(f"{resp.status_code} opening DM")
+                    if resp.status_code not in (200, 201):
+                        return f"Failed to open DM: {resp.status_code} {resp.text}"
+                    channel_id = resp.json().get('id')
+                    if not channel_id:
+                        return f"Failed to open DM: no channel in response {resp.text[:200]}"
+                    with self.dm_channels_lock:
+                        self.dm_channels[user_id] = channel_id
+                resp = self.discord.post(f'/channels/{channel_id}/messages', headers, json={'content': content})
+                if resp.status_code in (200, 201):
+                    return None
+                if resp.status_code == 404 and not reopened:
+                    # Cached channel no longer exists: open a fresh one
+                    with self.dm_channels_lock:
+                        self.dm_channels.pop(user_id, None)
+                    reopened = True
+                    continue
+                if resp.status_code >= 500:
+                    raise requests.RequestException(f"{resp.status_code} sending message")
+                return f"{resp.status_code}: {resp.text}"
+            except requests.RequestException as e:
+                if attempt == attempts - 1:
+                    return str(e)
+                time.sleep(2 ** attempt)
+            except Exception as e:
+                # Malformed responses are not worth retrying, but must still reach the user
+                return f"Failed: {str(e)}"
+        return "Failed after retries"
+
+    def load_dm_recipients_file(self):
+        path = filedialog.askopenfilename(filetypes=[("Text/CSV", "*.txt *.csv"), ("All files", "*.*")])
+        if not path:
+            return
         try:
-            dm_resp = requests.post('https://discord.com/api/v10/users/@me/channels', headers=headers, json={'recipient_id': user_id})
-            if dm_resp.status_code not in (200, 201):
-                self.root.after(0, lambda: self.dm_status.config(text=f"Failed to open DM: {dm_resp.status_code}"))
-                self.root.after(0, lambda: messagebox.showerror("Discord DM", dm_resp.text))
-                return
-            channel_id = dm_resp.json().get('id')
-            msg_resp = requests.post(f'https://discord.com/api/v10/channels/{channel_id}/messages', headers=headers, json={'content': content})
-            if msg_resp.status_code in (200, 201):
-                self.root.after(0, lambda: self.dm_status.config(text="Sent"))
-                self.root.after(0, lambda: messagebox.showinfo("Discord DM", "Message sent"))
-            else:
-                self.root.after(0, lambda: self.dm_status.config(text=f"Failed: {msg_resp.status_code}"))
-                self.root.after(0, lambda: messagebox.showerror("Discord DM", msg_resp.text))
-        except Exception as e:
-            self.root.after(0, lambda: self.dm_status.config(text="Error"))
-            self.root.after(0, lambda: messagebox.showerror("Discord DM", str(e)))
+            with open(path, 'r', encoding='utf-8') as f:
+                ids = re.findall(r'\b\d{15,21}\b', f.read())
+        except OSError as e:
+            messagebox.showerror("Bulk DM", str(e))
+            return
+        self._set_dm_recipients(ids, os.path.basename(path))
+
+    def load_dm_recipients_guild(self):
+        bot_token = os.getenv('DISCORD_BOT_TOKEN')
+        if not bot_token:
+            messagebox.showwarning("Bulk DM", "Set DISCORD_BOT_TOKEN in .env")
+            return
+        selection = self.discord_listbox.curselection() if self.discord_list_view == 'servers' else ()
+        guild_id = self.discord_servers[selection[0]]['id'] if selection and selection[0] < len(self.discord_servers) else None
+        if not guild_id:
+            from tkinter import simpledialog
+            guild_id = simpledialog.askstring("Bulk DM", "Server (guild) ID:")
+        if guild_id:
+            threading.Thread(target=self._fetch_dm_recipients_guild, args=(bot_token, guild_id.strip()), daemon=True).start()
+
+    def _fetch_dm_recipients_guild(self, bot_token, guild_id):
+        self.root.after(0, lambda: self.dm_outbox_label.config(text="Loading server members..."))
+        headers = {'Authorization': f'Bot {bot_token}'}
+        ids, after = [], '0'
+        try:
+            while True:
+                resp = self.discord.get(f'/guilds/{guild_id}/members?limit=1000&after={after}', headers)
+                if resp.status_code != 200:
+                    msg = f"Could not list members ({resp.status_code}). The bot needs the Server Members intent.\n{resp.text}"
+                    self.root.after(0, lambda: messagebox.showerror("Bulk DM", msg))
+                    break
+                members = resp.json()
+                ids.extend(m['user']['id'] for m in members if not m.get('user', {}).get('bot'))
+                if len(members) < 1000:
+                    break
+                after = members[-1]['user']['id']
+        except requests.RequestException as e:
+            self.root.after(0, lambda: messagebox.showerror("Bulk DM", str(e)))
+        self.root.after(0, lambda: self._set_dm_recipients(ids, f"server {guild_id}"))
+
+    def _set_dm_recipients(self, ids, source):
+        self.dm_recipients = list(dict.fromkeys(ids))
+        self.dm_outbox_progress.config(value=0, maximum=max(1, len(self.dm_recipients)))
+        self.dm_outbox_label.config(text=f"{len(self.dm_recipients)} recipient(s) from {source}")
+
+    def start_dm_outbox(self):
+        bot_token = os.getenv('DISCORD_BOT_TOKEN')
+        content = self.dm_message.get(1.0, tk.END).strip()
+        if not bot_token:
+            messagebox.showwarning("Bulk DM", "Set DISCORD_BOT_TOKEN in .env")
+            return
+        if self.dm_outbox_running or not self.dm_recipients or not content:
+            if not self.dm_outbox_running:
+                messagebox.showwarning("Bulk DM", "Load recipients and enter a message first")
+            return
+        if not messagebox.askyesno("Bulk DM", f"Send this message to {len(self.dm_recipients)} user(s)?"):
+            return
+        self.dm_outbox_cancel.clear()
+        self.dm_outbox_running = True
+        threading.Thread(target=self._run_dm_outbox, args=(bot_token, list(self.dm_recipients), content), daemon=True).start()
+
+    def cancel_dm_outbox(self):
+        self.dm_outbox_cancel.set()
+
+    def _run_dm_outbox(self, bot_token, user_ids, content):
+        """Work through the recipient queue with a few senders; the client paces each route's bucket."""
+        headers = {'Authorization': f'Bot {bot_token}', 'Content-Type': 'application/json'}
+        sent, failures = 0, []
+
+        def _send(user_id):
+            if self.dm_outbox_cancel.is_set():
+                return user_id, 'cancelled'
+            return user_id, self._deliver_dm(headers, user_id, content)
+
+        def _progress(done, sent, failed):
+            self.dm_outbox_progress.config(value=done)
+            self.dm_outbox_label.config(text=f"Sent {sent} / {len(user_ids)}" + (f", {failed} failed" if failed else ""))
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            for done, (user_id, error) in enumerate(pool.map(_send, user_ids), start=1):
+                if error is None:
+                    sent += 1
+                elif error != 'cancelled':
+                    failures.append((user_id, error))
+                self.root.after(0, lambda d=done, s=sent, f=len(failures): _progress(d, s, f))
+                if done % 25 == 0:
+                    with self.dm_channels_lock:
+                        self._save_cache('discord_dm_channels.json', self.dm_channels)
+        with self.dm_channels_lock:
+            self._save_cache('discord_dm_channels.json', self.dm_channels)
+        self.dm_outbox_running = False
+        summary = f"Sent {sent} of {len(user_ids)} DM(s)"
+        if self.dm_outbox_cancel.is_set():
+            summary += " (cancelled)"
+        if failures:
+            summary += f"\n\n{len(failures)} failed, e.g.:\n" + "\n".join(f"{uid}: {err[:100]}" for uid, err in failures[:10])
+        self.root.after(0, lambda: messagebox.showinfo("Bulk DM", summary))
 
     # Google Keep Notes
     def create_keep_note(self):
@@ -1193,6 +3362,7 @@ class DashboardApp:
             "https://www.googleapis.com/auth/tasks "
             "https://www.googleapis.com/auth/drive.metadata.readonly "
             "https://www.googleapis.com/auth/drive.readonly "
+            "https://www.googleapis.com/auth/drive "
             "https://www.googleapis.com/auth/userinfo.profile "
             "https://www.googleapis.com/auth/userinfo.email "
             "https://www.googleapis.com/auth/youtube.readonly "
@@ -1457,13 +3627,30 @@ class DashboardApp:
         if not self.tokens.get('google'):
             messagebox.showwarning("Warning", "Please connect Google first")
             return
-        from tkinter import simpledialog
-        to = simpledialog.askstring("Compose", "To (email):")
-        subject = simpledialog.askstring("Compose", "Subject:")
-        body = simpledialog.askstring("Compose", "Body:")
-        if not to:
-            return
-        threading.Thread(target=self._send_email, args=(to, subject or '', body or ''), daemon=True).start()
+        win = tk.Toplevel(self.root)
+        win.title("Compose")
+        form = tk.Frame(win)
+        form.pack(fill=tk.X, padx=10, pady=(10, 4))
+        tk.Label(form, text="To:").grid(row=0, column=0, sticky=tk.W)
+        to_entry = tk.Entry(form, width=70)
+        to_entry.grid(row=0, column=1, sticky=tk.EW, padx=5, pady=2)
+        tk.Label(form, text="Subject:").grid(row=1, column=0, sticky=tk.W)
+        subject_entry = tk.Entry(form, width=70)
+        subject_entry.grid(row=1, column=1, sticky=tk.EW, padx=5, pady=2)
+        form.columnconfigure(1, weight=1)
+        body_text = scrolledtext.ScrolledText(win, width=80, height=15, wrap=tk.WORD)
+        body_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=4)
+        # Recipients are completed from the local contacts index
+        self._attach_contact_autocomplete(to_entry, win)
+        to_entry.focus_set()
+
+        def _send():
+            to = ', '.join(self._split_recipients(to_entry.get()))
+            if not to:
+                return
+            win.destroy()
+            threading.Thread(target=self._send_email, args=(to, subject_entry.get(), body_text.get(1.0, tk.END).rstrip('\n')), daemon=True).start()
+        tk.Button(win, text="Send", command=_send).pack(pady=(0, 8))
 
     def _send_email(self, to, subject, body):
         import base64
@@ -1544,19 +3731,40 @@ class DashboardApp:
         if not self.tokens.get('google'):
             messagebox.showwarning("Warning", "Please connect Google first")
             return
-        threading.Thread(target=self._fetch_youtube_subscriptions, daemon=True).start()
+        # Tk variables are read here on the Tk thread, never from the worker
+        with_feed = self.youtube_feed_var.get()
+        threading.Thread(target=self._fetch_youtube_subscriptions, args=(with_feed,), daemon=True).start()
 
-    def _fetch_youtube_subscriptions(self):
+    def _fetch_youtube_subscriptions(self, with_feed=True):
         self.update_status("Loading YouTube subscriptions...")
+        cache = self._load_youtube_cache()
+        if cache['subscriptions']:
+            self.root.after(0, lambda: self.display_youtube_subscriptions(cache['subscriptions'], self._youtube_feed(cache)))
         if self.tokens.get('google_refresh'):
             self.refresh_google_token()
         headers = {'Authorization': f'Bearer {self.tokens["google"]}'}
         try:
-            url = 'https://www.googleapis.com/youtube/v3/subscriptions?part=snippet&mine=true&maxResults=50'
-            resp = requests.get(url, headers=headers)
+            url = 'https://www.googleapis.com/youtube/v3/subscriptions'
+            params = {'part': 'snippet', 'mine': 'true', 'maxResults': 50}
+            items = []
+            while True:
+                resp = requests.get(url, headers=headers, params=params, timeout=30)
+                if resp.status_code != 200:
+                    break
+                data = resp.json()
+                items.extend(data.get('items', []))
+                if not data.get('nextPageToken'):
+                    break
+                params['pageToken'] = data['nextPageToken']
             if resp.status_code == 200:
-                items = resp.json().get('items', [])
-                self.root.after(0, lambda: self.display_youtube_subscriptions(items))
+                cache['subscriptions'] = items
+                feed = None
+                if with_feed:
+                    self.update_status(f"Loading uploads from {len(items)} channel(s)...")
+                    self._refresh_youtube_uploads(headers, cache)
+                    feed = self._youtube_feed(cache)
+                self._save_cache('youtube_cache.json', cache)
+                self.root.after(0, lambda: self.display_youtube_subscriptions(items, feed))
             elif resp.status_code == 403:
                 msg = (
                     "⚠️ YouTube API 403\n\n"
@@ -1572,9 +3780,116 @@ class DashboardApp:
             self.root.after(0, lambda: messagebox.showerror("Error", f"Failed: {str(e)}"))
         self.root.after(0, lambda: self.update_status("YouTube loaded"))
 
-    def display_youtube_subscriptions(self, items):
+    def _load_youtube_cache(self):
+        cache = self._load_cache('youtube_cache.json', {})
+        for key in ('channels', 'playlists'):
+            cache.setdefault(key, {})
+        cache.setdefault('subscriptions', [])
+        return cache
+
+    def _youtube_quota_day(self):
+        # The Data API quota resets at midnight Pacific time
+        from datetime import datetime, timezone, timedelta
+        try:
+            from zoneinfo import ZoneInfo
+            return datetime.now(ZoneInfo('America/Los_Angeles')).strftime('%Y-%m-%d')
+        except Exception:
+            return (datetime.now(timezone.utc) - timedelta(hours=8)).strftime('%Y-%m-%d')
+
+    def _refresh_youtube_uploads(self, headers, cache):
+        """Fetch the newest uploads of every subscribed channel, concurrently and within quota.
+
+        Channel metadata (uploads playlist, thumbnail) is cached; each playlist request
+        carries its last ETag, and a 304 reuses the cached items.
+        """
+        day = self._youtube_quota_day()
+        quota = cache.get('quota', {})
+        spent = quota.get('spent', 0) if quota.get('day') == day else 0
+        budget = int(self.settings.get('youtube_daily_quota', 10000))
+        limiter = QuotaLimiter(rate=10, daily_budget=budget, spent=spent)
+
+        channel_ids = [it.get('snippet', {}).get('resourceId', {}).get('channelId') for it in cache['subscriptions']]
+        channel_ids = [cid for cid in channel_ids if cid]
+        # Forget channels that were unsubscribed since the last refresh
+        for cid in set(cache['channels']) - set(channel_ids):
+            cache['playlists'].pop(cache['channels'].pop(cid).get('uploads'), None)
+        missing = [cid for cid in channel_ids if cid not in cache['channels']]
+        for i in range(0, len(missing), 50):
+            if not limiter.acquire(1):
+                break
+            resp = requests.get('https://www.googleapis.com/youtube/v3/channels', headers=headers, timeout=30,
+                                params={'part': 'snippet,contentDetails', 'id': ','.join(missing[i:i + 50]), 'maxResults': 50})
+            if resp.status_code != 200:
+                if 'quotaExceeded' in resp.text:
+                    limiter.exhaust()
+                break
+            for ch in resp.json().get('items', []):
+                thumbs = ch.get('snippet', {}).get('thumbnails', {})
+                cache['channels'][ch['id']] = {
+                    'title': ch.get('snippet', {}).get('title', ''),
+                    'uploads': ch.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads'),
+                    'thumbnail': (thumbs.get('default') or {}).get('url'),
+                }
+
+        def _fetch_playlist(channel_id):
+            playlist_id = cache['channels'].get(channel_id, {}).get('uploads')
+            if not playlist_id:
+                return None
+            cached = cache['playlists'].get(playlist_id)
+            if not limiter.acquire(1):
+                return None
+            req_headers = dict(headers)
+            if cached and cached.get('etag'):
+                req_headers['If-None-Match'] = cached['etag']
+            try:
+                resp = requests.get('https://www.googleapis.com/youtube/v3/playlistItems', headers=req_headers, timeout=30,
+                                    params={'part': 'snippet,contentDetails', 'playlistId': playlist_id, 'maxResults': 10})
+            except requests.RequestException:
+                # One unreachable channel is skipped; the others and the quota already spent still count
+                return None
+            if resp.status_code == 304:
+                return None
+            if resp.status_code != 200:
+                if resp.status_code == 403 and 'quotaExceeded' in resp.text:
+                    limiter.exhaust()
+                return None
+            data = resp.json()
+            items = [{
+                'video_id': it.get('contentDetails', {}).get('videoId'),
+                'title': it.get('snippet', {}).get('title', ''),
+                'published': it.get('contentDetails', {}).get('videoPublishedAt') or it.get('snippet', {}).get('publishedAt', ''),
+                'channel_id': channel_id,
+                'channel': cache['channels'][channel_id].get('title', ''),
+            } for it in data.get('items', [])]
+            return playlist_id, {'etag': data.get('etag'), 'items': items}
+
+        changed = 0
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for result in pool.map(_fetch_playlist, channel_ids):
+                if result:
+                    cache['playlists'][result[0]] = result[1]
+                    changed += 1
+        cache['quota'] = {'day': day, 'spent': limiter.spent}
+        return changed
+
+    def _youtube_feed(self, cache, limit=50):
+        """Newest uploads across subscribed channels, merged from the cached playlists."""
+        subscribed = {it.get('snippet', {}).get('resourceId', {}).get('channelId') for it in cache['subscriptions']}
+        playlists = [cache['playlists'].get(cache['channels'].get(cid, {}).get('uploads'), {}).get('items', [])
+                     for cid in subscribed]
+        videos = (v for items in playlists for v in items)
+        return heapq.nlargest(limit, videos, key=lambda v: v.get('published', ''))
+
+    def display_youtube_subscriptions(self, items, feed=None):
         self.youtube_text.config(state=tk.NORMAL)
+        self._reset_text_images(self.youtube_text)
         self.youtube_text.delete(1.0, tk.END)
+        if feed:
+            self.youtube_text.insert(tk.END, "Latest uploads\n" + "=" * 80 + "\n")
+            for video in feed:
+                self.youtube_text.insert(tk.END, f"{video.get('published', '')[:10]}  {video.get('title', '')}  — {video.get('channel', '')}\n"
+                                                 f"    https://www.youtube.com/watch?v={video.get('video_id', '')}\n")
+            self.youtube_text.insert(tk.END, f"\nSubscriptions ({len(items)})\n" + "=" * 80 + "\n")
         if not items:
             self.youtube_text.insert(tk.END, "No subscriptions found")
         else:
@@ -1582,7 +3897,9 @@ class DashboardApp:
                 snippet = item.get('snippet', {})
                 title = snippet.get('title', 'Unknown')
                 channel_id = snippet.get('resourceId', {}).get('channelId', '')
-                self.youtube_text.insert(tk.END, f"{title}  [ID: {channel_id}]\n")
+                self._text_image(self.youtube_text, (snippet.get('thumbnails', {}).get('default') or {}).get('url'),
+                                 cache_key=f"yt:{channel_id}")
+                self.youtube_text.insert(tk.END, f" {title}  [ID: {channel_id}]\n")
         self.youtube_text.config(state=tk.DISABLED)
 
     # Google Contacts
@@ -1594,15 +3911,14 @@ class DashboardApp:
 
     def _fetch_google_contacts(self):
         self.update_status("Loading Contacts...")
+        self.root.after(0, self.render_contacts)
         if self.tokens.get('google_refresh'):
             self.refresh_google_token()
         headers = {'Authorization': f'Bearer {self.tokens["google"]}'}
         try:
-            url = 'https://people.googleapis.com/v1/people/me/connections?personFields=names,emailAddresses&pageSize=100'
-            resp = requests.get(url, headers=headers)
-            if resp.status_code == 200:
-                connections = resp.json().get('connections', [])
-                self.root.after(0, lambda: self.display_google_contacts(connections))
+            resp = self._sync_contacts(headers)
+            if resp is None:
+                self.root.after(0, self.render_contacts)
             elif resp.status_code == 403:
                 msg = (
                     "⚠️ People API 403\n\n"
@@ -1618,20 +3934,177 @@ class DashboardApp:
             self.root.after(0, lambda: messagebox.showerror("Error", f"Failed: {str(e)}"))
         self.root.after(0, lambda: self.update_status("Contacts loaded"))
 
+    def _sync_contacts(self, headers):
+        """Page through people.connections, incrementally once a syncToken is held.
+
+        Returns None on success or the failing response.
+        """
+        with self.contacts_lock:
+            sync_token = self.contacts_store.get('sync_token')
+        url = 'https://people.googleapis.com/v1/people/me/connections'
+        params = {'personFields': 'names,emailAddresses,phoneNumbers,photos', 'pageSize': 1000, 'requestSyncToken': 'true'}
+        if sync_token:
+            params['syncToken'] = sync_token
+        changes = []
+        while True:
+            resp = requests.get(url, headers=headers, params=params, timeout=30)
+            if sync_token and (resp.status_code == 410 or (resp.status_code == 400 and 'EXPIRED_SYNC_TOKEN' in resp.text)):
+                # Sync tokens expire after a few days; fall back to a full listing
+                with self.contacts_lock:
+                    self.contacts_store['sync_token'] = None
+                return self._sync_contacts(headers)
+            if resp.status_code != 200:
+                return resp
+            data = resp.json()
+            changes.extend(data.get('connections', []))
+            if not data.get('nextPageToken'):
+                break
+            params['pageToken'] = data['nextPageToken']
+        with self.contacts_lock:
+            people = self.contacts_store['people']
+            if not sync_token:
+                people.clear()
+                self.contacts_index = TrigramIndex()
+            for person in changes:
+                resource = person.get('resourceName')
+                if not resource:
+                    continue
+                if person.get('metadata', {}).get('deleted'):
+                    people.pop(resource, None)
+                    self.contacts_index.remove(resource)
+                else:
+                    people[resource] = person
+                    self.contacts_index.add(resource, self._contact_fields(person))
+            self.contacts_store['sync_token'] = data.get('nextSyncToken', sync_token)
+            self._save_cache('contacts_store.json', self.contacts_store)
+        return None
+
+    def _contact_fields(self, person):
+        return ([n.get('displayName', '') for n in person.get('names', [])]
+                + [e.get('value', '') for e in person.get('emailAddresses', [])]
+                + [p.get('value', '') for p in person.get('phoneNumbers', [])])
+
+    def search_contacts(self, query, limit=10):
+        """Fuzzy lookup over names, emails and phone numbers; returns People API person dicts."""
+        with self.contacts_lock:
+            people = self.contacts_store['people']
+            return [people[r] for r in self.contacts_index.search(query, limit) if r in people]
+
+    def render_contacts(self):
+        query = self.contacts_search.get().strip() if hasattr(self, 'contacts_search') else ''
+        if query:
+            self.display_google_contacts(self.search_contacts(query, limit=200))
+            return
+        with self.contacts_lock:
+            people = list(self.contacts_store['people'].values())
+        if people:
+            people.sort(key=lambda p: (p.get('names') or [{}])[0].get('displayName', '').lower())
+            self.display_google_contacts(people)
+
     def display_google_contacts(self, connections):
         self.contacts_text.config(state=tk.NORMAL)
+        self._reset_text_images(self.contacts_text)
         self.contacts_text.delete(1.0, tk.END)
         if not connections:
             self.contacts_text.insert(tk.END, "No contacts found")
         else:
-            for contact in connections:
+            for i, contact in enumerate(connections):
                 names = contact.get('names', [])
                 emails = contact.get('emailAddresses', [])
+                phones = contact.get('phoneNumbers', [])
                 name = names[0].get('displayName', 'No name') if names else 'No name'
                 email = emails[0].get('value', '') if emails else ''
-                self.contacts_text.insert(tk.END, f"{name}  <{email}>\n")
+                phone = f"  {phones[0].get('value', '')}" if phones else ''
+                photo = next((p.get('url') for p in contact.get('photos', []) if not p.get('default')), None)
+                if photo and i < 200:
+                    self._text_image(self.contacts_text, photo, cache_key=f"contact:{contact.get('resourceName')}:{photo}")
+                self.contacts_text.insert(tk.END, f"{name}  <{email}>{phone}\n")
         self.contacts_text.config(state=tk.DISABLED)
 
+    @staticmethod
+    def _split_recipients(text):
+        """Split a recipient line on commas that are not inside quotes (honouring backslash escapes) or angle brackets."""
+        parts, current, quoted, bracketed, escaped = [], [], False, False, False
+        for ch in text:
+            if escaped:
+                escaped = False
+            elif ch == '\\' and quoted:
+                escaped = True
+            elif ch == '"':
+                quoted = not quoted
+            elif ch == '<' and not quoted:
+                bracketed = True
+            elif ch == '>' and not quoted:
+                bracketed = False
+            elif ch == ',' and not quoted and not bracketed:
+                parts.append(''.join(current))
+                current = []
+                continue
+            current.append(ch)
+        parts.append(''.join(current))
+        return [p.strip() for p in parts if p.strip()]
+
+    @staticmethod
+    def _format_recipient(name, address):
+        """'"Name" <address>' as typed in a To line; the name is quoted but left unencoded."""
+        if not name:
+            return address
+        name = name.replace('\\', '\\\\').replace('"', '\\"')
+        return f'"{name}" <{address}>'
+
+    def _attach_contact_autocomplete(self, entry, parent):
+        """Suggest contacts under an Entry as the user types; completes the last comma-separated recipient."""
+        popup = tk.Listbox(parent, height=6)
+        matches = []
+
+        def _update(event=None):
+            if event is not None and event.keysym in ('Down', 'Up', 'Return', 'Escape', 'Tab'):
+                return
+            recipients = self._split_recipients(entry.get())
+            term = recipients[-1].strip('"') if recipients and not entry.get().rstrip().endswith(',') else ''
+            matches.clear()
+            popup.delete(0, tk.END)
+            if len(term) >= 2:
+                for person in self.search_contacts(term, limit=8):
+                    names = person.get('names') or [{}]
+                    for email in person.get('emailAddresses', []):
+                        matches.append(self._format_recipient(names[0].get('displayName', ''), email.get('value', '')))
+                        popup.insert(tk.END, matches[-1])
+            if matches:
+                popup.place(in_=entry, x=0, rely=1.0, relwidth=1.0)
+                popup.lift()
+            else:
+                popup.place_forget()
+
+        def _accept(event=None):
+            sel = popup.curselection()
+            if not matches:
+                return None
+            choice = matches[sel[0] if sel else 0]
+            parts = self._split_recipients(entry.get())
+            if parts and not entry.get().rstrip().endswith(','):
+                parts.pop()
+            entry.delete(0, tk.END)
+            entry.insert(0, ', '.join(parts + [choice]) + ', ')
+            popup.place_forget()
+            entry.focus_set()
+            return 'break'
+
+        def _down(event):
+            if matches:
+                popup.focus_set()
+                popup.selection_clear(0, tk.END)
+                popup.selection_set(0)
+                popup.activate(0)
+
+        entry.bind('<KeyRelease>', _update)
+        entry.bind('<Down>', _down)
+        entry.bind('<Tab>', _accept)
+        entry.bind('<Escape>', lambda e: popup.place_forget())
+        popup.bind('<Return>', _accept)
+        popup.bind('<Double-Button-1>', _accept)
+        popup.bind('<Escape>', lambda e: (popup.place_forget(), entry.focus_set()))
+
     # Tasks
     def setup_tasks_tab(self):
         tasks_frame = ttk.Frame(self.notebook)
@@ -1656,6 +4129,8 @@ class DashboardApp:
     
     def _fetch_tasks_data(self):
         self.update_status("Loading tasks...")
+        # Show what we already have while the delta is fetched
+        self.root.after(0, self.render_tasks_store)
         
         if self.tokens.get('google_refresh'):
             self.refresh_google_token()
@@ -1664,20 +4139,46 @@ class DashboardApp:
         
         try:
             lists_url = 'https://tasks.googleapis.com/tasks/v1/users/@me/lists'
-            response = requests.get(lists_url, headers=headers)
+            params = {'maxResults': 100}
+            task_lists = []
+            while True:
+                response = requests.get(lists_url, headers=headers, params=params, timeout=30)
+                if response.status_code != 200:
+                    break
+                data = response.json()
+                task_lists.extend(data.get('items', []))
+                if not data.get('nextPageToken'):
+                    break
+                params['pageToken'] = data['nextPageToken']
             
             if response.status_code == 200:
-                task_lists = response.json().get('items', [])
-                all_tasks = []
+                with self.tasks_lock:
+                    lists = self.tasks_store['lists']
+                    listed = {tl['id'] for tl in task_lists}
+                    for lid in list(lists):
+                        if lid not in listed:
+                            lists.pop(lid)
+                    for i, tl in enumerate(task_lists):
+                        entry = lists.setdefault(tl['id'], {'updated_min': None, 'tasks': {}})
+                        entry['title'] = tl.get('title', 'Untitled')
+                        entry['position'] = i
                 
-                for task_list in task_lists:
-                    tasks_url = f'https://tasks.googleapis.com/tasks/v1/lists/{task_list["id"]}/tasks'
-                    tasks_response = requests.get(tasks_url, headers=headers)
-                    if tasks_response.status_code == 200:
-                        tasks = tasks_response.json().get('items', [])
-                        all_tasks.append({'list_name': task_list['title'], 'tasks': tasks, 'list_id': task_list['id']})
-                
-                self.root.after(0, lambda: self.display_tasks(all_tasks))
+                failed = []
+                with ThreadPoolExecutor(max_workers=6) as pool:
+                    futures = {pool.submit(self._sync_task_list, headers, tl['id']): tl for tl in task_lists}
+                    for future in as_completed(futures):
+                        try:
+                            resp = future.result()
+                        except Exception:
+                            resp = None
+                        if resp is not None:
+                            failed.append(futures[future].get('title', ''))
+                with self.tasks_lock:
+                    self._save_cache('tasks_store.json', self.tasks_store)
+                self.root.after(0, self.render_tasks_store)
+                if failed:
+                    self.root.after(0, lambda: self.update_status(f"Tasks loaded ({len(failed)} list(s) failed)"))
+                    return
             elif response.status_code == 401:
                 error_msg = "⚠️ Tasks Token Invalid\n\n1. Click '🗑️ Clear Tokens'\n2. Reconnect Google"
                 self.root.after(0, lambda: self.show_text_error(self.tasks_text, error_msg))
@@ -1698,6 +4199,70 @@ class DashboardApp:
             self.root.after(0, lambda: messagebox.showerror("Error", f"Failed: {str(e)}"))
         
         self.root.after(0, lambda: self.update_status("Tasks loaded"))
+
+    def _sync_task_list(self, headers, list_id):
+        """Page through one list's tasks, only those changed since the last sync when possible.
+
+        Returns None on success or the failing response.
+        """
+        from datetime import datetime, timedelta, timezone
+        with self.tasks_lock:
+            entry = self.tasks_store['lists'][list_id]
+            updated_min = entry.get('updated_min')
+        # Watermark taken before the request (minus clock skew) so nothing updated mid-sync is missed
+        started = (datetime.now(timezone.utc) - timedelta(minutes=1)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        url = f'https://tasks.googleapis.com/tasks/v1/lists/{list_id}/tasks'
+        params = {'maxResults': 100, 'showCompleted': 'true', 'showHidden': 'true'}
+        if updated_min:
+            # Deleted tasks must be listed too, or deletions would never reach the store
+            params.update({'updatedMin': updated_min, 'showDeleted': 'true'})
+        changes = []
+        while True:
+            resp = requests.get(url, headers=headers, params=params, timeout=30)
+            if resp.status_code != 200:
+                return resp
+            data = resp.json()
+            changes.extend(data.get('items', []))
+            if not data.get('nextPageToken'):
+                break
+            params['pageToken'] = data['nextPageToken']
+        with self.tasks_lock:
+            if not updated_min:
+                entry['tasks'] = {}
+            tasks = entry['tasks']
+            for task in changes:
+                if task.get('deleted'):
+                    tasks.pop(task.get('id'), None)
+                else:
+                    tasks[task['id']] = task
+            entry['updated_min'] = started
+        return None
+
+    def _tasks_from_store(self):
+        """Task lists in display order, each with its visible tasks sorted by position."""
+        with self.tasks_lock:
+            lists = sorted(self.tasks_store['lists'].items(), key=lambda item: item[1].get('position', 0))
+            result = []
+            for lid, entry in lists:
+                children = {}
+                for task in entry['tasks'].values():
+                    if not task.get('hidden'):
+                        children.setdefault(task.get('parent'), []).append(task)
+                for siblings in children.values():
+                    siblings.sort(key=lambda t: t.get('position', ''))
+                # Depth-first so subtasks follow their parent
+                tasks, stack = [], list(reversed(children.get(None, [])))
+                while stack:
+                    task = stack.pop()
+                    tasks.append(task)
+                    stack.extend(reversed(children.get(task['id'], [])))
+                result.append({'list_name': entry.get('title', 'Untitled'), 'tasks': tasks, 'list_id': lid})
+            return result
+
+    def render_tasks_store(self):
+        task_lists = self._tasks_from_store()
+        if task_lists:
+            self.display_tasks(task_lists)
     
     def display_tasks(self, task_lists):
         self.tasks_text.config(state=tk.NORMAL)
@@ -1725,38 +4290,241 @@ class DashboardApp:
         
         self.tasks_text.config(state=tk.DISABLED)
 
-    def complete_selected_task(self):
-        from tkinter import simpledialog
-        task_id = simpledialog.askstring("Complete Task", "Enter Task ID:")
-        list_id = simpledialog.askstring("Complete Task", "Enter List ID:")
-        if not task_id or not list_id:
+    def open_task_bulk_actions(self):
+        """Multi-select tasks from the local store and complete, delete, move or reorder them in one batch."""
+        if not self.tokens.get('google'):
+            messagebox.showwarning("Warning", "Please connect Google first")
+            return
+        task_lists = self._tasks_from_store()
+        rows = [(tl['list_id'], task) for tl in task_lists for task in tl['tasks']]
+        if not rows:
+            messagebox.showinfo("Bulk Actions", "No tasks loaded. Click Load first.")
+            return
+        list_names = {tl['list_id']: tl['list_name'] for tl in task_lists}
+        win = tk.Toplevel(self.root)
+        win.title("Bulk Task Actions")
+        tk.Label(win, text="Select tasks (Shift/Ctrl for multiple):").pack(anchor=tk.W, padx=10, pady=(10, 4))
+        frame = tk.Frame(win)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10)
+        scroll = tk.Scrollbar(frame)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        listbox = tk.Listbox(frame, selectmode=tk.EXTENDED, width=90, height=20, yscrollcommand=scroll.set)
+        listbox.pack(fill=tk.BOTH, expand=True)
+        scroll.config(command=listbox.yview)
+        for list_id, task in rows:
+            checkbox = "✓" if task.get('status') == 'completed' else "☐"
+            indent = "    " if task.get('parent') else ""
+            listbox.insert(tk.END, f"{indent}{checkbox} {task.get('title', 'Untitled')}  [{list_names.get(list_id, '')}]")
+
+        target = tk.Frame(win)
+        target.pack(fill=tk.X, padx=10, pady=(6, 0))
+        tk.Label(target, text="Move to list:").pack(side=tk.LEFT)
+        target_var = tk.StringVar(value=task_lists[0]['list_name'])
+        ttk.Combobox(target, textvariable=target_var, values=[tl['list_name'] for tl in task_lists],
+                     state='readonly', width=30).pack(side=tk.LEFT, padx=5)
+
+        def _run(action):
+            chosen = [(rows[i][0], rows[i][1]['id']) for i in listbox.curselection()]
+            if not chosen:
+                return
+            if action == 'delete' and not messagebox.askyesno("Bulk Actions", f"Delete {len(chosen)} task(s)?", parent=win):
+                return
+            dest = next((tl['list_id'] for tl in task_lists if tl['list_name'] == target_var.get()), None)
+            win.destroy()
+            threading.Thread(target=self._bulk_task_operation, args=(action, chosen, dest), daemon=True).start()
+
+        btns = tk.Frame(win)
+        btns.pack(pady=8)
+        tk.Button(btns, text="Complete", command=lambda: _run('complete')).pack(side=tk.LEFT, padx=4)
+        tk.Button(btns, text="Move to List", command=lambda: _run('move')).pack(side=tk.LEFT, padx=4)
+        tk.Button(btns, text="Move to Top", command=lambda: _run('top')).pack(side=tk.LEFT, padx=4)
+        tk.Button(btns, text="Move Up", command=lambda: _run('up')).pack(side=tk.LEFT, padx=4)
+        tk.Button(btns, text="Move Down", command=lambda: _run('down')).pack(side=tk.LEFT, padx=4)
+        tk.Button(btns, text="Delete", command=lambda: _run('delete'), bg='#e74c3c', fg='white').pack(side=tk.LEFT, padx=4)
+
+    def bulk_create_tasks(self):
+        """Create one task per pasted line, all in a single batch request."""
+        if not self.tokens.get('google'):
+            messagebox.showwarning("Warning", "Please connect Google first")
+            return
+        task_lists = self._tasks_from_store()
+        if not task_lists:
+            messagebox.showinfo("Paste Tasks", "No task lists loaded. Click Load first.")
+            return
+        win = tk.Toplevel(self.root)
+        win.title("Paste Tasks")
+        tk.Label(win, text="One task per line:").pack(anchor=tk.W, padx=10, pady=(10, 4))
+        text = scrolledtext.ScrolledText(win, width=70, height=15)
+        text.pack(fill=tk.BOTH, expand=True, padx=10)
+        row = tk.Frame(win)
+        row.pack(fill=tk.X, padx=10, pady=6)
+        tk.Label(row, text="List:").pack(side=tk.LEFT)
+        list_var = tk.StringVar(value=task_lists[0]['list_name'])
+        ttk.Combobox(row, textvariable=list_var, values=[tl['list_name'] for tl in task_lists],
+                     state='readonly', width=30).pack(side=tk.LEFT, padx=5)
+
+        def _create():
+            titles = [line.strip() for line in text.get(1.0, tk.END).splitlines() if line.strip()]
+            list_id = next((tl['list_id'] for tl in task_lists if tl['list_name'] == list_var.get()), None)
+            if not titles or not list_id:
+                return
+            win.destroy()
+            threading.Thread(target=self._bulk_task_operation, args=('create', titles, list_id), daemon=True).start()
+        tk.Button(win, text="Create Tasks", command=_create).pack(pady=(0, 8))
+
+    def _bulk_task_operation(self, action, items, dest_list=None):
+        """Apply a bulk action to the local store first, then confirm it through the Tasks batch endpoint.
+
+        items are (list_id, task_id) pairs, or titles for 'create'. Every item is rolled back
+        individually if its part of the batch fails, so one bad task does not undo the rest.
+        """
+        self.update_status(f"Tasks: {action} {len(items)} item(s)...")
+        if self.tokens.get('google_refresh'):
+            self.refresh_google_token()
+        headers = {'Authorization': f'Bearer {self.tokens["google"]}'}
+        batch_url = 'https://www.googleapis.com/batch/tasks/v1'
+        base = '/tasks/v1/lists'
+        lists = self.tasks_store['lists']
+
+        # Optimistic update: remember each touched task so it can be restored on failure
+        ops = []  # (call, list_id, task_id, snapshot)
+        with self.tasks_lock:
+            if action == 'create':
+                stamp = int(time.time() * 1000)
+                for i, title in enumerate(items):
+                    temp_id = f"local-{stamp}-{i}"
+                    lists[dest_list]['tasks'][temp_id] = {'id': temp_id, 'title': title, 'status': 'needsAction',
+                                                          'position': f" {i:05d}"}
+                    ops.append((('POST', f"{base}/{dest_list}/tasks", {'title': title}), dest_list, temp_id, None))
+            elif action in ('up', 'down'):
+                ops = self._plan_task_steps(action, items, base)
+            else:
+                for i, (list_id, task_id) in enumerate(items):
+                    task = lists.get(list_id, {}).get('tasks', {}).get(task_id)
+                    if task is None:
+                        continue
+                    snapshot = dict(task)
+                    path = f"{base}/{list_id}/tasks/{task_id}"
+                    if action == 'complete':
+                        task['status'] = 'completed'
+                        call = ('PATCH', path, {'status': 'completed'})
+                    elif action == 'delete':
+                        lists[list_id]['tasks'].pop(task_id)
+                        call = ('DELETE', path, None)
+                    elif action == 'move':
+                        if list_id == dest_list:
+                            continue
+                        lists[list_id]['tasks'].pop(task_id)
+                        moved = dict(task)
+                        moved.pop('parent', None)
+                        lists[dest_list]['tasks'][task_id] = moved
+                        call = ('POST', f"{path}/move?destinationTasklist={requests.utils.quote(dest_list)}", None)
+                    else:  # top: keep the selection's order as a block at the head of its list
+                        task['position'] = f" {i:05d}"
+                        task.pop('parent', None)
+                        call = ('POST', f"{path}/move", None)
+                    ops.append((call, list_id, task_id, snapshot))
+        self.root.after(0, self.render_tasks_store)
+        if not ops:
+            self.root.after(0, lambda: self.update_status("Ready"))
             return
-        threading.Thread(target=self._complete_task, args=(list_id, task_id), daemon=True).start()
 
-    def _complete_task(self, list_id, task_id):
-        headers = {
-            'Authorization': f'Bearer {self.tokens["google"]}',
-            'Content-Type': 'application/json'
-        }
         try:
-            # tasks.update requires the task body; fetch then update status
-            get_url = f'https://tasks.googleapis.com/tasks/v1/lists/{list_id}/tasks/{task_id}'
-            resp = requests.get(get_url, headers=headers)
-            if resp.status_code == 200:
-                body = resp.json()
-                body['status'] = 'completed'
-                upd_url = f'https://tasks.googleapis.com/tasks/v1/lists/{list_id}/tasks/{task_id}'
-                resp2 = requests.put(upd_url, headers=headers, json=body)
-                if resp2.status_code == 200:
-                    self.root.after(0, lambda: messagebox.showinfo("Success", "Task marked completed"))
-                    self.root.after(0, self.load_tasks_data)
-                else:
-                    self.root.after(0, lambda: messagebox.showerror("Error", f"Failed: {resp2.text}"))
+            if action in ('create', 'top', 'up', 'down'):
+                # Inserts and moves within one list depend on each other, so each batch carries at
+                # most one per list; for 'create' and 'top' each task is placed after the one before it
+                results = [None] * len(ops)
+                by_list = {}
+                for idx, op in enumerate(ops):
+                    by_list.setdefault(op[1], []).append(idx)
+                previous = {}
+                for rnd in range(max(len(v) for v in by_list.values())):
+                    round_idx = [v[rnd] for v in by_list.values() if rnd < len(v)]
+                    calls = []
+                    for idx in round_idx:
+                        method, path, body = ops[idx][0]
+                        if action in ('create', 'top') and ops[idx][1] in previous:
+                            path += f"?previous={previous[ops[idx][1]]}"
+                        calls.append((method, path, body))
+                    for idx, result in zip(round_idx, self._google_batch(batch_url, calls, headers)):
+                        results[idx] = result
+                        if result[0] == 200:
+                            # A created task is only known by the id the server gave it
+                            body = result[1]
+                            created = body.get('id') if action == 'create' and isinstance(body, dict) else None
+                            previous[ops[idx][1]] = created or ops[idx][2]
             else:
-                self.root.after(0, lambda: messagebox.showerror("Error", f"Failed: {resp.text}"))
+                results = self._google_batch(batch_url, [op[0] for op in ops], headers)
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Failed: {str(e)}"))
+            results = [(0, str(e))] * len(ops)
+
+        ok = 0
+        with self.tasks_lock:
+            for (call, list_id, task_id, snapshot), (status, body) in zip(ops, results):
+                success = status in (200, 204) or (action == 'delete' and status == 404)
+                target = dest_list if action in ('create', 'move') else list_id
+                if success:
+                    ok += 1
+                    if isinstance(body, dict) and body.get('id'):
+                        lists[target]['tasks'].pop(task_id, None)
+                        lists[target]['tasks'][body['id']] = body
+                    continue
+                # Roll back just this item
+                if action in ('create', 'move'):
+                    lists.get(target, {}).get('tasks', {}).pop(task_id, None)
+                if snapshot is not None and list_id in lists:
+                    lists[list_id]['tasks'][task_id] = snapshot
+            self._save_cache('tasks_store.json', self.tasks_store)
+
+        failed = len(ops) - ok
+        msg = f"{action.capitalize()}: {ok} task(s) done" + (f", {failed} failed and rolled back" if failed else "")
+        self.root.after(0, self.render_tasks_store)
+        self.root.after(0, lambda: self.update_status(msg))
+        if failed:
+            self.root.after(0, lambda: messagebox.showwarning("Bulk Actions", msg))
+        # Pull server-side positions for anything that moved
+        self.root.after(0, self.load_tasks_data)
     
+    def _plan_task_steps(self, action, items, base):
+        """Plan moving each selected task one place up or down among its siblings.
+
+        The swaps happen on a scratch copy of the sibling order; stored positions are left
+        alone and the server's come back with each move and the reload after it. Returns
+        move calls in the order they must run; each names the sibling the task follows
+        afterwards (or none, for the head of the list). Called with tasks_lock held.
+        """
+        lists = self.tasks_store['lists']
+        selected = set(items)
+        groups = {}
+        for list_id, task_id in items:
+            task = lists.get(list_id, {}).get('tasks', {}).get(task_id)
+            if task is not None:
+                groups.setdefault((list_id, task.get('parent')), None)
+        ops = []
+        for (list_id, parent) in groups:
+            tasks = lists[list_id]['tasks']
+            siblings = sorted((t for t in tasks.values() if t.get('parent') == parent and not t.get('hidden')),
+                              key=lambda t: t.get('position', ''))
+            order = range(1, len(siblings)) if action == 'up' else range(len(siblings) - 2, -1, -1)
+            step = -1 if action == 'up' else 1
+            for i in order:
+                task, neighbour = siblings[i], siblings[i + step]
+                # A selected block already at the edge stays put
+                if (list_id, task['id']) not in selected or (list_id, neighbour['id']) in selected:
+                    continue
+                snapshot = dict(task)
+                siblings[i], siblings[i + step] = neighbour, task
+                new_index = i + step
+                params = {}
+                if parent:
+                    params['parent'] = parent
+                if new_index > 0:
+                    params['previous'] = siblings[new_index - 1]['id']
+                query = '&'.join(f"{k}={requests.utils.quote(v)}" for k, v in params.items())
+                path = f"{base}/{list_id}/tasks/{task['id']}/move" + (f"?{query}" if query else '')
+                ops.append((('POST', path, None), list_id, task['id'], snapshot))
+        return ops
+
     def create_task(self):
         if not self.tokens.get('google'):
             messagebox.showwarning("Warning", "Please connect Google first")
@@ -1801,6 +4569,7 @@ class DashboardApp:
         if not self.tokens.get('google'):
             messagebox.showwarning("Warning", "Please connect Google first")
             return
+        self.render_calendar_views()
         threading.Thread(target=self._fetch_calendar_data, daemon=True).start()
     
     def _fetch_calendar_data(self):
@@ -1812,14 +4581,10 @@ class DashboardApp:
         headers = {'Authorization': f'Bearer {self.tokens["google"]}'}
         
         try:
-            from datetime import timezone, datetime
-            now = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
-            url = f'https://www.googleapis.com/calendar/v3/calendars/primary/events?timeMin={now}&maxResults=20&singleEvents=true&orderBy=startTime'
-            response = requests.get(url, headers=headers)
+            response = self._sync_calendar_store(headers)
             
-            if response.status_code == 200:
-                events = response.json().get('items', [])
-                self.root.after(0, lambda: self.display_calendar_events(events))
+            if response is None:
+                self.root.after(0, self.render_calendar_views)
             elif response.status_code == 401:
                 error_msg = "⚠️ Calendar Token Invalid\n\n1. Click '🗑️ Clear Tokens'\n2. Reconnect Google"
                 self.root.after(0, lambda: self.show_text_error(self.calendar_text, error_msg))
@@ -1840,6 +4605,335 @@ class DashboardApp:
             self.root.after(0, lambda: messagebox.showerror("Error", f"Failed: {str(e)}"))
         
         self.root.after(0, lambda: self.update_status("Calendar loaded"))
+
+    def _sync_calendar_store(self, headers, force=False):
+        """Bring the local event store up to date. Returns None on success or the failing response.
+
+        The first run is a full listing; later runs send the stored syncToken and only
+        receive what changed. Calls arriving within a few seconds of a finished sync
+        (e.g. Calendar and Agenda refreshed together) reuse that result.
+        """
+        with self.calendar_sync_lock:
+            if not force and time.time() - self.calendar_last_sync < 5:
+                return None
+            resp = self._sync_calendar_list(headers)
+            if resp is not None:
+                return resp
+            with self.calendar_lock:
+                calendar_ids = list(self.calendar_store['calendars'])
+            # Each calendar keeps its own syncToken, so the deltas can be fetched side by side
+            with ThreadPoolExecutor(max_workers=6) as pool:
+                results = list(pool.map(lambda cid: self._sync_calendar_events(headers, cid), calendar_ids))
+            failures = [r for r in results if r is not None]
+            if failures and len(failures) == len(calendar_ids):
+                return failures[0]
+            self.calendar_last_sync = time.time()
+            with self.calendar_lock:
+                self._save_cache('calendar_store.json', self.calendar_store)
+            return None
+
+    def _sync_calendar_list(self, headers):
+        """Discover the user's calendars (primary, shared, resources) via calendarList."""
+        with self.calendar_lock:
+            sync_token = self.calendar_store.get('list_sync_token')
+        params = {'maxResults': 250}
+        if sync_token:
+            params['syncToken'] = sync_token
+        entries = []
+        while True:
+            resp = requests.get('https://www.googleapis.com/calendar/v3/users/me/calendarList',
+                                headers=headers, params=params, timeout=30)
+            if resp.status_code == 410:
+                with self.calendar_lock:
+                    self.calendar_store['list_sync_token'] = None
+                return self._sync_calendar_list(headers)
+            if resp.status_code != 200:
+                return resp
+            data = resp.json()
+            entries.extend(data.get('items', []))
+            if data.get('nextPageToken'):
+                params['pageToken'] = data['nextPageToken']
+                continue
+            break
+        with self.calendar_lock:
+            calendars = self.calendar_store['calendars']
+            if not sync_token:
+                # A full listing is authoritative: forget calendars the user no longer has
+                listed = {entry['id'] for entry in entries}
+                for cid in list(calendars):
+                    if cid not in listed:
+                        calendars.pop(cid)
+                        self.calendar_index.pop(cid, None)
+            for entry in entries:
+                cid = entry['id']
+                if entry.get('deleted'):
+                    calendars.pop(cid, None)
+                    self.calendar_index.pop(cid, None)
+                    continue
+                cal = calendars.setdefault(cid, {'sync_token': None, 'events': {}, 'visible': entry.get('selected', False) or entry.get('primary', False)})
+                cal['summary'] = entry.get('summaryOverride') or entry.get('summary', cid)
+                cal['color'] = entry.get('backgroundColor', '#3498db')
+                cal['primary'] = entry.get('primary', False)
+            self.calendar_store['list_sync_token'] = data.get('nextSyncToken')
+        return None
+
+    def _sync_calendar_events(self, headers, calendar_id):
+        with self.calendar_lock:
+            cal = self.calendar_store['calendars'].setdefault(calendar_id, {'sync_token': None, 'events': {}})
+            sync_token = cal.get('sync_token')
+        url = f'https://www.googleapis.com/calendar/v3/calendars/{requests.utils.quote(calendar_id)}/events'
+        # Recurring series arrive once as a master event and are expanded locally per window
+        params = {'maxResults': 2500}
+        if sync_token:
+            params['syncToken'] = sync_token
+        changes, full = [], not sync_token
+        while True:
+            resp = requests.get(url, headers=headers, params=params, timeout=30)
+            if resp.status_code == 410:
+                # Token expired server-side: drop it and start over with a full sync
+                with self.calendar_lock:
+                    cal['sync_token'] = None
+                return self._sync_calendar_events(headers, calendar_id)
+            if resp.status_code != 200:
+                return resp
+            data = resp.json()
+            changes.extend(data.get('items', []))
+            if data.get('nextPageToken'):
+                params['pageToken'] = data['nextPageToken']
+                continue
+            break
+        with self.calendar_lock:
+            if full:
+                cal['events'] = {}
+            events = cal['events']
+            for ev in changes:
+                if ev.get('status') == 'cancelled' and not ev.get('recurringEventId'):
+                    events.pop(ev.get('id'), None)
+                else:
+                    # Cancelled instances of a series are kept: they act as exclusions
+                    ev['_calendar_id'] = calendar_id
+                    events[ev['id']] = ev
+            cal['sync_token'] = data.get('nextSyncToken')
+            self._rebuild_calendar_index(calendar_id)
+        return None
+
+    def _event_start_ts(self, event):
+        from datetime import datetime
+        start = event.get('start', {})
+        try:
+            if start.get('dateTime'):
+                return datetime.fromisoformat(start['dateTime'].replace('Z', '+00:00')).timestamp()
+            if start.get('date'):
+                return datetime.strptime(start['date'], '%Y-%m-%d').timestamp()
+        except ValueError:
+            pass
+        return 0.0
+
+    def _event_end_ts(self, event):
+        end = event.get('end')
+        return self._event_start_ts({'start': end}) if end else self._event_start_ts(event)
+
+    def _rebuild_calendar_index(self, calendar_id=None):
+        """Per calendar: a sorted (start timestamp, event id) list of one-off events for bisect
+        range queries, the IDs of recurring masters, and modified/cancelled instances keyed by
+        (series ID, original start)."""
+        cal_ids = [calendar_id] if calendar_id else list(self.calendar_store['calendars'])
+        for cid in cal_ids:
+            events = self.calendar_store['calendars'].get(cid, {}).get('events', {})
+            index, recurring, overrides, span = [], [], {}, 0
+            for eid, ev in events.items():
+                if ev.get('recurrence'):
+                    recurring.append(eid)
+                    continue
+                if ev.get('recurringEventId'):
+                    original = self._event_start_ts({'start': ev.get('originalStartTime', {})})
+                    overrides[(ev['recurringEventId'], round(original))] = ev
+                    if ev.get('status') == 'cancelled':
+                        continue
+                start_ts = self._event_start_ts(ev)
+                index.append((start_ts, eid))
+                span = max(span, self._event_end_ts(ev) - start_ts)
+            index.sort()
+            self.calendar_index[cid] = index
+            self.calendar_span[cid] = span
+            self.calendar_recurring[cid] = recurring
+            self.calendar_overrides[cid] = overrides
+
+    RECURRENCE_BLOCK = 28 * 86400
+    RECURRENCE_HORIZON = 366 * 86400
+
+    def _recurrence_instances(self, calendar_id, master, start_ts, end_ts):
+        """Yield (start_ts, instance) pairs for occurrences overlapping [start_ts, end_ts), in order.
+
+        The rule is expanded in fixed day-aligned blocks that are cached per series revision,
+        so repeated renders hit the cache whatever "now" is. Expansion is lazy: a caller that
+        stops after a few events never expands later blocks. Open-ended windows are capped
+        at a year past now.
+        """
+        end_ts = min(end_ts, max(start_ts, time.time()) + self.RECURRENCE_HORIZON)
+        duration = self._event_end_ts(master) - self._event_start_ts(master)
+        block = int((start_ts - duration) // self.RECURRENCE_BLOCK)
+        while block * self.RECURRENCE_BLOCK < end_ts:
+            for ts, inst in self._recurrence_block(calendar_id, master, block):
+                if ts >= end_ts:
+                    return
+                if ts + max(duration, 1) > start_ts:
+                    yield ts, inst
+            block += 1
+
+    def _recurrence_block(self, calendar_id, master, block):
+        """Occurrences of a series starting inside one RECURRENCE_BLOCK, from a small LRU."""
+        key = (calendar_id, master['id'], master.get('updated'), block)
+        cached = self.recurrence_cache.get(key)
+        if cached is not None:
+            self.recurrence_cache.move_to_end(key)
+            return cached
+        block_start, block_end = block * self.RECURRENCE_BLOCK, (block + 1) * self.RECURRENCE_BLOCK
+        try:
+            from dateutil.rrule import rrulestr
+        except ImportError:
+            # Without dateutil only the first occurrence of a series can be shown
+            ts = self._event_start_ts(master)
+            return [(ts, master)] if block_start <= ts < block_end else []
+
+        from datetime import datetime, timedelta, timezone
+        start, end = master.get('start', {}), master.get('end', {})
+        all_day = 'date' in start and 'dateTime' not in start
+        if all_day:
+            dtstart = datetime.strptime(start['date'], '%Y-%m-%d')
+            duration = datetime.strptime(end.get('date', start['date']), '%Y-%m-%d') - dtstart
+            window = (datetime.fromtimestamp(block_start), datetime.fromtimestamp(block_end))
+        else:
+            dtstart = datetime.fromisoformat(start['dateTime'].replace('Z', '+00:00'))
+            if start.get('timeZone'):
+                try:
+                    from zoneinfo import ZoneInfo
+                    # Expand in the series' own zone so wall-clock times survive DST changes
+                    dtstart = dtstart.astimezone(ZoneInfo(start['timeZone']))
+                except Exception:
+                    pass
+            end_dt = datetime.fromisoformat(end.get('dateTime', start['dateTime']).replace('Z', '+00:00'))
+            duration = end_dt - dtstart
+            window = (datetime.fromtimestamp(block_start, timezone.utc), datetime.fromtimestamp(block_end, timezone.utc))
+
+        lines = []
+        for line in master['recurrence']:
+            if not all_day:
+                # An aware DTSTART requires UTC UNTIL values; date-only UNTILs cover the whole day
+                line = re.sub(r'UNTIL=(\d{8})(?=;|$)', r'UNTIL=\1T235959Z', line)
+            lines.append(line)
+        instances = []
+        try:
+            rules = rrulestr('\n'.join(lines), dtstart=dtstart, forceset=True)
+            occurrences = rules.between(window[0], window[1] - timedelta(microseconds=1), inc=True)
+        except Exception:
+            occurrences = []
+        for occ in occurrences:
+            inst = {k: v for k, v in master.items() if k != 'recurrence'}
+            if all_day:
+                inst['start'] = {'date': occ.strftime('%Y-%m-%d')}
+                inst['end'] = {'date': (occ + duration).strftime('%Y-%m-%d')}
+                stamp = occ.strftime('%Y%m%d')
+            else:
+                inst['start'] = dict(start, dateTime=occ.isoformat())
+                inst['end'] = dict(end, dateTime=(occ + duration).isoformat())
+                stamp = occ.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+            # Same ID scheme Google uses for instances, so delete/update calls address the occurrence
+            inst['id'] = f"{master['id']}_{stamp}"
+            inst['recurringEventId'] = master['id']
+            inst['originalStartTime'] = inst['start']
+            inst['_instance_of'] = master['id']
+            instances.append((occ.timestamp(), inst))
+
+        self.recurrence_cache[key] = instances
+        if len(self.recurrence_cache) > 2048:
+            self.recurrence_cache.popitem(last=False)
+        return instances
+
+    def _calendar_events_between(self, start_ts, end_ts, limit=None):
+        """Events overlapping [start_ts, end_ts) across visible calendars, merged into one timeline.
+
+        One-off events come from each calendar's sorted index, reaching back by the calendar's
+        longest event so ones already in progress are included; recurring series are expanded
+        lazily. Each calendar's stream is sorted, so a k-way heap merge yields the combined
+        order and stops early once limit events are taken.
+        """
+        def _series(cid, master, overrides):
+            for ts, inst in self._recurrence_instances(cid, master, start_ts, end_ts):
+                # Moved or cancelled occurrences are represented by their own event
+                if (master['id'], round(ts)) not in overrides:
+                    yield ts, inst['id'], inst
+
+        with self.calendar_lock:
+            calendars = self.calendar_store['calendars']
+            streams = []
+            for cid, index in self.calendar_index.items():
+                if not calendars.get(cid, {}).get('visible', True):
+                    continue
+                events = calendars[cid]['events']
+                lo = bisect.bisect_left(index, (start_ts - self.calendar_span.get(cid, 0), ''))
+                hi = bisect.bisect_left(index, (end_ts, ''))
+                streams.append([(ts, eid, events[eid]) for ts, eid in index[lo:hi]
+                                if ts >= start_ts or self._event_end_ts(events[eid]) > start_ts])
+                overrides = self.calendar_overrides.get(cid, {})
+                streams.extend(_series(cid, events[master_id], overrides) for master_id in self.calendar_recurring.get(cid, []))
+            merged = itertools.islice(heapq.merge(*streams, key=lambda item: item[:2]), limit)
+            return [event for _, _, event in merged]
+
+    def _calendar_name(self, event):
+        cal = self.calendar_store['calendars'].get(event.get('_calendar_id'), {})
+        return cal.get('summary', event.get('_calendar_id', 'primary'))
+
+    def choose_visible_calendars(self):
+        """Toggle calendars on and off; the timeline is re-merged from the local store without refetching."""
+        calendars = self.calendar_store['calendars']
+        if not calendars:
+            messagebox.showinfo("Calendars", "Load the calendar first to discover your calendars")
+            return
+        win = tk.Toplevel(self.root)
+        win.title("Visible Calendars")
+
+        def _toggle(cid, var):
+            with self.calendar_lock:
+                calendars[cid]['visible'] = var.get()
+                self._save_cache('calendar_store.json', self.calendar_store)
+            self.render_calendar_views()
+
+        ordered = sorted(calendars.items(), key=lambda item: (not item[1].get('primary'), item[1].get('summary', '').lower()))
+        for cid, cal in ordered:
+            row = tk.Frame(win)
+            row.pack(fill=tk.X, padx=10, pady=2)
+            tk.Label(row, text="  ", bg=cal.get('color', '#3498db')).pack(side=tk.LEFT, padx=(0, 6))
+            var = tk.BooleanVar(value=cal.get('visible', True))
+            tk.Checkbutton(row, text=cal.get('summary', cid), variable=var,
+                           command=lambda c=cid, v=var: _toggle(c, v)).pack(side=tk.LEFT)
+        tk.Button(win, text="Close", command=win.destroy).pack(pady=8)
+
+    def render_calendar_views(self):
+        """Serve both the Calendar and Agenda tabs from the shared local store."""
+        now = time.time()
+        upcoming = self._calendar_events_between(now, float('inf'), limit=20)
+        agenda = self._calendar_events_between(now, now + 7 * 86400, limit=50)
+        if upcoming or self.calendar_last_sync:
+            self.display_calendar_events(upcoming)
+        if agenda or self.calendar_last_sync:
+            self.display_calendar_agenda(agenda)
+        if hasattr(self, 'calendar_view'):
+            self.calendar_view.refresh()
+
+    def _calendar_event_color(self, event):
+        cal = self.calendar_store['calendars'].get(event.get('_calendar_id'), {})
+        return cal.get('color', '#3498db')
+
+    def show_calendar_event(self, event):
+        start = event.get('start', {})
+        end = event.get('end', {})
+        details = (f"Start: {start.get('dateTime', start.get('date', ''))}\n"
+                   f"End: {end.get('dateTime', end.get('date', ''))}\n"
+                   f"Calendar: {self._calendar_name(event)}\n"
+                   f"Location: {event.get('location', 'No location')}\n\n"
+                   f"{event.get('description', '')}")
+        messagebox.showinfo(event.get('summary', 'Untitled'), details)
     
     def display_calendar_events(self, events):
         self.calendar_events_cache = events
@@ -1859,6 +4953,7 @@ class DashboardApp:
                 self.calendar_text.insert(tk.END, f"Title: {title}\n")
                 self.calendar_text.insert(tk.END, f"Start: {start_time}\n")
                 self.calendar_text.insert(tk.END, f"Location: {location}\n")
+                self.calendar_text.insert(tk.END, f"Calendar: {self._calendar_name(event)}\n")
                 self.calendar_text.insert(tk.END, f"Description: {description}\n")
                 self.calendar_text.insert(tk.END, f"Event ID: {event.get('id','')}\n")
                 self.calendar_text.insert(tk.END, "-" * 80 + "\n\n")
@@ -1866,24 +4961,256 @@ class DashboardApp:
         self.calendar_text.config(state=tk.DISABLED)
 
     def delete_selected_calendar_event(self):
-        # expects user to select ID text manually; simple prompt
-        from tkinter import simpledialog
-        event_id = simpledialog.askstring("Delete Event", "Enter Event ID:")
-        if not event_id:
+        """Pick any number of upcoming events from the local store and delete them in batches."""
+        if not self.tokens.get('google'):
+            messagebox.showwarning("Warning", "Please connect Google first")
             return
-        threading.Thread(target=self._delete_calendar_event, args=(event_id,), daemon=True).start()
-
-    def _delete_calendar_event(self, event_id):
+        now = time.time()
+        events = self._calendar_events_between(now - 30 * 86400, now + 365 * 86400)
+        if not events:
+            messagebox.showinfo("Delete Events", "No events loaded. Click Load first.")
+            return
+        win = tk.Toplevel(self.root)
+        win.title("Delete Events")
+        tk.Label(win, text="Select events to delete (Shift/Ctrl for multiple):").pack(anchor=tk.W, padx=10, pady=(10, 4))
+        frame = tk.Frame(win)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10)
+        scroll = tk.Scrollbar(frame)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        listbox = tk.Listbox(frame, selectmode=tk.EXTENDED, width=90, height=20, yscrollcommand=scroll.set)
+        listbox.pack(fill=tk.BOTH, expand=True)
+        scroll.config(command=listbox.yview)
+        for ev in events:
+            start = ev.get('start', {})
+            listbox.insert(tk.END, f"{start.get('dateTime', start.get('date', ''))[:16]}  {ev.get('summary', 'Untitled')}  [{self._calendar_name(ev)}]")
+
+        def _delete():
+            chosen = [events[i] for i in listbox.curselection()]
+            if not chosen or not messagebox.askyesno("Delete Events", f"Delete {len(chosen)} event(s)?", parent=win):
+                return
+            win.destroy()
+            targets = [(ev.get('_calendar_id', 'primary'), ev['id']) for ev in chosen]
+            threading.Thread(target=self._delete_calendar_events, args=(targets,), daemon=True).start()
+        tk.Button(win, text="Delete Selected", command=_delete, bg='#e74c3c', fg='white').pack(pady=8)
+
+    def _delete_calendar_events(self, targets):
+        self.update_status(f"Deleting {len(targets)} event(s)...")
+        if self.tokens.get('google_refresh'):
+            self.refresh_google_token()
         headers = {'Authorization': f'Bearer {self.tokens["google"]}'}
+        calls = [('DELETE', f'/calendar/v3/calendars/{requests.utils.quote(cid)}/events/{eid}', None) for cid, eid in targets]
         try:
-            resp = requests.delete(f'https://www.googleapis.com/calendar/v3/calendars/primary/events/{event_id}', headers=headers)
-            if resp.status_code in (200, 204):
-                self.root.after(0, lambda: messagebox.showinfo("Success", "Event deleted"))
-                self.root.after(0, self.load_calendar_data)
-            else:
-                self.root.after(0, lambda: messagebox.showerror("Error", f"Failed: {resp.text}"))
+            results = self._google_batch('https://www.googleapis.com/batch/calendar/v3', calls, headers)
+            deleted = 0
+            with self.calendar_lock:
+                for (cid, eid), (status, _) in zip(targets, results):
+                    if status in (200, 204, 410):
+                        deleted += 1
+                        self.calendar_store['calendars'].get(cid, {}).get('events', {}).pop(eid, None)
+                for cid in {cid for cid, _ in targets}:
+                    self._rebuild_calendar_index(cid)
+            failed = len(targets) - deleted
+            msg = f"Deleted {deleted} event(s)" + (f", {failed} failed" if failed else "")
+            # Deleted occurrences of a series come back from the delta as cancelled instances
+            self.calendar_last_sync = 0
+            self.root.after(0, self.load_calendar_data)
+            self.root.after(0, lambda: messagebox.showinfo("Delete Events", msg))
         except Exception as e:
             self.root.after(0, lambda: messagebox.showerror("Error", f"Failed: {str(e)}"))
+        self.root.after(0, lambda: self.update_status("Ready"))
+
+    # ICS import / export
+    def import_calendar_ics(self):
+        if not self.tokens.get('google'):
+            messagebox.showwarning("Warning", "Please connect Google first")
+            return
+        path = filedialog.askopenfilename(filetypes=[("iCalendar", "*.ics"), ("All files", "*.*")])
+        if path:
+            threading.Thread(target=self._import_calendar_ics, args=(path,), daemon=True).start()
+
+    def _import_calendar_ics(self, path, calendar_id='primary'):
+        """Stream VEVENTs from disk and import them 50 per batch request."""
+        self.update_status("Importing ICS...")
+        if self.tokens.get('google_refresh'):
+            self.refresh_google_token()
+        headers = {'Authorization': f'Bearer {self.tokens["google"]}'}
+        base = f'/calendar/v3/calendars/{requests.utils.quote(calendar_id)}/events'
+        imported, failed, chunk = 0, 0, []
+        try:
+            for props in self._iter_ics_events(path):
+                event = self._ics_to_google_event(props)
+                if not event:
+                    failed += 1
+                    continue
+                # events.import keys on iCalUID, so re-importing the same file updates instead of duplicating
+                chunk.append(('POST', base + '/import' if event.get('iCalUID') else base, event))
+                if len(chunk) == 50:
+                    ok = sum(1 for status, _ in self._google_batch('https://www.googleapis.com/batch/calendar/v3', chunk, headers) if status == 200)
+                    imported, failed, chunk = imported + ok, failed + len(chunk) - ok, []
+                    self.update_status(f"Imported {imported} event(s)...")
+            if chunk:
+                ok = sum(1 for status, _ in self._google_batch('https://www.googleapis.com/batch/calendar/v3', chunk, headers) if status == 200)
+                imported, failed = imported + ok, failed + len(chunk) - ok
+            msg = f"Imported {imported} event(s)" + (f", {failed} failed" if failed else "")
+            self.root.after(0, lambda: messagebox.showinfo("Import ICS", msg))
+            self.calendar_last_sync = 0
+            self.root.after(0, self.load_calendar_data)
+        except Exception as e:
+            self.root.after(0, lambda: messagebox.showerror("Import ICS", f"Failed: {str(e)}"))
+        self.root.after(0, lambda: self.update_status("Ready"))
+
+    def _iter_ics_events(self, path):
+        """Yield each VEVENT as {NAME: [(params, value), ...]}, reading the file line by line."""
+        def _unfolded(f):
+            pending = None
+            for raw in f:
+                line = raw.rstrip('\r\n')
+                if line[:1] in (' ', '\t') and pending is not None:
+                    pending += line[1:]
+                    continue
+                if pending is not None:
+                    yield pending
+                pending = line
+            if pending is not None:
+                yield pending
+
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            current, depth = None, 0
+            for line in _unfolded(f):
+                if line == 'BEGIN:VEVENT':
+                    current, depth = {}, 0
+                    continue
+                if current is None:
+                    continue
+                if line.startswith('BEGIN:'):
+                    depth += 1  # nested component such as VALARM
+                elif line.startswith('END:'):
+                    if depth:
+                        depth -= 1
+                    elif line == 'END:VEVENT':
+                        yield current
+                        current = None
+                elif not depth and ':' in line:
+                    head, value = line.split(':', 1)
+                    name, *param_parts = head.split(';')
+                    params = dict(p.split('=', 1) for p in param_parts if '=' in p)
+                    current.setdefault(name.upper(), []).append((params, value))
+
+    def _ics_unescape(self, value):
+        return value.replace('\\n', '\n').replace('\\N', '\n').replace('\\,', ',').replace('\\;', ';').replace('\\\\', '\\')
+
+    def _ics_time(self, params, value):
+        from datetime import datetime
+        if params.get('VALUE') == 'DATE' or len(value) == 8:
+            return {'date': f"{value[:4]}-{value[4:6]}-{value[6:8]}"}
+        dt = datetime.strptime(value.rstrip('Z'), '%Y%m%dT%H%M%S')
+        if value.endswith('Z'):
+            return {'dateTime': dt.isoformat() + 'Z'}
+        if params.get('TZID'):
+            return {'dateTime': dt.isoformat(), 'timeZone': params['TZID'].strip('"')}
+        return {'dateTime': dt.astimezone().isoformat()}  # floating time: pin to local zone
+
+    def _ics_to_google_event(self, props):
+        from datetime import date, datetime, timedelta
+        try:
+            start = self._ics_time(*props['DTSTART'][0])
+        except (KeyError, ValueError):
+            return None
+        if 'DTEND' in props:
+            end = self._ics_time(*props['DTEND'][0])
+        elif 'date' in start:
+            end = {'date': (date.fromisoformat(start['date']) + timedelta(days=1)).isoformat()}
+        else:
+            end_dt = datetime.fromisoformat(start['dateTime'].replace('Z', '+00:00')) + timedelta(hours=1)
+            end = dict(start, dateTime=end_dt.isoformat())
+        event = {'start': start, 'end': end}
+        for ics_name, field in (('SUMMARY', 'summary'), ('DESCRIPTION', 'description'), ('LOCATION', 'location')):
+            if ics_name in props:
+                event[field] = self._ics_unescape(props[ics_name][0][1])
+        if 'UID' in props:
+            event['iCalUID'] = props['UID'][0][1]
+        recurrence = []
+        for name in ('RRULE', 'EXRULE', 'RDATE', 'EXDATE'):
+            for params, value in props.get(name, []):
+                param_str = ''.join(f';{k}={v}' for k, v in params.items())
+                recurrence.append(f"{name}{param_str}:{value}")
+        if recurrence:
+            event['recurrence'] = recurrence
+        return event
+
+    def export_calendar_ics(self):
+        from datetime import date, timedelta
+        from tkinter import simpledialog
+        start_str = simpledialog.askstring("Export ICS", "From (YYYY-MM-DD):", initialvalue=date.today().isoformat())
+        if not start_str:
+            return
+        end_str = simpledialog.askstring("Export ICS", "To (YYYY-MM-DD):", initialvalue=(date.today() + timedelta(days=90)).isoformat())
+        if not end_str:
+            return
+        try:
+            start_day, end_day = date.fromisoformat(start_str.strip()), date.fromisoformat(end_str.strip())
+        except ValueError:
+            messagebox.showerror("Export ICS", "Invalid date format")
+            return
+        path = filedialog.asksaveasfilename(defaultextension='.ics', filetypes=[("iCalendar", "*.ics")])
+        if path:
+            threading.Thread(target=self._export_calendar_ics, args=(start_day, end_day, path), daemon=True).start()
+
+    def _export_calendar_ics(self, start_day, end_day, path):
+        """Write the visible calendars' events in range straight to disk, one VEVENT at a time."""
+        from datetime import datetime, timezone
+        start_ts = datetime(start_day.year, start_day.month, start_day.day).timestamp()
+        end_ts = datetime(end_day.year, end_day.month, end_day.day).timestamp() + 86400
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+        def _fold(line):
+            # RFC 5545: lines longer than 75 octets continue on the next line after a space
+            out, data = [], line.encode('utf-8')
+            while len(data) > 75:
+                cut = 75 if not out else 74
+                while cut and (data[cut] & 0xC0) == 0x80:
+                    cut -= 1
+                out.append(data[:cut].decode('utf-8'))
+                data = data[cut:]
+            out.append(data.decode('utf-8'))
+            return '\r\n '.join(out) + '\r\n'
+
+        def _escape(text):
+            return text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+        def _when(name, value):
+            if value.get('date'):
+                return f"{name};VALUE=DATE:{value['date'].replace('-', '')}"
+            dt = datetime.fromisoformat(value['dateTime'].replace('Z', '+00:00')).astimezone(timezone.utc)
+            return f"{name}:{dt.strftime('%Y%m%dT%H%M%SZ')}"
+
+        count = 0
+        try:
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                f.write('BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//UnifiedHub//Calendar Export//EN\r\n')
+                written_series = set()
+                for ev in self._calendar_events_between(start_ts, end_ts):
+                    if ev.get('_instance_of'):
+                        # Locally expanded occurrence: export its series once, rules included
+                        if ev['_instance_of'] in written_series:
+                            continue
+                        written_series.add(ev['_instance_of'])
+                        ev = self.calendar_store['calendars'][ev['_calendar_id']]['events'][ev['_instance_of']]
+                    lines = ['BEGIN:VEVENT', f"UID:{ev.get('iCalUID', ev.get('id'))}", f"DTSTAMP:{stamp}",
+                             _when('DTSTART', ev.get('start', {})), _when('DTEND', ev.get('end', ev.get('start', {})))]
+                    if ev.get('recurringEventId') and ev.get('originalStartTime'):
+                        lines.append(_when('RECURRENCE-ID', ev['originalStartTime']))
+                    for field, name in (('summary', 'SUMMARY'), ('description', 'DESCRIPTION'), ('location', 'LOCATION')):
+                        if ev.get(field):
+                            lines.append(f"{name}:{_escape(ev[field])}")
+                    lines.extend(ev.get('recurrence', []))
+                    lines.append('END:VEVENT')
+                    f.write(''.join(_fold(line) for line in lines))
+                    count += 1
+                f.write('END:VCALENDAR\r\n')
+            self.root.after(0, lambda: messagebox.showinfo("Export ICS", f"Exported {count} event(s) to {path}"))
+        except Exception as e:
+            self.root.after(0, lambda: messagebox.showerror("Export ICS", f"Failed: {str(e)}"))
     
     def create_calendar_event(self):
         if not self.tokens.get('google'):
@@ -1910,7 +5237,7 @@ class DashboardApp:
         
         threading.Thread(target=self._create_event, args=(title, event_date, time_str), daemon=True).start()
     
-    def _create_event(self, title, event_date, time_str):
+    def _create_event(self, title, event_date, time_str, duration_minutes=60, attendees=None):
         headers = {
             'Authorization': f'Bearer {self.tokens["google"]}',
             'Content-Type': 'application/json'
@@ -1921,13 +5248,21 @@ class DashboardApp:
             try:
                 hour, minute = map(int, time_str.split(':'))
                 start_dt = event_date.replace(hour=hour, minute=minute)
-                end_dt = start_dt + timedelta(hours=1)
+                end_dt = start_dt + timedelta(minutes=duration_minutes)
                 
-                event = {
-                    'summary': title,
-                    'start': {'dateTime': start_dt.isoformat(), 'timeZone': 'UTC'},
-                    'end': {'dateTime': end_dt.isoformat(), 'timeZone': 'UTC'}
-                }
+                if start_dt.tzinfo:
+                    # Timezone-aware times (e.g. from the slot finder) carry their own offset
+                    event = {
+                        'summary': title,
+                        'start': {'dateTime': start_dt.isoformat()},
+                        'end': {'dateTime': end_dt.isoformat()}
+                    }
+                else:
+                    event = {
+                        'summary': title,
+                        'start': {'dateTime': start_dt.isoformat(), 'timeZone': 'UTC'},
+                        'end': {'dateTime': end_dt.isoformat(), 'timeZone': 'UTC'}
+                    }
             except:
                 self.root.after(0, lambda: messagebox.showerror("Error", "Invalid time format"))
                 return
@@ -1937,11 +5272,14 @@ class DashboardApp:
                 'start': {'date': event_date.strftime('%Y-%m-%d')},
                 'end': {'date': event_date.strftime('%Y-%m-%d')}
             }
+        if attendees:
+            event['attendees'] = [{'email': email} for email in attendees]
         
         try:
             response = requests.post(
                 'https://www.googleapis.com/calendar/v3/calendars/primary/events',
                 headers=headers,
+                params={'sendUpdates': 'all'} if attendees else None,
                 json=event
             )
             if response.status_code == 200:
@@ -1951,59 +5289,282 @@ class DashboardApp:
                 self.root.after(0, lambda: messagebox.showerror("Error", f"Failed: {response.text}"))
         except Exception as e:
             self.root.after(0, lambda: messagebox.showerror("Error", str(e)))
+
+    # Free/busy meeting slot finder
+    def open_slot_finder(self):
+        if not self.tokens.get('google'):
+            messagebox.showwarning("Warning", "Please connect Google first")
+            return
+        from datetime import date, timedelta
+        win = tk.Toplevel(self.root)
+        win.title("Find a Meeting Slot")
+        form = tk.Frame(win)
+        form.pack(fill=tk.X, padx=10, pady=10)
+        fields = {}
+        today = date.today()
+        rows = [
+            ('Title', 'Meeting'),
+            ('Attendees (comma separated)', 'primary'),
+            ('From (YYYY-MM-DD)', today.isoformat()),
+            ('To (YYYY-MM-DD)', (today + timedelta(days=14)).isoformat()),
+            ('Duration (minutes)', '30'),
+            ('Working hours start', '9'),
+            ('Working hours end', '17'),
+        ]
+        for i, (label, default) in enumerate(rows):
+            tk.Label(form, text=label + ":").grid(row=i, column=0, sticky='w', padx=4, pady=2)
+            entry = tk.Entry(form, width=45)
+            entry.insert(0, default)
+            entry.grid(row=i, column=1, sticky='we', padx=4, pady=2)
+            fields[label] = entry
+        weekdays_only = tk.BooleanVar(value=True)
+        tk.Checkbutton(form, text="Weekdays only", variable=weekdays_only).grid(row=len(rows), column=1, sticky='w')
+        form.columnconfigure(1, weight=1)
+
+        status = tk.Label(win, text="", anchor='w')
+        status.pack(fill=tk.X, padx=10)
+        results = tk.Listbox(win, height=14)
+        results.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
+        slots = []
+
+        def _find():
+            try:
+                attendees = [a.strip() for a in fields['Attendees (comma separated)'].get().split(',') if a.strip()]
+                start_day = date.fromisoformat(fields['From (YYYY-MM-DD)'].get().strip())
+                end_day = date.fromisoformat(fields['To (YYYY-MM-DD)'].get().strip())
+                duration = int(fields['Duration (minutes)'].get())
+                work_start = int(fields['Working hours start'].get())
+                work_end = int(fields['Working hours end'].get())
+            except ValueError:
+                messagebox.showerror("Find Slot", "Check the dates and numbers", parent=win)
+                return
+            status.config(text="Fetching free/busy...")
+
+            def _worker():
+                try:
+                    tree, unchecked = self._get_busy_tree(attendees or ['primary'], start_day, end_day)
+                    started = time.perf_counter()
+                    found = self._find_free_slots(tree, start_day, end_day, duration, work_start, work_end, weekdays_only.get())
+                    elapsed = (time.perf_counter() - started) * 1000
+                except Exception as e:
+                    self.root.after(0, lambda: status.config(text=f"Failed: {str(e)}"))
+                    return
+
+                def _show():
+                    from datetime import datetime
+                    slots[:] = [(st, duration) for st, _ in found]
+                    results.delete(0, tk.END)
+                    for st, en in found:
+                        a, b = datetime.fromtimestamp(st), datetime.fromtimestamp(en)
+                        results.insert(tk.END, f"{a:%a %Y-%m-%d}  {a:%H:%M} - {b:%H:%M}  (free {int((en - st) // 60)} min)")
+                    text = f"{len(found)} free windows across {tree.size} busy intervals (computed in {elapsed:.1f} ms)"
+                    if unchecked:
+                        # These calendars look free only because they could not be read
+                        text += f" - could not check: {', '.join(unchecked)}"
+                    status.config(text=text, fg='#c0392b' if unchecked else 'black')
+                self.root.after(0, _show)
+            threading.Thread(target=_worker, daemon=True).start()
+
+        def _book():
+            sel = results.curselection()
+            if not sel:
+                messagebox.showwarning("Find Slot", "Select a slot first", parent=win)
+                return
+            from datetime import datetime
+            start_ts, duration = slots[sel[0]]
+            start_dt = datetime.fromtimestamp(start_ts).astimezone()
+            attendees = [a.strip() for a in fields['Attendees (comma separated)'].get().split(',')
+                         if a.strip() and a.strip() != 'primary' and '@' in a]
+            title = fields['Title'].get().strip() or 'Meeting'
+            threading.Thread(target=self._create_event,
+                             args=(title, start_dt, start_dt.strftime('%H:%M'), duration, attendees),
+                             daemon=True).start()
+            win.destroy()
+
+        btns = tk.Frame(win)
+        btns.pack(fill=tk.X, padx=10, pady=(0, 10))
+        tk.Button(btns, text="Find", command=_find, bg='#3498db', fg='white').pack(side=tk.LEFT, padx=5)
+        tk.Button(btns, text="Create Event in Selected Slot", command=_book, bg='#27ae60', fg='white').pack(side=tk.LEFT, padx=5)
+
+    def _get_busy_tree(self, calendar_ids, start_day, end_day):
+        """Busy intervals for all calendars in one interval tree, cached per (calendars, range).
+
+        Returns (tree, unchecked): calendars freeBusy reported errors for (not shared, not found)
+        contribute no intervals, so callers must not present them as free.
+        """
+        from datetime import datetime, timedelta, timezone
+        cache = self.freebusy_cache
+        key = (tuple(sorted(calendar_ids)), start_day.isoformat(), end_day.isoformat())
+        cached = cache.get(key)
+        if cached and time.time() - cached[0] < 300:
+            return cached[1]
+
+        if self.tokens.get('google_refresh'):
+            self.refresh_google_token()
+        headers = {'Authorization': f'Bearer {self.tokens["google"]}'}
+        range_start = datetime(start_day.year, start_day.month, start_day.day).astimezone()
+        range_end = datetime(end_day.year, end_day.month, end_day.day).astimezone() + timedelta(days=1)
+
+        # freeBusy accepts a bounded window and up to 50 calendars per call; split both ways
+        requests_body = []
+        cursor = range_start
+        while cursor < range_end:
+            window_end = min(cursor + timedelta(days=60), range_end)
+            for i in range(0, len(calendar_ids), 50):
+                requests_body.append({
+                    'timeMin': cursor.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z'),
+                    'timeMax': window_end.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z'),
+                    'items': [{'id': cid} for cid in calendar_ids[i:i + 50]]
+                })
+            cursor = window_end
+
+        def _query(body):
+            resp = requests.post('https://www.googleapis.com/calendar/v3/freeBusy', headers=headers, json=body, timeout=30)
+            if resp.status_code != 200:
+                raise RuntimeError(f"freeBusy {resp.status_code}: {resp.text[:200]}")
+            return resp.json().get('calendars', {})
+
+        intervals, unchecked = [], set()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            for calendars in pool.map(_query, requests_body):
+                for cid, info in calendars.items():
+                    if info.get('errors'):
+                        unchecked.add(cid)
+                    for busy in info.get('busy', []):
+                        intervals.append((
+                            datetime.fromisoformat(busy['start'].replace('Z', '+00:00')).timestamp(),
+                            datetime.fromisoformat(busy['end'].replace('Z', '+00:00')).timestamp()
+                        ))
+        result = (IntervalTree(intervals), sorted(unchecked))
+        cache[key] = (time.time(), result)
+        return result
+
+    def _find_free_slots(self, tree, start_day, end_day, duration_minutes, work_start, work_end, weekdays_only=True):
+        """Free windows of at least duration_minutes inside working hours, as (start_ts, end_ts)."""
+        from datetime import datetime, timedelta
+        slots = []
+        need = duration_minutes * 60
+        day = start_day
+        now = time.time()
+        while day <= end_day:
+            if not (weekdays_only and day.weekday() >= 5):
+                # Local wall-clock hours; timestamp() applies the DST rules of that particular day
+                ws = datetime(day.year, day.month, day.day, work_start).timestamp()
+                we = (datetime(day.year, day.month, day.day) + timedelta(hours=work_end)).timestamp()
+                cursor = ws
+                if now > ws:
+                    # Never offer slots in the past; resume at the next quarter hour
+                    cursor = max(ws, now - now % 900 + 900)
+                for busy_start, busy_end in tree.overlapping(ws, we):
+                    if busy_start - cursor >= need:
+                        slots.append((cursor, busy_start))
+                    cursor = max(cursor, busy_end)
+                if we - cursor >= need:
+                    slots.append((cursor, we))
+            day += timedelta(days=1)
+        return slots
     
     # Discord Servers
-    def load_discord_servers(self):
+    def _discord_cache_fresh(self, cached):
+        ttl = float(self.settings.get('discord_cache_ttl', 600))
+        return time.time() - cached.get('fetched', 0) < ttl
+
+    def show_cached_discord_servers(self):
+        """Render the last known server list without touching the network."""
+        cached = self._load_cache('discord_guilds.json', {})
+        if cached.get('guilds'):
+            self.discord_servers = cached['guilds']
+            self.display_discord_servers(self.discord_servers)
+        return cached
+
+    def on_main_tab_changed(self, event):
+        # Opening the Discord tab only goes to the network once the cached server list has gone stale
+        if self.notebook.select() != str(self.discord_frame) or not self.tokens.get('discord'):
+            return
+        if not self._discord_cache_fresh(self._load_cache('discord_guilds.json', {})):
+            threading.Thread(target=self._fetch_discord_servers, daemon=True).start()
+
+    def load_discord_servers(self, force=False):
         if not self.tokens.get('discord'):
             messagebox.showwarning("Warning", "Please connect Discord first")
             return
+        self.discord_list_view = 'servers'
+        cached = self.show_cached_discord_servers()
+        if not force and cached.get('guilds') and self._discord_cache_fresh(cached):
+            self.update_status("Discord servers loaded from cache")
+            return
         threading.Thread(target=self._fetch_discord_servers, daemon=True).start()
-    
+
+    def _discord_guilds(self, headers):
+        """Page through /users/@me/guilds; Discord returns at most 200 guilds per call."""
+        guilds, after = [], None
+        while True:
+            path = '/users/@me/guilds?limit=200' + (f'&after={after}' if after else '')
+            response = self.discord.get(path, headers)
+            if response.status_code != 200:
+                raise requests.RequestException(f"{response.status_code}: {response.text}")
+            page = response.json()
+            guilds.extend(page)
+            if len(page) < 200:
+                return guilds
+            after = max(page, key=lambda g: int(g['id']))['id']
+
     def _fetch_discord_servers(self):
         self.update_status("Loading Discord servers...")
         
         headers = {'Authorization': f'Bearer {self.tokens["discord"]}'}
         
         try:
-            response = requests.get('https://discord.com/api/v10/users/@me/guilds', headers=headers)
+            guilds = self._discord_guilds(headers)
             
-            if response.status_code == 200:
-                guilds = response.json()
-                
-                # Filter to only servers you own
-                owned_servers = [g for g in guilds if g.get('owner', False)]
-                
-                # Get member counts for owned servers
-                for server in owned_servers:
-                    server['online_count'] = self._fetch_guild_members(server['id'])
-                
-                self.discord_servers = owned_servers
+            # Filter to only servers you own
+            owned_servers = [g for g in guilds if g.get('owner', False)]
+            
+            # Get member counts for owned servers, concurrently; the client queues per rate-limit bucket
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                counts = pool.map(self._fetch_guild_members, [server['id'] for server in owned_servers])
+                for server, count in zip(owned_servers, counts):
+                    server['online_count'] = count
+            
+            changed = owned_servers != self.discord_servers
+            self.discord_servers = owned_servers
+            self._save_cache('discord_guilds.json', {'fetched': time.time(), 'guilds': owned_servers})
+            if changed:
                 self.root.after(0, lambda: self.display_discord_servers(owned_servers))
-            else:
-                self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to load servers: {response.text}"))
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Failed: {str(e)}"))
+            self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to load servers: {str(e)}"))
         
         self.root.after(0, lambda: self.update_status("Discord servers loaded"))
     
-    def _fetch_guild_members(self, guild_id):
-        """Get online member count for a guild"""
-        headers = {'Authorization': f'Bot {os.getenv("DISCORD_BOT_TOKEN")}'}
+    def _fetch_guild_members(self, guild_id, ttl=60):
+        """Get online member count for a guild (None if unknown); results are cached for ttl seconds"""
+        live = self.discord_gateway.counts(guild_id) if self.discord_gateway else None
+        if live:
+            return live[0]
+        cached = self.discord_count_cache.get(guild_id)
+        if cached and time.time() - cached[0] < ttl:
+            return cached[1]
+        bot_token = os.getenv("DISCORD_BOT_TOKEN")
+        if not bot_token:
+            return None
+        headers = {'Authorization': f'Bot {bot_token}'}
         
         try:
-            response = requests.get(
-                f'https://discord.com/api/v10/guilds/{guild_id}?with_counts=true',
-                headers=headers
-            )
+            response = self.discord.get(f'/guilds/{guild_id}?with_counts=true', headers)
             if response.status_code == 200:
-                data = response.json()
-                return data.get('approximate_presence_count', 0)
-        except:
+                count = response.json().get('approximate_presence_count', 0)
+                self.discord_count_cache[guild_id] = (time.time(), count)
+                return count
+        except requests.RequestException:
             pass
         
-        return 0
+        # Fall back to the last known count rather than reporting an empty server
+        return cached[1] if cached else None
     
     def display_discord_servers(self, servers):
+        self.discord_msg_guild.config(values=[g.get('name', g['id']) for g in servers])
+        if self.discord_list_view != 'servers':
+            return
         self.discord_listbox.delete(0, tk.END)
         
         if not servers:
@@ -2011,69 +5572,270 @@ class DashboardApp:
         else:
             for server in servers:
                 name = server.get('name', 'Unknown')
-                online = server.get('online_count', 0)
+                online = self._discord_online(server) or 0
                 display_text = f"{name} ({online} online)" if online > 0 else name
                 self.discord_listbox.insert(tk.END, display_text)
+
+    def _discord_online(self, server):
+        # The live gateway model wins over the last REST snapshot
+        live = self.discord_gateway.counts(server.get('id')) if self.discord_gateway else None
+        return live[0] if live else server.get('online_count')
+
+    def toggle_discord_gateway(self):
+        if self.discord_gateway and self.discord_gateway.running:
+            self.discord_gateway.stop()
+            self.discord_gateway = None
+            self.discord_live_btn.config(text="Go Live")
+            self.update_status("Discord live presence stopped")
+            return
+        bot_token = os.getenv('DISCORD_BOT_TOKEN')
+        if not bot_token:
+            messagebox.showwarning("Discord", "Set DISCORD_BOT_TOKEN in .env to use live presence.")
+            return
+        try:
+            import websocket  # noqa: F401
+        except ImportError:
+            messagebox.showerror("Discord", "Install websocket-client: pip install websocket-client")
+            return
+        self.discord_gateway = DiscordGateway(bot_token, url=os.getenv('DISCORD_GATEWAY_URL'),
+                                              on_change=self._on_discord_gateway_change)
+        self.discord_gateway.start()
+        self.discord_live_btn.config(text="Stop Live")
+        self.update_status("Discord live presence connecting...")
+
+    def _on_discord_gateway_change(self):
+        # Presence events can arrive in bursts; redraw at most twice a second
+        def _schedule():
+            if self.discord_gateway_job is None:
+                self.discord_gateway_job = self.root.after(500, self._refresh_discord_live)
+        self.root.after(0, _schedule)
+
+    def _refresh_discord_live(self):
+        self.discord_gateway_job = None
+        gateway = self.discord_gateway
+        if gateway is None:
+            return
+        self.update_status(f"Discord gateway: {gateway.status}")
+        if self.discord_servers and self.discord_list_view == 'servers':
+            selection = self.discord_listbox.curselection()
+            self.display_discord_servers(self.discord_servers)
+            for index in selection:
+                self.discord_listbox.selection_set(index)
     
+    def on_discord_list_select(self, event):
+        if self.discord_list_view == 'apps':
+            self.on_discord_app_select(event)
+        else:
+            self.on_discord_server_select(event)
+
     def on_discord_server_select(self, event):
         selection = self.discord_listbox.curselection()
         if selection and self.discord_servers:
             server = self.discord_servers[selection[0]]
             
             self.discord_details.config(state=tk.NORMAL)
+            self._reset_text_images(self.discord_details)
             self.discord_details.delete(1.0, tk.END)
+            if server.get('icon'):
+                icon_url = f"https://cdn.discordapp.com/icons/{server['id']}/{server['icon']}.png?size=128"
+                self._text_image(self.discord_details, icon_url, size=(64, 64))
+                self.discord_details.insert(tk.END, "\n")
             
             details = f"Name: {server.get('name', 'N/A')}\n"
             details += f"ID: {server.get('id', 'N/A')}\n"
             details += f"Owner: Yes\n"
-            details += f"Members Online: {server.get('online_count', 0)}\n"
+            online = self._discord_online(server)
+            details += f"Members Online: {online if online is not None else 'unknown'}\n"
+            live = self.discord_gateway.counts(server.get('id')) if self.discord_gateway else None
+            if live:
+                details += f"Members: {live[1]} (live)\n"
             
             self.discord_details.insert(tk.END, details)
             self.discord_details.config(state=tk.DISABLED)
 
+    # Discord channel messages
+    def load_discord_channels(self):
+        bot_token = os.getenv('DISCORD_BOT_TOKEN')
+        index = self.discord_msg_guild.current()
+        if not bot_token:
+            messagebox.showwarning("Discord", "Set DISCORD_BOT_TOKEN in .env")
+            return
+        if index < 0 or index >= len(self.discord_servers):
+            messagebox.showinfo("Discord", "Load Servers first, then pick a server")
+            return
+        guild_id = self.discord_servers[index]['id']
+        threading.Thread(target=self._fetch_discord_channels, args=(bot_token, guild_id), daemon=True).start()
+
+    def _fetch_discord_channels(self, bot_token, guild_id):
+        try:
+            resp = self.discord.get(f'/guilds/{guild_id}/channels', {'Authorization': f'Bot {bot_token}'})
+            if resp.status_code != 200:
+                self.root.after(0, lambda: messagebox.showerror("Discord", f"Failed to load channels: {resp.status_code}\n{resp.text}"))
+                return
+            # Text and announcement channels, in sidebar order
+            channels = sorted((c for c in resp.json() if c.get('type') in (0, 5)), key=lambda c: c.get('position', 0))
+        except requests.RequestException as e:
+            self.root.after(0, lambda: messagebox.showerror("Discord", str(e)))
+            return
+
+        def _show():
+            self.discord_channels = channels
+            self.discord_channel_list.delete(0, tk.END)
+            for channel in channels:
+                self.discord_channel_list.insert(tk.END, f"#{channel.get('name', channel['id'])}")
+        self.root.after(0, _show)
+
+    def on_discord_channel_select(self, event):
+        selection = self.discord_channel_list.curselection()
+        if not selection or self.discord_msg_busy:
+            return
+        channel_id = self.discord_channels[selection[0]]['id']
+        self.discord_msg_channel = channel_id
+        self.discord_msg_grid.clear()
+        self._start_discord_messages('open', channel_id)
+
+    def load_older_discord_messages(self):
+        if self.discord_msg_channel and not self.discord_msg_busy:
+            self._start_discord_messages('older', self.discord_msg_channel)
+
+    def refresh_discord_messages(self):
+        if self.discord_msg_channel and not self.discord_msg_busy:
+            self._start_discord_messages('newer', self.discord_msg_channel)
+
+    def _start_discord_messages(self, mode, channel_id):
+        bot_token = os.getenv('DISCORD_BOT_TOKEN')
+        if not bot_token:
+            messagebox.showwarning("Discord", "Set DISCORD_BOT_TOKEN in .env")
+            return
+        self.discord_msg_busy = True
+        threading.Thread(target=self._fetch_discord_messages, args=(bot_token, channel_id, mode), daemon=True).start()
+
+    def _message_row(self, message):
+        attachments = len(message.get('attachments', []))
+        content = ' '.join(message.get('content', '').split())
+        if attachments:
+            content += f" [{attachments} attachment(s)]"
+        author = message.get('author', {})
+        return [message['id'], message.get('timestamp', '')[:19].replace('T', ' '),
+                author.get('global_name') or author.get('username', ''), content]
+
+    def _fetch_discord_messages(self, bot_token, channel_id, mode):
+        """Keep a per-channel message cache and fetch only what it is missing.
+
+        open: show the cache, then pull everything after its newest ID (or the latest pages
+        if the channel is new). older: one page before the oldest cached ID. newer: delta only.
+        """
+        headers = {'Authorization': f'Bot {bot_token}'}
+        cache_name = f'discord_messages_{channel_id}.json'
+        rows = self._load_cache(cache_name, [])  # [id, time, author, content], oldest first
+
+        def _current():
+            return self.discord_msg_channel == channel_id
+
+        def _page(params):
+            resp = self.discord.get(f'/channels/{channel_id}/messages?' + '&'.join(f'{k}={v}' for k, v in params.items()), headers)
+            if resp.status_code != 200:
+                raise requests.RequestException(f"{resp.status_code}: {resp.text}")
+            return sorted((self._message_row(m) for m in resp.json()), key=lambda r: int(r[0]))
+
+        try:
+            if mode == 'open' and rows:
+                self.root.after(0, lambda r=list(rows): _current() and self._show_discord_messages(r, 'replace'))
+            if mode in ('open', 'newer') and rows:
+                new_rows, after = [], rows[-1][0]
+                while True:
+                    batch = _page({'limit': 100, 'after': after})
+                    new_rows.extend(batch)
+                    if len(batch) < 100:
+                        break
+                    after = batch[-1][0]
+                rows.extend(new_rows)
+                self.root.after(0, lambda r=new_rows: _current() and self._show_discord_messages(r, 'append'))
+            elif mode == 'open':
+                # First visit: the five most recent pages, newest first
+                before = None
+                for _ in range(5):
+                    batch = _page({'limit': 100, **({'before': before} if before else {})})
+                    rows[:0] = batch
+                    if len(batch) < 100:
+                        break
+                    before = batch[0][0]
+                self.root.after(0, lambda r=list(rows): _current() and self._show_discord_messages(r, 'replace'))
+            elif mode == 'older' and rows:
+                batch = _page({'limit': 100, 'before': rows[0][0]})
+                rows[:0] = batch
+                self.root.after(0, lambda r=batch: _current() and self._show_discord_messages(r, 'prepend'))
+            self._save_cache(cache_name, rows)
+            self.root.after(0, lambda: _current() and self.discord_msg_status.config(text=f"{len(rows)} cached message(s)"))
+        except requests.RequestException as e:
+            self.root.after(0, lambda: self.discord_msg_status.config(text=f"Failed: {str(e)[:120]}"))
+        finally:
+            self.discord_msg_busy = False
+
+    def _show_discord_messages(self, rows, how):
+        display = [r[1:] for r in rows]
+        grid = self.discord_msg_grid
+        if how == 'prepend':
+            grid.prepend_rows(display)
+            return
+        if how == 'replace':
+            grid.rows = []
+        grid.append_rows(display)
+        # Newest messages are at the bottom, like the Discord client
+        grid.yview('moveto', 1.0)
+
     # Discord Applications
-    def load_discord_apps(self):
+    def load_discord_apps(self, force=False):
         if not self.tokens.get('discord'):
             messagebox.showwarning("Warning", "Please connect Discord first")
             return
-        threading.Thread(target=self._fetch_discord_apps, daemon=True).start()
+        cached = self._load_cache('discord_apps.json', {})
+        self.display_discord_apps(cached.get('apps', []))
+        if not force and cached.get('apps') and self._discord_cache_fresh(cached):
+            self.update_status("Discord apps loaded from cache")
+            return
+        threading.Thread(target=self._fetch_discord_apps, args=(cached,), daemon=True).start()
     
-    def _fetch_discord_apps(self):
+    def _fetch_discord_apps(self, cached):
         self.update_status("Loading Discord apps...")
         
         headers = {'Authorization': f'Bearer {self.tokens["discord"]}'}
+        # Ask the endpoint that answered last time first, so a refresh is normally one call
+        endpoints = ['/oauth2/applications/@me', '/applications']
+        if cached.get('source') in endpoints:
+            endpoints.remove(cached['source'])
+            endpoints.insert(0, cached['source'])
+        errors = []
         try:
-            response = requests.get('https://discord.com/api/v10/oauth2/applications/@me', headers=headers)
-            if response.status_code == 200:
-                app = response.json()
-                apps = [app] if isinstance(app, dict) else app
-                self.root.after(0, lambda: self.display_discord_apps(apps))
-            else:
+            for path in endpoints:
+                response = self.discord.get(path, headers)
+                if response.status_code == 200:
+                    data = response.json()
+                    apps = [data] if isinstance(data, dict) else data
+                    self._save_cache('discord_apps.json', {'fetched': time.time(), 'source': path, 'apps': apps})
+                    if apps != cached.get('apps'):
+                        self.root.after(0, lambda: self.discord_list_view == 'apps' and self.display_discord_apps(apps))
+                    break
                 # Capture 401 specifically and advise reconnect
-                if response.status_code == 401:
+                if response.status_code == 401 and path == '/oauth2/applications/@me':
                     self.root.after(0, lambda: messagebox.showwarning(
                         "Discord Apps",
                         "401 Unauthorized.\n\nFixes:\n- Click '🗑️ Clear Tokens' then '🔗 Connect Discord' to re-consent scopes.\n- Ensure redirect URI matches exactly http://localhost:8080/callback in Developer Portal.\n- Verify you own at least one application."
                     ))
-                response2 = requests.get('https://discord.com/api/v10/applications', headers=headers)
-                if response2.status_code == 200:
-                    apps = response2.json()
-                    if isinstance(apps, list):
-                        self.root.after(0, lambda: self.display_discord_apps(apps))
-                    else:
-                        self.root.after(0, lambda: self.display_discord_apps([apps]))
-                else:
-                    err = f"{response.status_code}: {response.text}\n{response2.status_code}: {response2.text}"
-                    self.root.after(0, lambda: messagebox.showwarning(
-                        "Discord Apps",
-                        f"Could not load applications.\n\nCommon fixes:\n- Ensure you own at least one application\n- Reconnect with scopes: applications.commands\n- Try again later\n\nError: {err}"
-                    ))
+                errors.append(f"{response.status_code}: {response.text}")
+            else:
+                err = "\n".join(errors)
+                self.root.after(0, lambda: messagebox.showwarning(
+                    "Discord Apps",
+                    f"Could not load applications.\n\nCommon fixes:\n- Ensure you own at least one application\n- Reconnect with scopes: applications.commands\n- Try again later\n\nError: {err}"
+                ))
         except Exception as e:
             self.root.after(0, lambda: messagebox.showerror("Error", f"Failed: {str(e)}"))
         
         self.root.after(0, lambda: self.update_status("Discord apps loaded"))
     
     def display_discord_apps(self, apps):
+        self.discord_list_view = 'apps'
         self.discord_listbox.delete(0, tk.END)
         for app in apps:
             name = app.get('name', 'Unknown')
@@ -2081,11 +5843,10 @@ class DashboardApp:
         
         # Store temporarily for selection handling
         self.discord_apps_cache = apps
-        self.discord_listbox.bind('<<ListboxSelect>>', self.on_discord_app_select)
     
     def on_discord_app_select(self, event):
         selection = self.discord_listbox.curselection()
-        if selection and getattr(self, 'discord_apps_cache', None):
+        if selection and selection[0] < len(self.discord_apps_cache):
             app = self.discord_apps_cache[selection[0]]
             
             self.discord_details.config(state=tk.NORMAL)
@@ -2102,6 +5863,81 @@ class DashboardApp:
             self.discord_details.insert(tk.END, details)
             self.discord_details.config(state=tk.DISABLED)
     
+    # Google batch requests
+    def _google_batch(self, batch_url, calls, headers, chunk_size=50):
+        """Send (method, path, json_body) calls through a Google batch endpoint.
+
+        Returns one (status, body) per call, in order. Calls are grouped chunk_size per
+        HTTP request; items rejected with 429/5xx are retried with backoff.
+        """
+        results = [None] * len(calls)
+        pending = list(range(len(calls)))
+        for attempt in range(3):
+            retry = []
+            for i in range(0, len(pending), chunk_size):
+                group = pending[i:i + chunk_size]
+                boundary = f"batch_{hashlib.md5(str(group).encode()).hexdigest()}"
+                parts = []
+                for idx in group:
+                    method, path, body = calls[idx]
+                    part = (f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <item-{idx}>\r\n\r\n"
+                            f"{method} {path} HTTP/1.1\r\n")
+                    if body is not None:
+                        payload = json.dumps(body)
+                        part += f"Content-Type: application/json\r\nContent-Length: {len(payload.encode())}\r\n\r\n{payload}\r\n"
+                    else:
+                        part += "\r\n"
+                    parts.append(part)
+                data = ''.join(parts) + f"--{boundary}--\r\n"
+                batch_headers = dict(headers, **{'Content-Type': f'multipart/mixed; boundary={boundary}'})
+                resp = requests.post(batch_url, headers=batch_headers, data=data.encode('utf-8'), timeout=60)
+                if resp.status_code != 200:
+                    for idx in group:
+                        results[idx] = (resp.status_code, resp.text)
+                    if resp.status_code == 429 or resp.status_code >= 500:
+                        retry.extend(group)
+                    continue
+                for idx, status, body in self._parse_batch_response(resp):
+                    results[idx] = (status, body)
+                    if status == 429 or status >= 500:
+                        retry.append(idx)
+                for idx in group:
+                    if results[idx] is None:
+                        results[idx] = (0, 'missing from batch response')
+            if not retry:
+                break
+            pending = retry
+            time.sleep(2 ** attempt)
+        return results
+
+    def _parse_batch_response(self, resp):
+        """Yield (index, status, body) for every part of a multipart/mixed batch response."""
+        content_type = resp.headers.get('Content-Type', '')
+        boundary = content_type.split('boundary=')[-1].strip().strip('"')
+        text = resp.text.replace('\r\n', '\n')
+        for part in text.split('--' + boundary):
+            part = part.strip()
+            if not part or part == '--':
+                continue
+            outer, _, inner = part.partition('\n\n')
+            content_id = next((line.split(':', 1)[1].strip() for line in outer.split('\n')
+                               if line.lower().startswith('content-id:')), '')
+            try:
+                idx = int(content_id.strip('<>').rsplit('-', 1)[-1])
+            except ValueError:
+                continue
+            head, _, body = inner.partition('\n\n')
+            try:
+                status = int(head.split('\n', 1)[0].split()[1])
+            except (IndexError, ValueError):
+                status = 0
+            body = body.strip()
+            try:
+                body = json.loads(body) if body else None
+            except ValueError:
+                pass
+            yield idx, status, body
+
     # Token management
     def refresh_google_token(self):
         if not self.tokens.get('google_refresh'):
@@ -2134,6 +5970,63 @@ class DashboardApp:
         with open('.tokens.json', 'w') as f:
             json.dump(self.tokens, f)
     
+    # Local cache files (sync state, stores) live under ./cache
+    def _text_image(self, widget, url, size=(24, 24), cache_key=None):
+        """Reserve the current end of a Text widget and drop a remote image there once it loads."""
+        if not url:
+            return
+        state = self.text_images.setdefault(str(widget), {'generation': 0, 'photos': [], 'requests': []})
+        generation = state['generation']
+        mark = f"remote_img_{generation}_{len(state['requests'])}"
+        widget.mark_set(mark, 'end-1c')
+        widget.mark_gravity(mark, tk.LEFT)
+
+        def _show(photo):
+            if state['generation'] != generation:
+                return
+            state['photos'].append(photo)
+            previous = widget.cget('state')
+            widget.config(state=tk.NORMAL)
+            widget.image_create(mark, image=photo, padx=2)
+            widget.config(state=previous)
+        state['requests'].append((self.images.get(url, size, _show, cache_key), _show))
+
+    def _reset_text_images(self, widget):
+        """Forget images placed by _text_image and cancel the ones still downloading."""
+        state = self.text_images.setdefault(str(widget), {'generation': 0, 'photos': [], 'requests': []})
+        for key, callback in state['requests']:
+            self.images.cancel(key, callback)
+        for mark in widget.mark_names():
+            if str(mark).startswith('remote_img_'):
+                widget.mark_unset(mark)
+        state['generation'] += 1
+        state['photos'], state['requests'] = [], []
+
+    def _cache_path(self, name):
+        os.makedirs('cache', exist_ok=True)
+        return os.path.join('cache', name)
+
+    def _load_cache(self, name, default):
+        try:
+            path = self._cache_path(name)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception:
+            pass
+        return default
+
+    def _save_cache(self, name, data):
+        """Write a cache file atomically so a crash never leaves half-written JSON behind."""
+        try:
+            path = self._cache_path(name)
+            tmp = path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except Exception:
+            pass
+
     def load_saved_tokens(self):
         if os.path.exists('.tokens.json'):
             try:
@@ -2255,10 +6148,19 @@ class DashboardApp:
             self.refresh_google_token()
         headers = {'Authorization': f'Bearer {self.tokens["google"]}'}
         try:
-            url = 'https://www.googleapis.com/drive/v3/files?pageSize=20&fields=files(id,name,mimeType,modifiedTime,owners)'
-            resp = requests.get(url, headers=headers)
+            url = 'https://www.googleapis.com/drive/v3/files'
+            params = {'pageSize': 200, 'fields': 'nextPageToken,files(id,name,mimeType,modifiedTime,owners,thumbnailLink)'}
+            files = []
+            while True:
+                resp = requests.get(url, headers=headers, params=params, timeout=30)
+                if resp.status_code != 200:
+                    break
+                data = resp.json()
+                files.extend(data.get('files', []))
+                if not data.get('nextPageToken') or len(files) >= 1000:
+                    break
+                params['pageToken'] = data['nextPageToken']
             if resp.status_code == 200:
-                files = resp.json().get('files', [])
                 self.root.after(0, lambda: self.display_drive_files(files))
             elif resp.status_code == 401:
                 self.root.after(0, lambda: self.show_text_error(self.drive_text, "⚠️ Token Invalid. Clear Tokens and reconnect."))
@@ -2285,11 +6187,39 @@ class DashboardApp:
         else:
             for f in files:
                 self.drive_listbox.insert(tk.END, f.get('name', '(no name)'))
+        self.drive_grid.set_items([self._drive_grid_item(f) for f in files])
         # clear preview
         self.drive_text.config(state=tk.NORMAL)
         self.drive_text.delete(1.0, tk.END)
         self.drive_text.config(state=tk.DISABLED)
 
+    def _drive_grid_item(self, file):
+        # thumbnailLink is short-lived, so thumbnails are cached under the file's revision instead
+        return {
+            'url': file.get('thumbnailLink'),
+            'cache_key': f"drive:{file.get('id')}:{file.get('modifiedTime', '')}",
+            'label': file.get('name', '(no name)'),
+            # Built per download, so tiles scrolled to after a token refresh use the new token
+            'headers': lambda: {'Authorization': f'Bearer {self.tokens["google"]}'} if self.tokens.get('google') else None,
+        }
+
+    def toggle_drive_grid(self):
+        if self.drive_grid.winfo_ismapped():
+            self.drive_grid.pack_forget()
+            self.drive_list_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            self.drive_grid_btn.config(text="Grid View")
+        else:
+            self.drive_list_frame.pack_forget()
+            self.drive_grid.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            self.drive_grid_btn.config(text="List View")
+
+    def on_drive_grid_select(self, index):
+        # Mirror the selection into the listbox so Download/Export/Open act on it
+        self.drive_listbox.selection_clear(0, tk.END)
+        self.drive_listbox.selection_set(index)
+        self.drive_listbox.see(index)
+        self.on_drive_file_select(None)
+
     def on_drive_file_select(self, event):
         sel = self.drive_listbox.curselection()
         if not sel or not getattr(self, 'drive_cache', None):
@@ -2309,12 +6239,10 @@ class DashboardApp:
                 resp = requests.get(url, headers=headers)
                 if resp.status_code == 200:
                     content = resp.text
-            elif mime.startswith('application/vnd.google-apps.spreadsheet'):
-                # Export Google Sheets to CSV
-                url = f'https://www.googleapis.com/drive/v3/files/{file_id}/export?mimeType=text/csv'
-                resp = requests.get(url, headers=headers)
-                if resp.status_code == 200:
-                    content = resp.text
+            elif mime.startswith('application/vnd.google-apps.spreadsheet') or mime == 'text/csv':
+                # Sheets/CSV stream into the table preview instead of a text dump
+                self.root.after(0, lambda: self.open_sheet_preview(file))
+                content = "Streaming into table preview window..."
             elif mime.startswith('application/vnd.google-apps.presentation'):
                 # Export Google Slides to plain text (notes)
                 url = f'https://www.googleapis.com/drive/v3/files/{file_id}/export?mimeType=text/plain'
@@ -2345,6 +6273,134 @@ class DashboardApp:
             self.drive_text.config(state=tk.DISABLED)
         self.root.after(0, _render)
 
+    # Sheets / CSV table preview
+    def open_sheet_preview(self, file):
+        win = tk.Toplevel(self.root)
+        win.title(f"Table Preview - {file.get('name', '')}")
+        win.geometry("1000x650")
+        status = tk.Label(win, text="Loading...", anchor='w')
+        status.pack(fill=tk.X, padx=10, pady=(8, 0))
+        grid = VirtualGrid(win)
+        grid.pack(fill=tk.BOTH, expand=True, padx=10, pady=8)
+        tk.Label(win, text="Column statistics:", font=('Arial', 9, 'bold')).pack(anchor=tk.W, padx=10)
+        stats_text = scrolledtext.ScrolledText(win, height=9, wrap=tk.NONE, bg='white', fg='#2c3e50', font=('Courier', 9))
+        stats_text.pack(fill=tk.X, padx=10, pady=(0, 10))
+        stats_text.config(state=tk.DISABLED)
+        cancel = threading.Event()
+        win.protocol("WM_DELETE_WINDOW", lambda: (cancel.set(), win.destroy()))
+        threading.Thread(target=self._stream_sheet_preview,
+                         args=(file, grid, status, stats_text, cancel), daemon=True).start()
+
+    def _stream_sheet_preview(self, file, grid, status, stats_text, cancel):
+        """Parse the CSV export as it arrives and hand rows to the grid in batches."""
+        headers = {'Authorization': f'Bearer {self.tokens["google"]}'}
+        file_id = file.get('id')
+        if file.get('mimeType', '').startswith('application/vnd.google-apps.spreadsheet'):
+            url = f'https://www.googleapis.com/drive/v3/files/{file_id}/export?mimeType=text/csv'
+        else:
+            url = f'https://www.googleapis.com/drive/v3/files/{file_id}?alt=media'
+        try:
+            resp = requests.get(url, headers=headers, stream=True, timeout=60)
+            if resp.status_code != 200:
+                self.root.after(0, lambda: status.config(text=f"Error: {resp.status_code} {resp.text[:200]}"))
+                return
+            resp.raw.decode_content = True
+            reader = csv.reader(io.TextIOWrapper(resp.raw, encoding='utf-8', errors='replace', newline=''))
+            columns = next(reader, None)
+            if columns is None:
+                self.root.after(0, lambda: status.config(text="Empty sheet"))
+                return
+            self.root.after(0, lambda: grid.set_columns(columns))
+            stats = [self._new_column_stats() for _ in columns]
+            batch, total = [], 0
+            for row in reader:
+                if cancel.is_set():
+                    resp.close()
+                    return
+                batch.append(row)
+                if len(batch) >= 2000:
+                    total += len(batch)
+                    self._flush_sheet_batch(batch, columns, stats, grid, status, stats_text, total, False)
+                    batch = []
+            total += len(batch)
+            self._flush_sheet_batch(batch, columns, stats, grid, status, stats_text, total, True)
+        except Exception as e:
+            self.root.after(0, lambda: status.config(text=f"Failed: {str(e)}"))
+
+    def _flush_sheet_batch(self, batch, columns, stats, grid, status, stats_text, total, finished):
+        self._update_column_stats(stats, batch, len(columns))
+        report = self._format_column_stats(columns, stats)
+        label = f"{total} rows loaded" + ("" if finished else " (streaming...)")
+
+        def _render():
+            if not grid.winfo_exists():
+                return
+            grid.append_rows(batch)
+            status.config(text=label)
+            stats_text.config(state=tk.NORMAL)
+            stats_text.delete(1.0, tk.END)
+            stats_text.insert(tk.END, report)
+            stats_text.config(state=tk.DISABLED)
+        self.root.after(0, _render)
+
+    def _new_column_stats(self):
+        return {'count': 0, 'nulls': 0, 'numeric': 0, 'integer': 0, 'sum': 0.0,
+                'min': None, 'max': None, 'text_min': None, 'text_max': None}
+
+    def _update_column_stats(self, stats, batch, ncols):
+        """Column-at-a-time statistics: each column of the batch is reduced with builtin min/max/sum."""
+        if not batch:
+            return
+        padded = [row + [''] * (ncols - len(row)) if len(row) < ncols else row[:ncols] for row in batch]
+        for st, column in zip(stats, zip(*padded)):
+            values = [v.strip() for v in column]
+            present = [v for v in values if v]
+            st['nulls'] += len(values) - len(present)
+            st['count'] += len(present)
+            if not present:
+                continue
+            try:
+                numbers = list(map(float, present))
+            except ValueError:
+                numbers = []
+                for v in present:
+                    try:
+                        numbers.append(float(v.replace(',', '')))
+                    except ValueError:
+                        pass
+            if numbers:
+                st['numeric'] += len(numbers)
+                st['integer'] += sum(1 for n in numbers if n.is_integer())
+                st['sum'] += sum(numbers)
+                lo, hi = min(numbers), max(numbers)
+                st['min'] = lo if st['min'] is None else min(st['min'], lo)
+                st['max'] = hi if st['max'] is None else max(st['max'], hi)
+            lo, hi = min(present), max(present)
+            st['text_min'] = lo if st['text_min'] is None else min(st['text_min'], lo)
+            st['text_max'] = hi if st['text_max'] is None else max(st['text_max'], hi)
+
+    def _infer_column_type(self, st):
+        if not st['count']:
+            return 'empty'
+        if st['numeric'] == st['count']:
+            return 'integer' if st['integer'] == st['count'] else 'number'
+        if st['numeric'] >= 0.9 * st['count']:
+            return 'mostly numeric'
+        return 'text'
+
+    def _format_column_stats(self, columns, stats):
+        lines = [f"{'Column':<24}{'Type':<16}{'Count':>9}{'Nulls':>9}  {'Min':<16}{'Max':<16}{'Mean':<14}"]
+        for name, st in zip(columns, stats):
+            col_type = self._infer_column_type(st)
+            if col_type in ('integer', 'number', 'mostly numeric'):
+                lo, hi = f"{st['min']:g}", f"{st['max']:g}"
+                mean = f"{st['sum'] / st['numeric']:.4g}"
+            else:
+                lo, hi = (st['text_min'] or '')[:15], (st['text_max'] or '')[:15]
+                mean = '-'
+            lines.append(f"{str(name)[:23]:<24}{col_type:<16}{st['count']:>9}{st['nulls']:>9}  {lo:<16}{hi:<16}{mean:<14}")
+        return "\n".join(lines)
+
     def search_drive_files(self):
         query = self.drive_search.get().strip()
         threading.Thread(target=self._search_drive_files, args=(query,), daemon=True).start()
@@ -2358,7 +6414,7 @@ class DashboardApp:
             q = f"name contains '{query.replace("'", "\'")}'" if query else None
             params = {
                 'pageSize': 50,
-                'fields': 'files(id,name,mimeType,modifiedTime,owners)'
+                'fields': 'files(id,name,mimeType,modifiedTime,owners,thumbnailLink)'
             }
             if q:
                 params['q'] = q
@@ -2385,21 +6441,114 @@ class DashboardApp:
         headers = {'Authorization': f'Bearer {self.tokens["google"]}'}
         file_id = file.get('id')
         name = file.get('name', 'download')
+        mime = file.get('mimeType', '')
+        url = None
+        if mime in DRIVE_DEFAULT_EXPORT:
+            # Google-native files have no binary content; export them instead
+            export_mime, ext = DRIVE_EXPORT_FORMATS[mime][DRIVE_DEFAULT_EXPORT[mime]]
+            url = f'https://www.googleapis.com/drive/v3/files/{file_id}/export?mimeType={requests.utils.quote(export_mime)}'
+            name = f"{name}.{ext}"
         try:
-            url = f'https://www.googleapis.com/drive/v3/files/{file_id}?alt=media'
-            resp = requests.get(url, headers=headers, stream=True)
+            path = os.path.join(os.getcwd(), name)
+            resp = self._drive_download(headers, file_id, path, url=url)
             if resp.status_code == 200:
-                path = os.path.join(os.getcwd(), name)
-                with open(path, 'wb') as f:
-                    for chunk in resp.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
                 self.root.after(0, lambda: messagebox.showinfo("Drive", f"Downloaded to {path}"))
             else:
                 self.root.after(0, lambda: messagebox.showerror("Drive", f"Failed: {resp.text}"))
         except Exception as e:
             self.root.after(0, lambda: messagebox.showerror("Drive", f"Error: {str(e)}"))
 
+    # Drive bulk export
+    def export_selected_drive_files(self):
+        sel = self.drive_listbox.curselection()
+        files = [self.drive_cache[i] for i in sel if i < len(getattr(self, 'drive_cache', None) or [])]
+        files = [f for f in files if f.get('mimeType') in DRIVE_EXPORT_FORMATS]
+        if not files:
+            messagebox.showwarning("Drive Export", "Select one or more Google Docs, Sheets or Slides")
+            return
+        win = tk.Toplevel(self.root)
+        win.title("Export Drive Files")
+        tk.Label(win, text=f"Export {len(files)} file(s) as:", font=('Arial', 10, 'bold')).pack(anchor=tk.W, padx=10, pady=(10, 4))
+        format_vars = {}
+        for label in ('PDF', 'DOCX', 'XLSX', 'CSV', 'Markdown'):
+            format_vars[label] = tk.BooleanVar(value=label == 'PDF')
+            tk.Checkbutton(win, text=label, variable=format_vars[label]).pack(anchor=tk.W, padx=20)
+        tk.Label(win, text="Formats that do not apply to a file type are skipped.", fg='#7f8c8d').pack(anchor=tk.W, padx=10, pady=4)
+
+        def _start():
+            formats = [label for label, var in format_vars.items() if var.get()]
+            if not formats:
+                messagebox.showwarning("Drive Export", "Choose at least one format", parent=win)
+                return
+            out_dir = filedialog.askdirectory(parent=win)
+            if not out_dir:
+                return
+            win.destroy()
+            threading.Thread(target=self._export_drive_files, args=(files, formats, out_dir), daemon=True).start()
+        tk.Button(win, text="Choose Folder & Export", command=_start, bg='#34a853', fg='white').pack(padx=10, pady=10)
+
+    def _export_drive_files(self, files, formats, out_dir):
+        """Export every (file, format) pair with a bounded pool, skipping exports that are already current."""
+        self.update_status("Exporting Drive files...")
+        if self.tokens.get('google_refresh'):
+            self.refresh_google_token()
+        headers = {'Authorization': f'Bearer {self.tokens["google"]}'}
+        manifest_path = os.path.join(out_dir, '.unifiedhub_exports.json')
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except Exception:
+            manifest = {}
+
+        names = [f.get('name', 'untitled') for f in files]
+        jobs, skipped = [], 0
+        for file in files:
+            base = "".join(c if c not in '\\/:*?"<>|' else '_' for c in file.get('name', 'untitled')).strip() or 'untitled'
+            if names.count(file.get('name', 'untitled')) > 1:
+                base = f"{base} ({file['id'][:8]})"
+            for label in formats:
+                target = DRIVE_EXPORT_FORMATS[file['mimeType']].get(label)
+                if not target:
+                    continue
+                filename = f"{base}.{target[1]}"
+                path = os.path.join(out_dir, filename)
+                if manifest.get(filename) == file.get('modifiedTime') and os.path.exists(path):
+                    skipped += 1
+                    continue
+                jobs.append((file, target[0], filename, path))
+
+        done, failures = 0, []
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = {}
+            for file, export_mime, filename, path in jobs:
+                url = f"https://www.googleapis.com/drive/v3/files/{file['id']}/export?mimeType={requests.utils.quote(export_mime)}"
+                futures[pool.submit(self._drive_download, headers, file['id'], path, url)] = (file, filename)
+            for fut in as_completed(futures):
+                file, filename = futures[fut]
+                done += 1
+                try:
+                    resp = fut.result()
+                    if resp.status_code == 200:
+                        manifest[filename] = file.get('modifiedTime')
+                    else:
+                        failures.append(f"{filename}: {resp.status_code}")
+                except Exception as e:
+                    failures.append(f"{filename}: {e}")
+                self.update_status(f"Exporting {done}/{len(jobs)}...")
+
+        try:
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+        except Exception:
+            pass
+        summary = f"Exported {len(jobs) - len(failures)} file(s), skipped {skipped} unchanged"
+        if failures:
+            summary += "\n\nFailed:\n" + "\n".join(failures[:20])
+            self.root.after(0, lambda: messagebox.showwarning("Drive Export", summary))
+        else:
+            self.root.after(0, lambda: messagebox.showinfo("Drive Export", summary))
+        self.root.after(0, lambda: self.update_status("Ready"))
+
     def open_selected_drive_in_browser(self):
         sel = getattr(self, 'drive_listbox', None).curselection() if hasattr(self, 'drive_listbox') else []
         if not sel or not getattr(self, 'drive_cache', None):
@@ -2444,16 +6593,23 @@ class DashboardApp:
         if not key:
             messagebox.showwarning("Mistral", "Please enter API key first")
             return
+        cached = self._load_cache('mistral_models.json', {})
+        ttl = float(self.settings.get('mistral_models_ttl', 86400))
+        if cached.get('models') and time.time() - cached.get('fetched', 0) < ttl:
+            self.mistral_model.config(values=cached['models'])
+            self.update_status(f"{len(cached['models'])} models (cached)")
+            return
         threading.Thread(target=self._fetch_mistral_models, args=(key,), daemon=True).start()
 
     def _fetch_mistral_models(self, key):
         self.update_status("Loading Mistral models...")
         headers = {'Authorization': f'Bearer {key}'}
         try:
-            resp = requests.get('https://api.mistral.ai/v1/models', headers=headers)
+            resp = requests.get('https://api.mistral.ai/v1/models', headers=headers, timeout=15)
             if resp.status_code == 200:
                 models = resp.json().get('data', [])
                 model_ids = [m['id'] for m in models]
+                self._save_cache('mistral_models.json', {'fetched': time.time(), 'models': model_ids})
                 self.root.after(0, lambda: self.mistral_model.config(values=model_ids))
                 self.root.after(0, lambda: messagebox.showinfo("Mistral", f"Found {len(model_ids)} models"))
             else:
@@ -2463,7 +6619,12 @@ class DashboardApp:
         self.root.after(0, lambda: self.update_status("Models loaded"))
 
     def clear_mistral_chat(self):
-        self.mistral_history = []
+        self.mistral_history.clear()
+        self.mistral_conversation_id = None
+        self._clear_mistral_view()
+
+    def _clear_mistral_view(self):
+        """Empty the transcript widget without touching chat history or agent threads."""
         self.mistral_chat.config(state=tk.NORMAL)
         self.mistral_chat.delete(1.0, tk.END)
         self.mistral_chat.config(state=tk.DISABLED)
@@ -2477,6 +6638,9 @@ class DashboardApp:
             messagebox.showwarning("Mistral", "Please enter API key first")
             return
         
+        if self.mistral_streaming:
+            self.update_status("Wait for the current reply or press Stop")
+            return
         mode = self.mistral_mode.get()
         
         if mode == 'Agent':
@@ -2484,105 +6648,379 @@ class DashboardApp:
             if not agent_id:
                 messagebox.showwarning("Mistral", "Please enter Agent ID for Agent mode")
                 return
+            thread = self.mistral_agent_thread
+            if thread is None or thread['agent_id'] != agent_id:
+                thread = self.new_mistral_thread(agent_id)
+            if not thread['title']:
+                thread['title'] = message[:40]
+                self._refresh_mistral_threads()
+            if thread['store_id'] is None:
+                thread['store_id'] = self.conversations.create(thread['title'], mode='agent', agent_id=agent_id)
+                self._refresh_mistral_saved()
             self.mistral_input.delete(0, tk.END)
             # Show user message
             self.mistral_chat.config(state=tk.NORMAL)
             self.mistral_chat.insert(tk.END, f"You: {message}\n\n")
             self.mistral_chat.config(state=tk.DISABLED)
             self.mistral_chat.see(tk.END)
-            threading.Thread(target=self._send_mistral_agent, args=(key, agent_id, message), daemon=True).start()
+            self.mistral_stop.clear()
+            self.mistral_streaming = True
+            threading.Thread(target=self._send_mistral_agent, args=(key, thread, message), daemon=True).start()
         else:
             model = self.mistral_model.get()
+            if self.mistral_conversation_id is None:
+                self.mistral_conversation_id = self.conversations.create(message[:40], mode='chat', model=model)
+                self._refresh_mistral_saved()
             self.mistral_input.delete(0, tk.END)
             # Show user message
             self.mistral_chat.config(state=tk.NORMAL)
             self.mistral_chat.insert(tk.END, f"You: {message}\n\n")
             self.mistral_chat.config(state=tk.DISABLED)
             self.mistral_chat.see(tk.END)
-            threading.Thread(target=self._send_mistral_chat, args=(key, model, message), daemon=True).start()
+            self.mistral_stop.clear()
+            self.mistral_streaming = True
+            threading.Thread(target=self._send_mistral_chat, args=(key, model, message, self.mistral_conversation_id), daemon=True).start()
+
+    def _mistral_client(self, key):
+        with self.mistral_clients_lock:
+            client = self.mistral_clients.get(key)
+            if client is None:
+                client = self.mistral_clients[key] = Mistral(api_key=key)
+            return client
+
+    def new_mistral_thread(self, agent_id=None):
+        if self.mistral_streaming:
+            self.update_status("Wait for the current reply or press Stop")
+            return None
+        if agent_id is None:
+            agent_id = self.mistral_agent_id.get().strip() or os.getenv('MISTRAL_AI_AGENT_ID')
+        thread = {'conversation_id': None, 'agent_id': agent_id, 'title': '', 'messages': [], 'store_id': None}
+        self.mistral_agent_threads.append(thread)
+        self.mistral_agent_thread = thread
+        self._refresh_mistral_threads()
+        self.mistral_mode.set('Agent')
+        self._clear_mistral_view()
+        return thread
+
+    def _refresh_mistral_threads(self):
+        titles = [t['title'] or "(new thread)" for t in self.mistral_agent_threads]
+        self.mistral_thread_box.config(values=titles)
+        if self.mistral_agent_thread in self.mistral_agent_threads:
+            self.mistral_thread_box.current(self.mistral_agent_threads.index(self.mistral_agent_thread))
+
+    def on_mistral_thread_select(self):
+        index = self.mistral_thread_box.current()
+        if self.mistral_streaming or not 0 <= index < len(self.mistral_agent_threads):
+            self._refresh_mistral_threads()
+            return
+        self.mistral_agent_thread = self.mistral_agent_threads[index]
+        if self.mistral_mode.get() != 'Agent':
+            self.mistral_mode.set('Agent')
+        self._clear_mistral_view()
+        self._render_mistral_thread(self.mistral_agent_thread)
+
+    def _render_mistral_thread(self, thread, earlier=0):
+        self._render_mistral_messages(thread['messages'], "Agent", earlier)
+
+    def _render_mistral_messages(self, messages, assistant, earlier=0):
+        self.mistral_chat.config(state=tk.NORMAL)
+        if earlier:
+            self.mistral_chat.insert(tk.END, f"({earlier} earlier messages not shown)\n\n")
+        for msg in messages:
+            speaker = "You" if msg['role'] == 'user' else assistant
+            self.mistral_chat.insert(tk.END, f"{speaker}: {msg['content']}\n\n")
+        self.mistral_chat.config(state=tk.DISABLED)
+        self.mistral_chat.see(tk.END)
 
-    def _send_mistral_agent(self, key, agent_id, message):
-        """Send message to Mistral AI Agent"""
+    def _send_mistral_agent(self, key, thread, message):
+        """Send message to Mistral AI Agent, streaming the reply as conversation events arrive"""
         self.update_status("Agent thinking...")
+        parts = []
+        status = "Ready"
+        started = time.perf_counter()
+        first_token = None
+        self._mistral_emit("Agent: ")
         try:
             from mistralai.models import MessageInputEntry
             
-            client = Mistral(api_key=key)
-            
-            if self.mistral_agent_conversation_id is None:
+            client = self._mistral_client(key)
+            inputs = [MessageInputEntry(role="user", content=message)]
+            if thread['conversation_id'] is None:
                 # Start new conversation
-                response = client.beta.conversations.start(
-                    agent_id=agent_id,
-                    inputs=[MessageInputEntry(role="user", content=message)]
-                )
-                self.mistral_agent_conversation_id = response.conversation_id
+                stream = client.beta.conversations.start_stream(agent_id=thread['agent_id'], inputs=inputs)
             else:
                 # Continue existing conversation
-                response = client.beta.conversations.append(
-                    conversation_id=self.mistral_agent_conversation_id,
-                    inputs=[MessageInputEntry(role="user", content=message)]
-                )
-            
-            # Extract assistant response
-            assistant_msg = "No response"
-            if getattr(response, "outputs", None):
-                for output in reversed(response.outputs):
-                    role = getattr(output, "role", None)
-                    if role == "assistant":
-                        content = getattr(output, "content", "")
-                        if isinstance(content, list):
-                            parts = []
-                            for item in content:
-                                text = getattr(item, "text", None)
-                                parts.append(text if text is not None else str(item))
-                            assistant_msg = "".join(parts)
-                        else:
-                            assistant_msg = str(content)
-                        break
-            
-            def _display():
-                self.mistral_chat.config(state=tk.NORMAL)
-                self.mistral_chat.insert(tk.END, f"Agent: {assistant_msg}\n\n")
-                self.mistral_chat.config(state=tk.DISABLED)
-                self.mistral_chat.see(tk.END)
-            self.root.after(0, _display)
+                stream = client.beta.conversations.append_stream(conversation_id=thread['conversation_id'], inputs=inputs)
+            self.mistral_response = stream
+            for event in stream:
+                if self.mistral_stop.is_set():
+                    break
+                data = event.data
+                kind = getattr(data, 'type', '')
+                if kind == 'conversation.response.started':
+                    thread['conversation_id'] = data.conversation_id
+                elif kind == 'conversation.response.error':
+                    raise RuntimeError(getattr(data, 'message', 'conversation error'))
+                elif kind == 'message.output.delta':
+                    content = data.content
+                    delta = content if isinstance(content, str) else (getattr(content, 'text', None) or '')
+                    if not delta:
+                        continue
+                    if first_token is None:
+                        first_token = time.perf_counter() - started
+                        self.root.after(0, lambda t=first_token: self.update_status(f"Agent streaming... first token in {t:.2f}s"))
+                    parts.append(delta)
+                    self._mistral_emit(delta)
         except Exception as e:
-            error_msg = f"Agent Error: {str(e)}"
-            self.root.after(0, lambda: messagebox.showerror("Mistral Agent", error_msg))
-        self.root.after(0, lambda: self.update_status("Ready"))
+            if not self.mistral_stop.is_set():
+                error_msg = f"Agent Error: {str(e)}"
+                self.root.after(0, lambda: messagebox.showerror("Mistral Agent", error_msg))
+        finally:
+            if self.mistral_response is not None:
+                try:
+                    self.mistral_response.close()
+                except Exception:
+                    pass
+                self.mistral_response = None
+        thread['messages'].append({'role': 'user', 'content': message})
+        thread['messages'].append({'role': 'assistant', 'content': ''.join(parts) or "No response"})
+        self._persist_mistral(thread['store_id'], thread['messages'][-2:], conversation_id=thread['conversation_id'])
+        if self.mistral_stop.is_set():
+            self._mistral_emit(" [stopped]")
+            status = "Stopped"
+        if first_token is not None:
+            status += f" (first token {first_token:.2f}s, total {time.perf_counter() - started:.2f}s)"
+        self._mistral_emit("\n\n")
+        self.mistral_streaming = False
+        self.root.after(0, lambda: self.update_status(status))
+
+    def stop_mistral_stream(self):
+        self.mistral_stop.set()
+        # Closing the response unblocks a worker that is waiting on the socket
+        response = self.mistral_response
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+
+    def _mistral_emit(self, text):
+        """Queue streamed text for the chat widget; bursts of deltas become one insert."""
+        with self.mistral_stream_lock:
+            self.mistral_stream_buf.append(text)
+            if self.mistral_flush_pending:
+                return
+            self.mistral_flush_pending = True
+        self.root.after(30, self._flush_mistral_stream)
+
+    def _flush_mistral_stream(self):
+        with self.mistral_stream_lock:
+            text = ''.join(self.mistral_stream_buf)
+            self.mistral_stream_buf.clear()
+            self.mistral_flush_pending = False
+        if text:
+            self.mistral_chat.config(state=tk.NORMAL)
+            self.mistral_chat.insert(tk.END, text)
+            self.mistral_chat.config(state=tk.DISABLED)
+            self.mistral_chat.see(tk.END)
 
-    def _send_mistral_chat(self, key, model, message):
+    def _iter_sse(self, response):
+        """Yield the decoded JSON payload of each `data:` event until [DONE]."""
+        for line in response.iter_lines(chunk_size=64):
+            if not line or not line.startswith(b'data:'):
+                continue
+            data = line[5:].strip()
+            if data == b'[DONE]':
+                return
+            try:
+                yield json.loads(data)
+            except ValueError:
+                continue
+
+    def _send_mistral_chat(self, key, model, message, conv_id):
         self.update_status("Thinking...")
         headers = {
             'Authorization': f'Bearer {key}',
-            'Content-Type': 'application/json'
+            'Content-Type': 'application/json',
+            'Accept': 'text/event-stream'
         }
-        # Add message to history
-        self.mistral_history.append({'role': 'user', 'content': message})
+        # Add message to history; only the newest turns that fit the token budget are sent
+        history = self.mistral_history
+        history.append('user', message)
         payload = {
             'model': model,
-            'messages': self.mistral_history,
-            'temperature': 0.7,
-            'max_tokens': 1024
+            'messages': history.window(),
+            'temperature': float(self.settings.get('mistral_temperature', 0.7)),
+            'max_tokens': 1024,
+            'stream': True
         }
+        # Deterministic requests (or all of them, if the user opts in) are answered from the cache
+        cache_key = None
+        if payload['temperature'] == 0 or self.settings.get('mistral_cache_responses', False):
+            cache_key = ResponseCache.key(model, payload['messages'], payload['temperature'], payload['max_tokens'])
+        cached = self.mistral_responses.get(cache_key) if cache_key else None
+        parts = []
+        status = "Ready"
+        started = time.perf_counter()
+        first_token = None
+        complete = False
+        self._mistral_emit("Mistral: ")
         try:
-            resp = requests.post('https://api.mistral.ai/v1/chat/completions', headers=headers, json=payload)
-            if resp.status_code == 200:
-                data = resp.json()
-                assistant_msg = data['choices'][0]['message']['content']
-                self.mistral_history.append({'role': 'assistant', 'content': assistant_msg})
-                def _display():
-                    self.mistral_chat.config(state=tk.NORMAL)
-                    self.mistral_chat.insert(tk.END, f"Mistral: {assistant_msg}\n\n")
-                    self.mistral_chat.config(state=tk.DISABLED)
-                    self.mistral_chat.see(tk.END)
-                self.root.after(0, _display)
+            if cached is not None:
+                parts.append(cached)
+                self._mistral_emit(cached)
+                # Labelled in the transcript too: with caching forced on, a non-zero temperature reply is not fresh
+                self._mistral_emit("  [cached reply]")
+                status = "Ready (cached reply)"
             else:
-                error = f"Error: {resp.status_code}\n{resp.text}"
-                self.root.after(0, lambda: messagebox.showerror("Mistral", error))
+                resp = requests.post('https://api.mistral.ai/v1/chat/completions', headers=headers, json=payload,
+                                     stream=True, timeout=(10, 120))
+                self.mistral_response = resp
+                if resp.status_code == 200:
+                    for chunk in self._iter_sse(resp):
+                        if self.mistral_stop.is_set():
+                            break
+                        choices = chunk.get('choices') or [{}]
+                        delta = (choices[0].get('delta') or {}).get('content')
+                        if not delta:
+                            continue
+                        if first_token is None:
+                            first_token = time.perf_counter() - started
+                            self.root.after(0, lambda t=first_token: self.update_status(f"Streaming... first token in {t:.2f}s"))
+                        parts.append(delta)
+                        self._mistral_emit(delta)
+                    complete = not self.mistral_stop.is_set()
+                else:
+                    error = f"Error: {resp.status_code}\n{resp.text}"
+                    self.root.after(0, lambda: messagebox.showerror("Mistral", error))
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Mistral", f"Failed: {str(e)}"))
-        self.root.after(0, lambda: self.update_status("Ready"))
+            # Stop closes the socket under the worker; that is not an error
+            if not self.mistral_stop.is_set():
+                self.root.after(0, lambda: messagebox.showerror("Mistral", f"Failed: {str(e)}"))
+        finally:
+            if self.mistral_response is not None:
+                self.mistral_response.close()
+                self.mistral_response = None
+        assistant_msg = ''.join(parts)
+        if cache_key and complete and assistant_msg:
+            self._cache_mistral_response(cache_key, assistant_msg)
+        if assistant_msg:
+            # A stopped reply is kept as far as it got so the next turn has the same context the user saw
+            history.append('assistant', assistant_msg)
+            self._persist_mistral(conv_id, [{'role': 'user', 'content': message}, {'role': 'assistant', 'content': assistant_msg}])
+            if history.summarize:
+                overflow = history.overflow()
+                if overflow:
+                    threading.Thread(target=self._summarize_mistral_history, args=(key, model, history, overflow), daemon=True).start()
+        else:
+            history.pop()
+        if self.mistral_stop.is_set():
+            self._mistral_emit(" [stopped]")
+            status = "Stopped"
+        if first_token is not None:
+            status += f" (first token {first_token:.2f}s, total {time.perf_counter() - started:.2f}s)"
+        self._mistral_emit("\n\n")
+        self.mistral_streaming = False
+        self.root.after(0, lambda: self.update_status(status))
+
+    def _persist_mistral(self, conv_id, messages, **meta):
+        try:
+            for msg in messages:
+                self.conversations.append(conv_id, msg['role'], msg['content'])
+            if meta:
+                self.conversations.update(conv_id, **meta)
+        except (OSError, KeyError):
+            # A conversation deleted mid-reply, or a full disk, must not break the chat
+            pass
+        self.root.after(0, self._refresh_mistral_saved)
+
+    def _refresh_mistral_saved(self):
+        self.mistral_saved = self.conversations.list()
+        self.mistral_saved_box.config(values=[
+            f"{e['title']} [{e['mode']}] {datetime.fromtimestamp(e['updated']).strftime('%Y-%m-%d %H:%M')}"
+            for e in self.mistral_saved])
+
+    def on_mistral_saved_select(self):
+        index = self.mistral_saved_box.current()
+        if self.mistral_streaming or not 0 <= index < len(self.mistral_saved):
+            return
+        entry = self.mistral_saved[index]
+        try:
+            earlier, messages = self.conversations.load(entry['id'])
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Mistral", f"Could not open conversation: {e}")
+            return
+        if entry['mode'] == 'agent':
+            thread = next((t for t in self.mistral_agent_threads if t['store_id'] == entry['id']), None)
+            if thread is None:
+                thread = {'conversation_id': entry.get('conversation_id'), 'agent_id': entry.get('agent_id'),
+                          'title': entry['title'], 'messages': messages, 'store_id': entry['id']}
+                self.mistral_agent_threads.append(thread)
+            self.mistral_agent_thread = thread
+            self._refresh_mistral_threads()
+            self.mistral_mode.set('Agent')
+            self._clear_mistral_view()
+            self._render_mistral_thread(thread, earlier)
+        else:
+            self.mistral_mode.set('Chat')
+            self.clear_mistral_chat()
+            if entry.get('model'):
+                self.mistral_model.set(entry['model'])
+            for msg in messages:
+                self.mistral_history.append(msg['role'], msg['content'])
+            self.mistral_conversation_id = entry['id']
+            self._render_mistral_messages(messages, "Mistral", earlier)
+        self.update_status(f"Resumed: {entry['title']}")
+
+    def delete_mistral_saved(self):
+        index = self.mistral_saved_box.current()
+        if not 0 <= index < len(self.mistral_saved):
+            return
+        entry = self.mistral_saved[index]
+        if not messagebox.askyesno("Mistral", f"Delete saved conversation '{entry['title']}'?"):
+            return
+        self.conversations.delete(entry['id'])
+        if self.mistral_conversation_id == entry['id']:
+            self.mistral_conversation_id = None
+        for thread in self.mistral_agent_threads:
+            if thread['store_id'] == entry['id']:
+                thread['store_id'] = None
+        self.mistral_saved_box.set('')
+        self._refresh_mistral_saved()
+
+    def _summarize_mistral_history(self, key, model, history, overflow):
+        """Fold turns that fell out of the context window into the running summary."""
+        generation, folded, end, messages = overflow
+        transcript = "\n".join(f"{role}: {content}" for role, content in messages)
+        previous = history.previous_summary()
+        prompt = ("Summarize this conversation in a few sentences, keeping names, facts and decisions "
+                  "that later replies may need.\n\n")
+        if previous:
+            prompt += f"Earlier summary: {previous}\n\n"
+        payload = {
+            'model': model,
+            'messages': [{'role': 'user', 'content': prompt + transcript}],
+            'temperature': 0,
+            'max_tokens': 300
+        }
+        cache_key = ResponseCache.key(model, payload['messages'], 0, 300)
+        summary = self.mistral_responses.get(cache_key)
+        try:
+            if summary is None:
+                resp = requests.post('https://api.mistral.ai/v1/chat/completions', json=payload, timeout=60,
+                                     headers={'Authorization': f'Bearer {key}', 'Content-Type': 'application/json'})
+                if resp.status_code == 200:
+                    summary = resp.json()['choices'][0]['message']['content']
+                    self._cache_mistral_response(cache_key, summary)
+        except (requests.RequestException, KeyError, IndexError, ValueError):
+            # The turns stay in the window and the next reply retries the fold
+            summary = None
+        history.fold(generation, folded, end, summary)
+
+    def _cache_mistral_response(self, key, text):
+        """Remember a reply and write the cache file a few seconds later, batching any replies in between."""
+        if self.mistral_responses.put(key, text):
+            self.root.after(5000, lambda: threading.Thread(target=self.mistral_responses.flush, daemon=True).start())
 
     # Weather Tab
     def setup_weather_tab(self):
@@ -3729,3 +8167,5 @@ if __name__ == "__main__":
     root = tk.Tk()
     app = DashboardApp(root)
     root.mainloop()
+    # Replies cached since the last timed write
+    app.mistral_responses.flush()